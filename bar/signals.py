@@ -0,0 +1,26 @@
+"""
+Сброс тега бара в общем кэше при изменении коктейлей и ингредиентов (см. CacheTags).
+"""
+
+from typing import Any
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from bar.models import Cocktail, CocktailIngredient, Ingredient
+from classes.caching import CacheTags
+
+
+# CocktailIngredient — through-модель Cocktail.ingredients: её строки создаются напрямую,
+# поэтому кроме m2m_changed ловим и её сохранение/удаление
+@receiver([post_save, post_delete], sender=Cocktail)
+@receiver([post_save, post_delete], sender=Ingredient)
+@receiver([post_save, post_delete], sender=CocktailIngredient)
+def invalidate_bar(sender: type, **kwargs: Any) -> None:
+    CacheTags.invalidate(CacheTags.BAR)
+
+
+@receiver(m2m_changed, sender=Cocktail.ingredients.through)
+def invalidate_cocktail_ingredients(sender: type, action: str, **kwargs: Any) -> None:
+    if action.startswith("post_"):
+        CacheTags.invalidate(CacheTags.BAR)
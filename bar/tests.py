@@ -17,3 +17,14 @@ class IngredientHandlerTests(TestCase):
         result = await IngredientHandler.get_ingredient_by_id(999)
         self.assertEqual(result["error"]["status"], 404)
         self.assertEqual(result["error"]["message"], "Запрашиваемый объект не найден")
+
+
+class BarConditionalGetTests(TestCase):
+    def test_ingredient_change_invalidates_etag(self) -> None:
+        etag = self.client.get("/bar/", {"format": "json"})["ETag"]
+        self.assertEqual(self.client.get("/bar/", {"format": "json"}, headers={"if-none-match": etag}).status_code, 304)
+
+        Ingredient.objects.create(name="Лайм", is_available=True)
+        response = self.client.get("/bar/", {"format": "json"}, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["ingredients"][0]["name"], "Лайм")
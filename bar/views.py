@@ -4,8 +4,9 @@ from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from classes import CocktailHandler, IngredientHandler, Telegram
+from classes import CacheTags, CocktailHandler, IngredientHandler, Telegram
 from mixins import GlobalDataMixin
+from utils.conditional import conditional_get
 from utils.response_handler import handle_response
 
 
@@ -22,6 +23,7 @@ class IngredientTelegramRequest(APIView):
 
 
 class Bar(GlobalDataMixin, APIView):
+    @conditional_get(CacheTags.BAR)
     async def get(self, request: Request) -> Response:
         """
         Получение заполненности бара (коктейли + ингредиенты)
@@ -1,4 +1,7 @@
 __all__ = [
+    "CacheNamespace",
+    "CacheRegistry",
+    "CacheTags",
     "Caching",
     "CocktailHandler",
     "IngredientHandler",
@@ -15,7 +18,7 @@ __all__ = [
     "UserHandler",
 ]
 
-from .caching import Caching
+from .caching import CacheNamespace, CacheRegistry, CacheTags, Caching
 from .cocktail import CocktailHandler
 from .ingredient import IngredientHandler
 from .invitation import Invitation
@@ -0,0 +1,139 @@
+import io
+import json
+import os.path as op
+import pickle
+import sqlite3
+from typing import Any
+import zlib
+
+from diskcache import UNKNOWN, Disk
+from diskcache.core import MODE_PICKLE
+
+
+try:
+    import msgpack
+except ImportError:  # необязательная зависимость
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # необязательная зависимость
+    zstandard = None
+
+
+class CompactDisk(Disk):
+    """
+    Хранилище значений diskcache с компактным кодеком вместо голого pickle.
+
+    Числа, строки и байты diskcache по-прежнему хранит как есть. Остальные значения кодируются
+    codec: json (или msgpack), если значение из них восстанавливается без потерь — только dict со
+    строковыми ключами, list, str, int, float, bool и None; всё прочее (кортежи, даты, модели)
+    остаётся в pickle. Полезная нагрузка больше compress_threshold байт сжимается zlib или zstd.
+
+    Формат различается по первому байту, поэтому записи, сохранённые обычным Disk (pickle),
+    читаются и после смены кодека, а смена кодека не требует очистки кэша.
+    """
+
+    JSON: bytes = b"J"
+    MSGPACK: bytes = b"M"
+    ZLIB: bytes = b"Z"
+    ZSTD: bytes = b"S"
+
+    CODECS: tuple[str, ...] = ("pickle", "json", "msgpack")
+    COMPRESSORS: tuple[str, ...] = ("zlib", "zstd")
+
+    def __init__(
+        self,
+        directory: str,
+        codec: str = "json",
+        compress: str = "zlib",
+        compress_threshold: int = 1024,
+        compress_level: int = 1,
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param directory: (str) папка кэша.
+        :param codec: (str) pickle, json или msgpack (нужен пакет msgpack).
+        :param compress: (str) zlib или zstd (нужен пакет zstandard).
+        :param compress_threshold: (int) с какого размера закодированного значения сжимать, байт; 0 — не сжимать.
+        :param compress_level: (int) уровень сжатия: чем меньше, тем быстрее.
+        """
+        self.codec = codec
+        self.compress = compress
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self._zstd_compressor = zstandard.ZstdCompressor(level=compress_level) if compress == "zstd" else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+        super().__init__(directory, **kwargs)
+
+    @classmethod
+    def check_options(cls, codec: str, compress: str) -> str | None:
+        """:return: (str) описание ошибки настроек или None, если кодек можно использовать."""
+        if codec not in cls.CODECS:
+            return f"Неизвестный кодек {codec}."
+        if compress not in cls.COMPRESSORS:
+            return f"Неизвестный алгоритм сжатия {compress}."
+        if codec == "msgpack" and msgpack is None:
+            return "Для кодека msgpack нужен пакет msgpack."
+        if compress == "zstd" and zstandard is None:
+            return "Для сжатия zstd нужен пакет zstandard."
+        return None
+
+    @classmethod
+    def _plain(cls, value: Any) -> bool:
+        """Восстанавливается ли значение из json/msgpack без потерь (тип в тип)."""
+        value_type = type(value)
+        if value is None or value_type in (str, int, float, bool):
+            return True
+        if value_type is list:
+            return all(cls._plain(item) for item in value)
+        if value_type is dict:
+            return all(type(key) is str and cls._plain(item) for key, item in value.items())
+        return False
+
+    def encode(self, value: Any) -> bytes:
+        if self.codec != "pickle" and self._plain(value):
+            if self.codec == "msgpack":
+                data = self.MSGPACK + msgpack.packb(value, use_bin_type=True)
+            else:
+                data = self.JSON + json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+        else:
+            data = pickle.dumps(value, protocol=self.pickle_protocol)
+
+        if self.compress_threshold and len(data) > self.compress_threshold:
+            if self._zstd_compressor is not None:
+                return self.ZSTD + self._zstd_compressor.compress(data)
+            return self.ZLIB + zlib.compress(data, self.compress_level)
+        return data
+
+    def decode(self, data: bytes) -> Any:
+        header = data[:1]
+        if header == self.ZLIB:
+            return self.decode(zlib.decompress(data[1:]))
+        if header == self.ZSTD:
+            return self.decode(self._zstd_decompressor.decompress(data[1:]))
+        if header == self.JSON:
+            return json.loads(data[1:])
+        if header == self.MSGPACK:
+            return msgpack.unpackb(data[1:], raw=False)
+        # pickle протокола 2+ начинается с b"\x80" и не совпадает ни с одним заголовком выше
+        return pickle.loads(data)
+
+    def store(self, value: Any, read: bool, key: Any = UNKNOWN) -> tuple[int, int, str | None, Any]:
+        if read or type(value) in (str, bytes, int, float):
+            return super().store(value, read, key=key)
+
+        data = self.encode(value)
+        if len(data) < self.min_file_size:
+            return 0, MODE_PICKLE, None, sqlite3.Binary(data)
+        filename, full_path = self.filename(key, value)
+        self._write(full_path, io.BytesIO(data), "xb")
+        return len(data), MODE_PICKLE, filename, None
+
+    def fetch(self, mode: int, filename: str | None, value: Any, read: bool) -> Any:
+        if mode != MODE_PICKLE:
+            return super().fetch(mode, filename, value, read)
+        if value is None:
+            with open(op.join(self._directory, filename), "rb") as reader:
+                return self.decode(reader.read())
+        return self.decode(bytes(value))
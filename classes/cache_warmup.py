@@ -0,0 +1,89 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+import logging
+import time
+from typing import Any, NamedTuple
+
+from utils.cache_handler import is_error_result
+
+from .movie import MovieHandler, MoviesStructure
+from .postcard import PostcardHandler
+from .statistic import Statistic
+from .tools import Tools
+
+
+logger = logging.getLogger(__name__)
+
+
+class WarmResult(NamedTuple):
+    target: str
+    seconds: float
+    error: str | None = None
+
+
+async def _warm_users() -> Any:
+    # Импорт внутри: mixins импортирует classes
+    from mixins import GlobalDataMixin
+
+    return await GlobalDataMixin()._get_cached_users()
+
+
+async def _warm_movies(is_archive: bool) -> Any:
+    # первая страница сетки и жанры фильтра с теми же аргументами, что у MoviesViewSet: ключи кэша совпадают
+    page, genres = await asyncio.gather(
+        MovieHandler.get_movies_page(
+            info_type=MoviesStructure.posters, is_archive=is_archive, limit=None, cursor=None, filters={}
+        ),
+        MovieHandler.get_genres(is_archive=is_archive),
+    )
+    return page if is_error_result(page) else genres
+
+
+class CacheWarmer:
+    """
+    Прогрев кэшей самых дорогих страниц, чтобы после деплоя за холодный старт
+    не платил первый посетитель. Вызывается командой warm_cache и, при CACHE_PREWARM,
+    из lifespan до того, как uvicorn начнёт принимать запросы.
+
+    Цели запускаются одновременно; ORM-части обработчиков всё равно идут по очереди
+    в потоке sync_to_async, поэтому время цели — с учётом ожидания соседей.
+    """
+
+    TARGETS: dict[str, Callable[[], Awaitable[Any]]] = {
+        # страница /features/statistic/: pandas, графики plotly, фильмы архива, оценки, участники
+        "statistic": Statistic.get_page_context,
+        # /movies/ и /movies/archive/
+        "movies": lambda: _warm_movies(is_archive=False),
+        "archive": lambda: _warm_movies(is_archive=True),
+        # /postcard/archive/
+        "postcards": PostcardHandler.get_all_postcards_with_ratings,
+        # участники для всех страниц (GlobalDataMixin)
+        "users": _warm_users,
+        # списки картинок тем
+        "themes": lambda: asyncio.to_thread(Tools.warm_images),
+    }
+
+    @classmethod
+    async def warm(cls, targets: Iterable[str] | None = None) -> list[WarmResult]:
+        """
+        Прогревает цели одновременно.
+        :param targets: имена из TARGETS; None — все.
+        :return: (list) время и ошибка по каждой цели в порядке TARGETS.
+        """
+        names = [name for name in cls.TARGETS if targets is None or name in targets]
+        return list(await asyncio.gather(*(cls._warm_one(name) for name in names)))
+
+    @classmethod
+    async def _warm_one(cls, name: str) -> WarmResult:
+        started = time.perf_counter()
+        try:
+            result = await cls.TARGETS[name]()
+        except Exception as e:
+            logger.exception("Прогрев %s завершился ошибкой", name)
+            return WarmResult(name, time.perf_counter() - started, str(e) or type(e).__name__)
+
+        elapsed = time.perf_counter() - started
+        if isinstance(result, dict) and is_error_result(result):
+            return WarmResult(name, elapsed, result["error"]["message"])
+        logger.info("Прогрев %s: %.2f с", name, elapsed)
+        return WarmResult(name, elapsed)
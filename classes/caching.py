@@ -1,161 +1,868 @@
-import logging
-from sqlite3 import OperationalError
-from typing import Any
-
-from diskcache import Cache
-
-
-# Configure logger
-logger = logging.getLogger(__name__)
-
-
-class Caching:
-    """
-    Класс для кэширования данных
-    """
-
-    def __init__(self, dirname: str = None, ttl: int = None) -> None:
-        """
-        :param dirname: (str) - название папки хранения файла кэша.
-        :param ttl: (int) время актуальности кэша в секундах.
-        """
-        # Признак успешности инициализации
-        self.__initialized: bool = True
-
-        # Сообщение об ошибке
-        self.__error_message: str = ""
-
-        # Проверка параметров
-        if dirname and type(dirname) is not str:
-            self.__error_message = "Переданный dirname не является строкой."
-            logger.error(self.__error_message)
-            self.__initialized = False
-            return None
-        if ttl and type(ttl) is not int:
-            self.__error_message = "Переданный ttl не является целым числом."
-            logger.error(self.__error_message)
-            self.__initialized = False
-            return None
-        if ttl and ttl < 0:
-            self.__error_message = "Переданн отрицательный ttl."
-            logger.error(self.__error_message)
-            self.__initialized = False
-            return None
-
-        self.__dirname = dirname if dirname else None
-        self.__ttl = ttl if ttl else None
-
-        # Инициализация кэшировальщика
-        self.__cache = None
-        try:
-            self.__cache = Cache(self.__dirname)
-        except OperationalError as e:
-            self.__error_message = f"При инициализации кэшировальщика возникла ошибка. [{e!s}]"
-            logger.error(self.__error_message)
-            self.__initialized = False
-            return None
-        except Exception as e:
-            self.__error_message = f"При инициализации кэшировальщика возникла непредвиденная ошибка. [{e!s}]"
-            logger.error(self.__error_message)
-            self.__initialized = False
-            return None
-
-    def check_cache(self, key: str | int = None) -> bool:
-        """
-        Проверка наличия параметра в кэше.
-        :param key: (int|str) параметр в кэше.
-        :return: (bool) результат проверки.
-        """
-        # Проверка параметров
-        if key is None:
-            return False
-        if type(key) not in [int, str]:
-            self.__error_message = "Переданный key не является целым числом или строкой."
-            logger.error(self.__error_message)
-            return False
-
-        return key in self.__cache
-
-    def get_cache(self, key: str | int = None) -> Any:
-        """
-        Получение данных из кэша.
-        :param key: (int|str) ключ размещения данных в кэше.
-        :return: (any) python-объект данных из кэша.
-        """
-        # Проверка параметров
-        if key is None:
-            self.__error_message = "Параметр key не задан."
-            logger.error(self.__error_message)
-            return None
-        if key and type(key) not in [int, str]:
-            self.__error_message = "Переданный key не является целым числом или строкой."
-            logger.error(self.__error_message)
-            return None
-
-        # Получение данных из кэша
-        try:
-            return self.__cache.get(key)
-        except TypeError:
-            self.__error_message = "Не удалось получить данные из кэша."
-            logger.error(self.__error_message)
-            return False
-        except Exception:
-            self.__error_message = "При получении данных из кэша возникла непредвиденная ошибка."
-            logger.error(self.__error_message)
-            return False
-
-    def delete_cache(self, key: str | int = None) -> bool:
-        """
-        Удаление данных из кэша (например, для инвалидации после правок в админке).
-        :param key: (int|str) ключ размещения данных в кэше.
-        :return: (bool) True, если ключ был и удалился.
-        """
-        # Проверка параметров
-        if key is None:
-            self.__error_message = "Параметр key не задан."
-            logger.error(self.__error_message)
-            return False
-        if key and type(key) not in [int, str]:
-            self.__error_message = "Переданный key не является целым числом или строкой."
-            logger.error(self.__error_message)
-            return False
-
-        # Удаление данных из кэша
-        try:
-            return self.__cache.delete(key)
-        except Exception:
-            self.__error_message = "При удалении данных из кэша возникла непредвиденная ошибка."
-            logger.error(self.__error_message)
-            return False
-
-    def get_status(self) -> bool:
-        return self.__initialized
-
-    def set_cache(self, key: str | int = None, value: Any = None) -> bool:
-        """
-        Размещение данных в кэш.
-        :param key: (int|str) ключ размещения данных в кэше.
-        :param value: (any) python-объект.
-        :return: (bool) результат кэширования.
-        """
-        # Проверка параметров
-        if key is None:
-            self.__error_message = "Параметр key не задан."
-            logger.error(self.__error_message)
-            return False
-        if key and type(key) not in [int, str]:
-            self.__error_message = "Переданный key не является целым числом или строкой."
-            logger.error(self.__error_message)
-            return False
-
-        # Кэширование данных
-        try:
-            return self.__cache.set(key, value, expire=self.__ttl)
-        except TypeError:
-            self.__error_message = "Не удалось закэшировать данные."
-            logger.error(self.__error_message)
-            return False
-        except Exception:
-            self.__error_message = "При кэшировании данных возникла непредвиденная ошибка."
-            logger.error(self.__error_message)
-            return False
+import asyncio
+import bisect
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import logging
+import os
+import pickle
+from sqlite3 import OperationalError
+import threading
+import time
+from typing import Any
+import uuid
+
+from diskcache import EVICTION_POLICY, Cache, FanoutCache
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from classes.cache_codec import CompactDisk
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+class MemoryTier:
+    """
+    Ограниченный по объёму LRU-кэш в памяти процесса (L1 перед diskcache).
+
+    Значения хранятся pickle-байтами: размер считается честно, а каждый get отдаёт
+    свою копию — изменение полученного объекта не портит кэш (как и у diskcache).
+    У каждой записи свой срок жизни: не дольше записи на диске и не дольше ttl тира.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        """
+        :param max_bytes: (int) сколько байт (в pickle) держать в памяти.
+        :param ttl: (float) сколько секунд запись живёт в памяти.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.generation: str | None = None  # метка поколения инвалидаций diskcache, которую видел тир
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str | int, tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str | int) -> tuple[bool, Any]:
+        """:return: (найдено, значение). Попадания и промахи считает вызывающий (record)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            payload = entry[1]
+        return True, pickle.loads(payload)
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def set(self, key: str | int, value: Any, ttl: float | None = None) -> None:
+        """
+        :param ttl: (float) сколько секунд осталось жить записи на диске (None — бессрочно).
+        """
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remove(key)
+            # крупные значения не вытесняют пол-кэша ради одной записи
+            if len(payload) > self.max_bytes // 4:
+                return
+            lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+            self._entries[key] = (time.monotonic() + lifetime, payload)
+            self.size += len(payload)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: str | int) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key: str | int) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
+class CacheStats:
+    """
+    Статистика одного пространства кэша в памяти процесса: попадания, промахи, записи,
+    инвалидации и гистограммы задержек get/set.
+
+    Вытеснения (истечение срока и чистка по size_limit делает сам diskcache) считаются оценкой:
+    сколько записей должно было быть по данным этого процесса и сколько осталось на диске.
+    Служебные чтения счётчиков (get_cache с use_memory=False) в статистику не попадают.
+    """
+
+    LATENCY_BUCKETS_MS: tuple[float, ...] = (0.1, 0.5, 1, 5, 10, 50, 100, 500)
+
+    def __init__(self, entries: int = 0) -> None:
+        """
+        :param entries: (int) записей на диске на момент создания — база для оценки вытеснений.
+        """
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.base_entries = entries
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.added = 0  # записей с новым ключом
+        self.invalidations = 0  # удалено delete_cache, invalidate_tag и clear_cache
+        self.get_latency = [0] * (len(self.LATENCY_BUCKETS_MS) + 1)
+        self.set_latency = [0] * (len(self.LATENCY_BUCKETS_MS) + 1)
+
+    def _bucket(self, seconds: float) -> int:
+        return bisect.bisect_left(self.LATENCY_BUCKETS_MS, seconds * 1000)
+
+    def record_get(self, hit: bool, seconds: float) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.get_latency[self._bucket(seconds)] += 1
+
+    def record_set(self, added: bool, seconds: float) -> None:
+        with self._lock:
+            self.sets += 1
+            self.added += added
+            self.set_latency[self._bucket(seconds)] += 1
+
+    def record_invalidations(self, count: int) -> None:
+        with self._lock:
+            self.invalidations += count
+
+    def _histogram(self, counts: list[int]) -> dict[str, int]:
+        labels = [f"<={bound:g}" for bound in self.LATENCY_BUCKETS_MS] + [f">{self.LATENCY_BUCKETS_MS[-1]:g}"]
+        return dict(zip(labels, counts, strict=True))
+
+    def snapshot(self, entries: int) -> dict[str, Any]:
+        """
+        :param entries: (int) записей на диске сейчас.
+        :return: (dict) счётчики, доля попаданий, оценка вытеснений и гистограммы задержек (мс).
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "since": self.started_at,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "sets": self.sets,
+                "invalidations": self.invalidations,
+                "evictions": max(0, self.base_entries + self.added - self.invalidations - entries),
+                "get_latency_ms": self._histogram(self.get_latency),
+                "set_latency_ms": self._histogram(self.set_latency),
+            }
+
+
+class Caching:
+    """
+    Класс для кэширования данных
+
+    С memory_limit перед diskcache появляется L1 в памяти процесса (MemoryTier): горячие ключи
+    отдаются без чтения SQLite и файлов. Тир общий для всех Caching на одну папку, поэтому
+    delete_cache через любой из них сразу виден остальным. Другие процессы узнают об удалении
+    по метке поколения в самом diskcache (проверяется не чаще раза в GENERATION_CHECK секунд),
+    а перезапись значения чужим процессом видна не позже memory_ttl.
+
+    aget/aset/adelete/aget_many/aset_many — для async-кода: чтение и запись SQLite уходят
+    в отдельный небольшой пул потоков и не останавливают event loop, даже когда база занята
+    записью другого процесса. Попадание в L1 отдаётся сразу, без пула.
+    """
+
+    GENERATION_KEY: str = "caching:l1_generation"
+    COMPOSITE_TAGS_KEY: str = "caching:composite_tags"
+    TAG_SEPARATOR: str = "|"
+    GENERATION_CHECK: float = 1.0
+
+    # L1-тиры процесса по папкам кэша
+    _memory_tiers: dict[str, MemoryTier] = {}
+    _memory_tiers_lock: threading.Lock = threading.Lock()
+
+    # Пул для async-методов: свой, чтобы ожидание блокировки SQLite не занимало default executor
+    _executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="caching")
+
+    def __init__(
+        self,
+        dirname: str = None,
+        ttl: int = None,
+        memory_limit: int = None,
+        memory_ttl: int = 60,
+        size_limit: int = None,
+        eviction_policy: str = None,
+        cull_limit: int = None,
+        shards: int = 0,
+        codec: str = "pickle",
+        compress: str = "zlib",
+        compress_threshold: int = 0,
+        name: str = None,
+    ) -> None:
+        """
+        :param dirname: (str) - название папки хранения файла кэша.
+        :param ttl: (int) время актуальности кэша в секундах.
+        :param memory_limit: (int) объём L1 в памяти, байт. Не задан — только diskcache.
+        :param memory_ttl: (int) сколько секунд запись живёт в L1.
+        :param size_limit: (int) объём кэша на диске, байт (по умолчанию diskcache — 1 ГБ).
+        :param eviction_policy: (str) политика вытеснения diskcache: least-recently-stored,
+            least-recently-used, least-frequently-used или none.
+        :param cull_limit: (int) сколько записей удалять за одну запись при превышении size_limit.
+        :param shards: (int) число шардов FanoutCache для параллельной записи; 0 — один Cache.
+        :param codec: (str) кодек значений (CompactDisk): pickle, json или msgpack.
+        :param compress: (str) сжатие крупных значений: zlib или zstd.
+        :param compress_threshold: (int) сжимать значения больше этого размера, байт; 0 — не сжимать.
+        :param name: (str) имя пространства кэша (CacheRegistry).
+        """
+        # Признак успешности инициализации
+        self.__initialized: bool = True
+        self.__memory: MemoryTier | None = None
+        self.name = name
+        self.stats = CacheStats()
+
+        # Сообщение об ошибке
+        self.__error_message: str = ""
+
+        # Проверка параметров
+        if dirname and type(dirname) is not str:
+            self.__error_message = "Переданный dirname не является строкой."
+            logger.error(self.__error_message)
+            self.__initialized = False
+            return None
+        if ttl and type(ttl) is not int:
+            self.__error_message = "Переданный ttl не является целым числом."
+            logger.error(self.__error_message)
+            self.__initialized = False
+            return None
+        if ttl and ttl < 0:
+            self.__error_message = "Переданн отрицательный ttl."
+            logger.error(self.__error_message)
+            self.__initialized = False
+            return None
+        if eviction_policy is not None and eviction_policy not in EVICTION_POLICY:
+            self.__error_message = f"Неизвестная политика вытеснения {eviction_policy}."
+            logger.error(self.__error_message)
+            self.__initialized = False
+            return None
+        if shards and (type(shards) is not int or shards < 0):
+            self.__error_message = "Переданный shards не является неотрицательным целым числом."
+            logger.error(self.__error_message)
+            self.__initialized = False
+            return None
+        codec_error = CompactDisk.check_options(codec, compress)
+        if codec_error:
+            self.__error_message = codec_error
+            logger.error(self.__error_message)
+            self.__initialized = False
+            return None
+
+        self.__dirname = dirname if dirname else None
+        self.__ttl = ttl if ttl else None
+        self.__shards = shards
+
+        # Инициализация кэшировальщика
+        self.__cache = None
+        try:
+            self.__cache = self._open(
+                self.__dirname,
+                shards,
+                size_limit=size_limit,
+                eviction_policy=eviction_policy,
+                cull_limit=cull_limit,
+                disk_codec=codec,
+                disk_compress=compress,
+                disk_compress_threshold=compress_threshold,
+            )
+        except OperationalError as e:
+            self.__error_message = f"При инициализации кэшировальщика возникла ошибка. [{e!s}]"
+            logger.error(self.__error_message)
+            self.__initialized = False
+            return None
+        except Exception as e:
+            self.__error_message = f"При инициализации кэшировальщика возникла непредвиденная ошибка. [{e!s}]"
+            logger.error(self.__error_message)
+            self.__initialized = False
+            return None
+
+        self.__memory = (
+            self._get_memory_tier(self.__cache.directory, memory_limit, memory_ttl) if memory_limit else None
+        )
+        self.stats = CacheStats(len(self.__cache))
+
+    @staticmethod
+    def _open(dirname: str | None, shards: int, **config: Any) -> Cache | FanoutCache:
+        """
+        diskcache с индексом тегов и CompactDisk; заданные настройки сохраняются в его базе.
+        Настройки кодека передаются всегда: иначе diskcache взял бы сохранённые прежним запуском.
+        """
+        options = {option: value for option, value in config.items() if value is not None}
+        if shards:
+            return FanoutCache(dirname, shards=shards, tag_index=True, disk=CompactDisk, **options)
+        return Cache(dirname, tag_index=True, disk=CompactDisk, **options)
+
+    @classmethod
+    def _get_memory_tier(cls, directory: str, memory_limit: int, memory_ttl: int) -> MemoryTier:
+        """Один L1-тир на папку: берётся самый большой из запрошенных объёмов."""
+        with cls._memory_tiers_lock:
+            tier = cls._memory_tiers.get(directory)
+            if tier is None:
+                tier = cls._memory_tiers[directory] = MemoryTier(memory_limit, memory_ttl)
+            tier.max_bytes = max(tier.max_bytes, memory_limit)
+            return tier
+
+    def _sync_memory(self) -> None:
+        """Сброс L1, если другой процесс что-то удалил из diskcache (не чаще GENERATION_CHECK)."""
+        now = time.monotonic()
+        if now - self.__memory.checked_at < self.GENERATION_CHECK:
+            return
+        first_check = not self.__memory.checked_at
+        self.__memory.checked_at = now
+        generation = self.__cache.get(self.GENERATION_KEY)
+        if not first_check and generation != self.__memory.generation:
+            self.__memory.clear()
+        self.__memory.generation = generation
+
+    def _invalidate_memory(self, key: str | int = None) -> None:
+        """
+        Удаление из L1 этого процесса и сигнал остальным через метку поколения в diskcache.
+        Вызывается после изменения diskcache, чтобы L1 не успел снова заполниться старым значением.
+        Работает и у экземпляров без memory_limit: тир папки мог завести другой экземпляр.
+        """
+        tier = self.__memory or self._memory_tiers.get(self.__cache.directory)
+        if tier is not None:
+            if key is None:
+                tier.clear()
+            else:
+                tier.delete(key)
+        # метка, а не счётчик: clear_cache стирает и её, и счётчик мог бы вернуться к старому значению
+        generation = uuid.uuid4().hex
+        self.__cache.set(self.GENERATION_KEY, generation)
+        if tier is not None:
+            tier.generation = generation
+
+    def _memory_synced(self) -> bool:
+        """L1 включён и недавно сверялся с diskcache — его можно читать без обращения к диску."""
+        return self.__memory is not None and time.monotonic() - self.__memory.checked_at < self.GENERATION_CHECK
+
+    def memory_stats(self) -> dict[str, int] | None:
+        """Статистика L1: записей, байт, попаданий и промахов. None — L1 не включён."""
+        if self.__memory is None:
+            return None
+        return {
+            "entries": len(self.__memory),
+            "bytes": self.__memory.size,
+            "max_bytes": self.__memory.max_bytes,
+            "hits": self.__memory.hits,
+            "misses": self.__memory.misses,
+        }
+
+    def check_cache(self, key: str | int = None) -> bool:
+        """
+        Проверка наличия параметра в кэше.
+        :param key: (int|str) параметр в кэше.
+        :return: (bool) результат проверки.
+        """
+        # Проверка параметров
+        if key is None:
+            return False
+        if type(key) not in [int, str]:
+            self.__error_message = "Переданный key не является целым числом или строкой."
+            logger.error(self.__error_message)
+            return False
+
+        if self.__memory is not None:
+            self._sync_memory()
+            if self.__memory.get(key)[0]:
+                return True
+        return key in self.__cache
+
+    def get_cache(self, key: str | int = None, use_memory: bool = True) -> Any:
+        """
+        Получение данных из кэша.
+        :param key: (int|str) ключ размещения данных в кэше.
+        :param use_memory: (bool) False — читать только diskcache (счётчики, которые меняют другие процессы).
+        :return: (any) python-объект данных из кэша.
+        """
+        # Проверка параметров
+        if key is None:
+            self.__error_message = "Параметр key не задан."
+            logger.error(self.__error_message)
+            return None
+        if key and type(key) not in [int, str]:
+            self.__error_message = "Переданный key не является целым числом или строкой."
+            logger.error(self.__error_message)
+            return None
+
+        # Получение данных из кэша
+        started = time.perf_counter()
+        try:
+            value = self._read(key, use_memory)
+        except TypeError:
+            self.__error_message = "Не удалось получить данные из кэша."
+            logger.error(self.__error_message)
+            return False
+        except Exception:
+            self.__error_message = "При получении данных из кэша возникла непредвиденная ошибка."
+            logger.error(self.__error_message)
+            return False
+        if use_memory:
+            self.stats.record_get(value is not None, time.perf_counter() - started)
+        return value
+
+    def _read(self, key: str | int, use_memory: bool) -> Any:
+        """Чтение через L1 (если он есть и use_memory) или прямо из diskcache."""
+        if self.__memory is None or not use_memory:
+            return self.__cache.get(key)
+
+        self._sync_memory()
+        found, value = self.__memory.get(key)
+        self.__memory.record(found)
+        if found:
+            return value
+        value, expire_time = self.__cache.get(key, expire_time=True)
+        if value is not None:
+            self.__memory.set(key, value, expire_time - time.time() if expire_time else None)
+        return value
+
+    def delete_cache(self, key: str | int = None) -> bool:
+        """
+        Удаление данных из кэша (например, для инвалидации после правок в админке).
+        :param key: (int|str) ключ размещения данных в кэше.
+        :return: (bool) True, если ключ был и удалился.
+        """
+        # Проверка параметров
+        if key is None:
+            self.__error_message = "Параметр key не задан."
+            logger.error(self.__error_message)
+            return False
+        if key and type(key) not in [int, str]:
+            self.__error_message = "Переданный key не является целым числом или строкой."
+            logger.error(self.__error_message)
+            return False
+
+        # Удаление данных из кэша
+        try:
+            deleted = self.__cache.delete(key)
+            self._invalidate_memory(key)
+            self.stats.record_invalidations(int(deleted))
+            return deleted
+        except Exception:
+            self.__error_message = "При удалении данных из кэша возникла непредвиденная ошибка."
+            logger.error(self.__error_message)
+            return False
+
+    def incr_cache(self, key: str | int = None, delta: int = 1, ttl: int = None) -> int | None:
+        """
+        Атомарное увеличение счётчика в кэше (безопасно между процессами).
+        :param key: (int|str) ключ счётчика.
+        :param delta: (int) на сколько увеличить.
+        :param ttl: (int) время жизни счётчика в секундах; по умолчанию ttl кэша.
+        :return: (int|None) новое значение счётчика или None при ошибке.
+        """
+        # Проверка параметров
+        if key is None:
+            self.__error_message = "Параметр key не задан."
+            logger.error(self.__error_message)
+            return None
+        if key and type(key) not in [int, str]:
+            self.__error_message = "Переданный key не является целым числом или строкой."
+            logger.error(self.__error_message)
+            return None
+
+        # Увеличение счётчика
+        try:
+            if self.__memory is not None:
+                self.__memory.delete(key)
+            value = self.__cache.incr(key, delta, default=0)
+            self.__cache.touch(key, expire=ttl or self.__ttl)
+            return value
+        except Exception:
+            self.__error_message = "При увеличении счётчика в кэше возникла непредвиденная ошибка."
+            logger.error(self.__error_message)
+            return None
+
+    def _tag(self, tag: str | tuple[str, ...] | None) -> str | None:
+        """
+        Тег для diskcache. У записи diskcache один тег, поэтому несколько тегов склеиваются
+        в составной, а он регистрируется в самом кэше — invalidate_tag любого процесса его найдёт.
+        """
+        if tag is None or type(tag) is str:
+            return tag
+        tags = sorted(set(tag))
+        if len(tags) == 1:
+            return tags[0]
+        composite = self.TAG_SEPARATOR.join(tags)
+        with self.__cache.transact():
+            registered = self.__cache.get(self.COMPOSITE_TAGS_KEY, frozenset())
+            if composite not in registered:
+                self.__cache.set(self.COMPOSITE_TAGS_KEY, registered | {composite})
+        return composite
+
+    def invalidate_tag(self, *tags: str) -> int:
+        """
+        Удаление всех записей с указанными тегами (индекс тегов diskcache, без перебора ключей).
+        L1 сбрасывается целиком — в памяти тегов нет, а инвалидации редки по сравнению с чтениями.
+        :param tags: (str) теги записей.
+        :return: (int) сколько записей удалено.
+        """
+        # Проверка параметров
+        if not tags or any(type(tag) is not str for tag in tags):
+            self.__error_message = "Переданный tag не является строкой."
+            logger.error(self.__error_message)
+            return 0
+
+        # Удаление данных из кэша
+        try:
+            # записи с несколькими тегами лежат под составным тегом — сбрасываем и все составные с этими тегами
+            composites = self.__cache.get(self.COMPOSITE_TAGS_KEY, frozenset())
+            targets = set(tags) | {c for c in composites if set(c.split(self.TAG_SEPARATOR)) & set(tags)}
+            evicted = sum(self.__cache.evict(tag) for tag in targets)
+            self._invalidate_memory()
+            self.stats.record_invalidations(evicted)
+            logger.debug("Кэш по тегам %s сброшен: %d записей", ", ".join(tags), evicted)
+            return evicted
+        except Exception:
+            self.__error_message = "При сбросе кэша по тегу возникла непредвиденная ошибка."
+            logger.error(self.__error_message)
+            return 0
+
+    def clear_cache(self) -> int:
+        """
+        Удаление всех данных из кэша.
+        :return: (int) сколько записей удалено.
+        """
+        try:
+            cleared = self.__cache.clear()
+            self._invalidate_memory()
+            self.stats.record_invalidations(cleared)
+            return cleared
+        except Exception:
+            self.__error_message = "При очистке кэша возникла непредвиденная ошибка."
+            logger.error(self.__error_message)
+            return 0
+
+    async def arun(self, fn: Callable, *args: Any) -> Any:
+        """
+        Синхронная работа с кэшем в пуле потоков кэша, чтобы не блокировать event loop.
+        Для обёрток над кэшем (квота, предохранитель), у которых нет своих async-методов.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def aget(self, key: str | int = None, use_memory: bool = True) -> Any:
+        """
+        Асинхронный get_cache: чтение diskcache выполняется в пуле потоков.
+        :param key: (int|str) ключ размещения данных в кэше.
+        :param use_memory: (bool) False — читать только diskcache.
+        :return: (any) python-объект данных из кэша.
+        """
+        if use_memory and type(key) in [int, str] and self._memory_synced():
+            started = time.perf_counter()
+            found, value = self.__memory.get(key)
+            if found:
+                self.__memory.record(True)
+                self.stats.record_get(True, time.perf_counter() - started)
+                return value
+        return await self.arun(self.get_cache, key, use_memory)
+
+    async def aget_many(self, keys: Iterable[str | int], use_memory: bool = True) -> dict[str | int, Any]:
+        """
+        Пакетное чтение: попадания в L1 сразу, остальные ключи — одним заходом в пул потоков.
+        :param keys: ключи размещения данных в кэше.
+        :param use_memory: (bool) False — читать только diskcache.
+        :return: (dict) {ключ: значение} для найденных ключей.
+        """
+        found: dict[str | int, Any] = {}
+        rest: list[str | int] = []
+        synced = use_memory and self._memory_synced()
+        for key in dict.fromkeys(keys):
+            started = time.perf_counter()
+            hit, value = self.__memory.get(key) if synced and type(key) in [int, str] else (False, None)
+            if hit:
+                self.__memory.record(True)
+                self.stats.record_get(True, time.perf_counter() - started)
+                found[key] = value
+            else:
+                rest.append(key)
+
+        def read() -> dict[str | int, Any]:
+            values = {key: self.get_cache(key, use_memory) for key in rest}
+            return {key: value for key, value in values.items() if value is not None and value is not False}
+
+        if rest:
+            found.update(await self.arun(read))
+        return found
+
+    async def aset(
+        self, key: str | int = None, value: Any = None, ttl: int = None, tag: str | tuple[str, ...] = None
+    ) -> bool:
+        """Асинхронный set_cache. Аргументы и результат те же."""
+        return await self.arun(self.set_cache, key, value, ttl, tag)
+
+    async def aset_many(self, items: dict[str | int, Any], ttl: int = None, tag: str | tuple[str, ...] = None) -> bool:
+        """
+        Пакетная запись одной транзакцией SQLite в пуле потоков.
+        :param items: (dict) {ключ: python-объект}.
+        :param ttl: (int) время жизни записей в секундах; по умолчанию ttl кэша.
+        :param tag: (str|tuple) тег или теги всех записей.
+        :return: (bool) True, если записались все.
+        """
+
+        def write() -> bool:
+            try:
+                with self.__cache.transact():
+                    results = [self.set_cache(key, value, ttl, tag) for key, value in items.items()]
+                return all(results)
+            except Exception:
+                self.__error_message = "При пакетном кэшировании данных возникла непредвиденная ошибка."
+                logger.error(self.__error_message)
+                return False
+
+        return await self.arun(write) if items else True
+
+    async def adelete(self, key: str | int = None) -> bool:
+        """Асинхронный delete_cache. Аргументы и результат те же."""
+        return await self.arun(self.delete_cache, key)
+
+    async def ainvalidate_tag(self, *tags: str) -> int:
+        """Асинхронный invalidate_tag. Аргументы и результат те же."""
+        return await self.arun(self.invalidate_tag, *tags)
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Статистика пространства: счётчики этого процесса (CacheStats), записи и байты на диске,
+        L1 и настройки diskcache.
+        """
+        entries = len(self.__cache)
+        return {
+            **self.stats.snapshot(entries),
+            "entries": entries,
+            "bytes": self.__cache.volume(),
+            "memory": self.memory_stats(),
+            "settings": self.diskcache_settings(),
+        }
+
+    def diskcache_settings(self) -> dict[str, Any]:
+        """
+        Действующие настройки diskcache (сохранённые в его базе).
+        :return: (dict) directory, shards, size_limit (на все шарды), eviction_policy, cull_limit, ttl
+            и кодек значений: codec, compress, compress_threshold.
+        """
+        disk = self.__cache.disk
+        return {
+            "directory": self.__cache.directory,
+            "shards": self.__shards,
+            "size_limit": int(self.__cache.size_limit * (self.__shards or 1)),
+            "eviction_policy": self.__cache.eviction_policy,
+            "cull_limit": self.__cache.cull_limit,
+            "ttl": self.__ttl,
+            "codec": disk.codec,
+            "compress": disk.compress,
+            "compress_threshold": disk.compress_threshold,
+        }
+
+    def get_status(self) -> bool:
+        return self.__initialized
+
+    def set_cache(
+        self, key: str | int = None, value: Any = None, ttl: int = None, tag: str | tuple[str, ...] = None
+    ) -> bool:
+        """
+        Размещение данных в кэш.
+        :param key: (int|str) ключ размещения данных в кэше.
+        :param value: (any) python-объект.
+        :param ttl: (int) время жизни записи в секундах; по умолчанию ttl кэша.
+        :param tag: (str|tuple) тег или теги записи (CacheTags) — по любому из них запись сбрасывает invalidate_tag.
+        :return: (bool) результат кэширования.
+        """
+        # Проверка параметров
+        if key is None:
+            self.__error_message = "Параметр key не задан."
+            logger.error(self.__error_message)
+            return False
+        if key and type(key) not in [int, str]:
+            self.__error_message = "Переданный key не является целым числом или строкой."
+            logger.error(self.__error_message)
+            return False
+        if (
+            tag is not None
+            and type(tag) is not str
+            and not (type(tag) is tuple and tag and all(type(t) is str for t in tag))
+        ):
+            self.__error_message = "Переданный tag не является строкой или кортежем строк."
+            logger.error(self.__error_message)
+            return False
+
+        # Кэширование данных
+        started = time.perf_counter()
+        try:
+            expire, tags = ttl or self.__ttl, self._tag(tag)
+            # новый ключ — одна запись через add (он же и счётчик новых записей для оценки вытеснений),
+            # и только существующий перезаписывается set
+            added = self.__cache.add(key, value, expire=expire, tag=tags)
+            result = added or self.__cache.set(key, value, expire=expire, tag=tags)
+            if self.__memory is not None:
+                self.__memory.delete(key)
+            self.stats.record_set(added, time.perf_counter() - started)
+            return result
+        except TypeError:
+            self.__error_message = "Не удалось закэшировать данные."
+            logger.error(self.__error_message)
+            return False
+        except Exception:
+            self.__error_message = "При кэшировании данных возникла непредвиденная ошибка."
+            logger.error(self.__error_message)
+            return False
+
+
+class CacheRegistry:
+    """
+    Пространства кэша из settings.CACHE_NAMESPACES: один экземпляр Caching на имя.
+
+    У каждого пространства своя папка diskcache (по умолчанию CACHE_DIRECTORY/<имя>), а значит
+    свои size_limit, политика вытеснения, cull_limit, ttl по умолчанию и число шардов.
+    """
+
+    OPTIONS: tuple[str, ...] = (
+        "ttl",
+        "memory_limit",
+        "memory_ttl",
+        "size_limit",
+        "eviction_policy",
+        "cull_limit",
+        "shards",
+        "codec",
+        "compress",
+        "compress_threshold",
+    )
+
+    _instances: dict[str, Caching] = {}
+    _lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def names(cls) -> list[str]:
+        return list(getattr(settings, "CACHE_NAMESPACES", {}))
+
+    @classmethod
+    def get_stats(cls) -> dict[str, dict[str, Any]]:
+        """Статистика всех пространств из settings.CACHE_NAMESPACES."""
+        return {name: cls.get(name).get_stats() for name in cls.names()}
+
+    @classmethod
+    def get(cls, name: str) -> Caching:
+        """
+        Кэш пространства name.
+        :param name: (str) имя из settings.CACHE_NAMESPACES.
+        :return: (Caching) общий на процесс экземпляр.
+        """
+        cache = cls._instances.get(name)
+        if cache is not None:
+            return cache
+        with cls._lock:
+            cache = cls._instances.get(name)
+            if cache is None:
+                config = getattr(settings, "CACHE_NAMESPACES", {}).get(name)
+                if config is None:
+                    raise ImproperlyConfigured(f"Пространство кэша {name} не описано в CACHE_NAMESPACES")
+                unknown = set(config) - set(cls.OPTIONS) - {"directory"}
+                if unknown:
+                    raise ImproperlyConfigured(f"Неизвестные параметры пространства кэша {name}: {sorted(unknown)}")
+                directory = config.get("directory") or os.path.join(settings.CACHE_DIRECTORY, name)
+                options = {option: config[option] for option in cls.OPTIONS if option in config}
+                cache = Caching(directory, name=name, **options)
+                if not cache.get_status():
+                    # неверное значение параметра (например, опечатка в eviction_policy): причина уже в логе
+                    raise ImproperlyConfigured(f"Пространство кэша {name} не создано, см. ошибку Caching в логе")
+                cls._instances[name] = cache
+            return cache
+
+
+class CacheNamespace:
+    """
+    Пространство кэша атрибутом класса: экземпляр Caching берётся из CacheRegistry при обращении,
+    а не при импорте модуля, и следует за настройками (в тестах — за временной CACHE_DIRECTORY).
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        :param name: (str) имя из settings.CACHE_NAMESPACES.
+        """
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type) -> Caching:
+        return CacheRegistry.get(self.name)
+
+
+class CacheTags:
+    """
+    Теги записей кэша обработчиков (пространство handlers) и их сброс.
+
+    Записи, построенные по таблицам, кладутся с тегом (set_cache(..., tag=CacheTags.MOVIES)),
+    а сигналы моделей (lists/signals.py, postcard/signals.py, bar/signals.py) сбрасывают тег
+    при любом изменении. Массовые операции без сигналов (bulk_create, bulk_update, QuerySet.update)
+    сбрасывают теги сами через invalidate/ainvalidate.
+
+    Каждый сброс заодно обновляет версию набора данных тега — время изменения в наносекундах.
+    По версиям views отвечают на условные GET (utils/conditional.py) без запросов к БД.
+    """
+
+    MOVIES: str = "movies"
+    NOTES: str = "notes"
+    POSTCARDS: str = "postcards"
+    BAR: str = "bar"
+    USERS: str = "users"
+
+    VERSION_KEY: str = "dataset_version:{}"
+    # версия живёт дольше записей: после её вытеснения клиенты один раз скачают данные заново
+    VERSION_TTL: int = 60 * 60 * 24 * 30
+
+    cache: Caching = CacheNamespace("handlers")
+
+    @classmethod
+    def invalidate(cls, *tags: str) -> int:
+        """
+        Сброс записей с тегами и обновление версий их наборов данных.
+        :param tags: (str) теги CacheTags.
+        :return: (int) сколько записей удалено.
+        """
+        stamp = time.time_ns()
+        for tag in tags:
+            cls.cache.set_cache(cls.VERSION_KEY.format(tag), stamp, ttl=cls.VERSION_TTL)
+        return cls.cache.invalidate_tag(*tags)
+
+    @classmethod
+    async def ainvalidate(cls, *tags: str) -> int:
+        """Асинхронный invalidate. Аргументы и результат те же."""
+        stamp = time.time_ns()
+        await cls.cache.aset_many({cls.VERSION_KEY.format(tag): stamp for tag in tags}, ttl=cls.VERSION_TTL)
+        return await cls.cache.ainvalidate_tag(*tags)
+
+    @classmethod
+    async def versions(cls, *tags: str) -> dict[str, int]:
+        """
+        Версии наборов данных: время последнего изменения в наносекундах.
+        Читаются мимо L1 — их меняют и другие процессы. Версия, которой ещё нет (или её вытеснили),
+        заводится текущим временем: она заведомо новее всего, что могли закэшировать клиенты.
+        :param tags: (str) теги CacheTags.
+        :return: (dict) {тег: версия}.
+        """
+        keys = {cls.VERSION_KEY.format(tag): tag for tag in tags}
+        found = await cls.cache.aget_many(keys, use_memory=False)
+        missing = {key: time.time_ns() for key in keys if key not in found}
+        if missing:
+            await cls.cache.aset_many(missing, ttl=cls.VERSION_TTL)
+        return {tag: found.get(key) or missing[key] for key, tag in keys.items()}
@@ -0,0 +1,136 @@
+import logging
+import time
+
+from classes.caching import Caching
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Предохранитель для внешнего API: closed → open → half-open → closed.
+
+    closed    — запросы идут как обычно, успехи и сбои считаются в окне window секунд;
+                если сбоев не меньше failure_rate при хотя бы min_calls запросах — цепь размыкается.
+                Успехи считаются, только пока в окне есть сбои: без них успешный запрос
+                ничего не пишет в diskcache.
+    open      — запросы сразу отклоняются open_duration секунд, не дожидаясь таймаута.
+    half-open — после паузы пропускается probe_calls пробных запросов: успех замыкает цепь,
+                сбой снова размыкает её.
+
+    Состояние и счётчики лежат в diskcache, поэтому общие для всех воркеров и management-команд.
+    """
+
+    KEY_PREFIX: str = "circuit"
+    STATE_TTL: int = 60 * 60  # запись о разомкнутой цепи не нужна дольше часа
+    PROBE_WAIT: float = 1.0  # сколько подождать, пока чужой пробный запрос не решит судьбу цепи
+
+    def __init__(
+        self,
+        cache: Caching,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window: int = 60,
+        open_duration: float = 30.0,
+        probe_calls: int = 1,
+    ) -> None:
+        """
+        :param cache: (Caching) хранилище состояния.
+        :param name: (str) имя цепи (часть ключей в кэше).
+        :param failure_rate: (float) доля сбоев в окне, при которой цепь размыкается.
+        :param min_calls: (int) минимум запросов в окне, чтобы доля сбоев что-то значила.
+        :param window: (int) окно подсчёта, сек.
+        :param open_duration: (float) сколько цепь остаётся разомкнутой, сек.
+        :param probe_calls: (int) сколько пробных запросов пропускать в half-open.
+        """
+        self.cache = cache
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_duration = open_duration
+        self.probe_calls = probe_calls
+
+    def _key(self, *parts: str | int) -> str:
+        return ":".join(str(part) for part in (self.KEY_PREFIX, self.name, *parts))
+
+    def _opened_until(self) -> float | None:
+        """Момент, до которого цепь разомкнута. None — цепь замкнута."""
+        return self.cache.get_cache(self._key("open_until"), use_memory=False)
+
+    @property
+    def state(self) -> str:
+        opened_until = self._opened_until()
+        if opened_until is None:
+            return "closed"
+        return "open" if time.time() < opened_until else "half-open"
+
+    def allow(self) -> bool:
+        """Можно ли сейчас делать запрос. В half-open занимает слот пробного запроса."""
+        opened_until = self._opened_until()
+        if opened_until is None:
+            return True
+        if time.time() < opened_until:
+            return False
+        probes = self.cache.incr_cache(self._key("probes"), ttl=int(self.open_duration) + 1)
+        return probes is not None and probes <= self.probe_calls
+
+    def retry_after(self) -> float:
+        """Сколько секунд подождать, прежде чем запрос будет пропущен (0 — можно сейчас)."""
+        opened_until = self._opened_until()
+        if opened_until is None:
+            return 0.0
+        if time.time() < opened_until:
+            return opened_until - time.time()
+        probes = self.cache.get_cache(self._key("probes"), use_memory=False) or 0
+        return 0.0 if probes < self.probe_calls else self.PROBE_WAIT
+
+    def record_success(self) -> None:
+        opened_until = self._opened_until()
+        if opened_until is not None and time.time() >= opened_until:
+            self._close()
+        elif opened_until is None and self._has_failures():
+            self.cache.incr_cache(self._key("ok", self._bucket()), ttl=self.window * 2)
+
+    def record_failure(self) -> None:
+        opened_until = self._opened_until()
+        if opened_until is not None:
+            # сбой пробного запроса — снова размыкаем; сбои при уже разомкнутой цепи не считаем
+            if time.time() >= opened_until:
+                self._open("пробный запрос не прошёл")
+            return
+
+        self.cache.incr_cache(self._key("fail", self._bucket()), ttl=self.window * 2)
+        ok, failed = self._counts()
+        if ok + failed >= self.min_calls and failed / (ok + failed) >= self.failure_rate:
+            self._open(f"сбоев {failed} из {ok + failed} за {self.window} сек")
+
+    def _bucket(self) -> int:
+        return int(time.time() // self.window)
+
+    def _has_failures(self) -> bool:
+        bucket = self._bucket()
+        return any(self.cache.get_cache(self._key("fail", b), use_memory=False) for b in (bucket, bucket - 1))
+
+    def _counts(self) -> tuple[int, int]:
+        """Успехи и сбои за текущее и предыдущее окно (скользящее окно без хранения каждого запроса)."""
+        bucket = self._bucket()
+        ok = sum(self.cache.get_cache(self._key("ok", b), use_memory=False) or 0 for b in (bucket, bucket - 1))
+        failed = sum(self.cache.get_cache(self._key("fail", b), use_memory=False) or 0 for b in (bucket, bucket - 1))
+        return ok, failed
+
+    def _open(self, reason: str) -> None:
+        self.cache.set_cache(self._key("open_until"), time.time() + self.open_duration, ttl=self.STATE_TTL)
+        self.cache.delete_cache(self._key("probes"))
+        logger.warning("Цепь %s разомкнута на %.0f сек: %s", self.name, self.open_duration, reason)
+
+    def _close(self) -> None:
+        self.cache.delete_cache(self._key("open_until"))
+        self.cache.delete_cache(self._key("probes"))
+        bucket = self._bucket()
+        for b in (bucket, bucket - 1):
+            self.cache.delete_cache(self._key("ok", b))
+            self.cache.delete_cache(self._key("fail", b))
+        logger.warning("Цепь %s снова замкнута", self.name)
@@ -1,11 +1,22 @@
-from dataclasses import dataclass
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from email.utils import parsedate_to_datetime
 import logging
+import threading
+import time
 from typing import Any, ClassVar
+from urllib.parse import urlencode
 
 from django.conf import settings
 import httpx
+import pendulum
 
-from classes.caching import Caching
+from classes.caching import CacheRegistry, Caching
+from classes.circuit_breaker import CircuitBreaker
+from classes.rate_limit import DailyQuota, TokenBucket
+from classes.single_flight import SingleFlight
 
 
 # Configure logger
@@ -16,16 +27,58 @@ logger = logging.getLogger(__name__)
 class KP:
     """
     Класс для работы с неофициальным api кинопоиска https://poiskkino.dev
+
+    HTTP-клиенты общие на весь процесс: соединения держатся открытыми (keep-alive, HTTP/2),
+    поэтому повторные запросы не платят за TCP+TLS рукопожатие. Асинхронный клиент
+    создаётся и закрывается в ASGI lifespan (filmoclub/lifespan.py).
+
+    Кэш ответов работает по схеме stale-while-revalidate: CACHE_DURATION ответ считается свежим,
+    потом ещё до CACHE_STALE_DURATION отдаётся сразу, а в фоне запрашивается заново.
+    Окончательные отказы API (нет такого фильма, неверный id) кэшируются на NEGATIVE_CACHE_DURATION.
     """
 
-    CACHE_DIRECTORY: str = "app_cache"
     CACHE_DURATION: int = 60 * 2  # 2 minutes
-    cache: Caching = Caching(CACHE_DIRECTORY, CACHE_DURATION)
+    cache: Caching | None = None  # по умолчанию пространство kp из CacheRegistry
+
+    CACHE_STALE_DURATION: ClassVar[int] = 60 * 60 * 24  # 1 day
+    NEGATIVE_CACHE_DURATION: ClassVar[int] = 60 * 10  # 10 minutes
+    NEGATIVE_STATUS_CODES: ClassVar[frozenset[int]] = frozenset({400, 404, 422})
 
     error: str | None = None
-    BASE_URL: ClassVar[str] = "https://api.poiskkino.dev/v1.4/"
+    # всегда со слешем на конце: к нему дописываются эндпоинты (KP_Movie.BASE_URL = BASE_URL + "movie")
+    BASE_URL: ClassVar[str] = getattr(settings, "KP_BASE_URL", "https://api.poiskkino.dev/v1.4/").rstrip("/") + "/"
     headers: ClassVar[dict[str, str]] = None  # Initialized in __post_init__
 
+    # Настройки пула соединений
+    TIMEOUT: ClassVar[float] = 10.0
+    LIMITS: ClassVar[httpx.Limits] = httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30)
+
+    # Ограничение частоты: 429 повторяем не больше MAX_RETRIES раз, ждём по Retry-After (но не дольше MAX_RETRY_AFTER)
+    MAX_RETRIES: ClassVar[int] = 3
+    MAX_RETRY_AFTER: ClassVar[float] = 60.0
+    _limiter: ClassVar[TokenBucket | None] = None
+
+    # Предохранитель: при падении API запросы сразу отклоняются, а не ждут TIMEOUT каждый
+    BREAKER_FAILURE_RATE: ClassVar[float] = 0.5
+    BREAKER_MIN_CALLS: ClassVar[int] = 5
+    BREAKER_OPEN_DURATION: ClassVar[float] = 30.0
+    CIRCUIT_OPEN_ERROR: ClassVar[str] = "Kinopoisk API is unavailable (circuit open)"
+
+    # Одинаковые одновременные запросы (два человека добавляют один фильм, команда обновления
+    # пересеклась с пользователем) уходят в API один раз — остальные ждут его ответа
+    _flights: ClassVar[SingleFlight] = SingleFlight()
+
+    # Фоновое обновление устаревших записей кэша
+    _refresh_executor: ClassVar[ThreadPoolExecutor] = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kp-refresh")
+    _refresh_tasks: ClassVar[set[asyncio.Task]] = set()
+
+    # Клиенты общие для KP и всех наследников — поэтому везде обращаемся через KP, а не cls
+    _client: ClassVar[httpx.Client | None] = None
+    _client_lock: ClassVar[threading.Lock] = threading.Lock()
+    _async_client: ClassVar[httpx.AsyncClient | None] = None
+    _async_client_loop: ClassVar[asyncio.AbstractEventLoop | None] = None
+    _async_client_closer: ClassVar[asyncio.Task | None] = None
+
     def __post_init__(self) -> None:
         """Initialize headers with API key from settings."""
         try:
@@ -35,73 +88,403 @@ class KP:
             self.headers = {}
             self.error = "Missing KP_API_TOKEN in settings"
 
-    def _make_request(self, url: str, params: dict[str, Any] | None = None) -> dict | None:
+        if self.cache is None:
+            self.cache = CacheRegistry.get("kp")
+        # Суточная квота общая для всех процессов: счётчик лежит в том же diskcache
+        self.quota = DailyQuota(self.cache, getattr(settings, "KP_DAILY_QUOTA", 0))
+        # Состояние предохранителя тоже в diskcache: общее для воркеров и команд
+        self.breaker = CircuitBreaker(
+            self.cache,
+            "kp",
+            failure_rate=self.BREAKER_FAILURE_RATE,
+            min_calls=self.BREAKER_MIN_CALLS,
+            open_duration=self.BREAKER_OPEN_DURATION,
+        )
+
+    @classmethod
+    def get_limiter(cls) -> TokenBucket:
+        """Общий на процесс лимитер запросов (KP_RATE_LIMIT запросов в секунду)."""
+        if KP._limiter is None:
+            rate = getattr(settings, "KP_RATE_LIMIT", 5)
+            KP._limiter = TokenBucket(rate=rate, capacity=max(int(rate), 1))
+        return KP._limiter
+
+    @classmethod
+    def get_client(cls) -> httpx.Client:
         """
-        Make an HTTP request to the Kinopoisk API with caching.
+        Общий на процесс синхронный клиент (потокобезопасный).
+        API-ключ в клиент не зашит: тот же пул используется и для постеров со сторонних хостов.
+        """
+        with KP._client_lock:
+            if KP._client is None or KP._client.is_closed:
+                KP._client = httpx.Client(http2=True, timeout=cls.TIMEOUT, limits=cls.LIMITS)
+            return KP._client
 
-        Args:
-            url: API endpoint URL (relative to BASE_URL).
-            params: Optional query parameters for the request.
+    @classmethod
+    def get_async_client(cls) -> httpx.AsyncClient:
+        """
+        Общий на процесс асинхронный клиент.
+        Соединения httpx привязаны к event loop, поэтому в новом цикле (например, asyncio.run
+        в management-командах) создаём новый клиент, а не переиспользуем чужой.
+        Клиент закрывается вместе со своим циклом: asyncio.run и async_to_sync в конце отменяют
+        оставшиеся задачи, и задача-сторож закрывает соединения, пока цикл ещё работает.
+        """
+        loop = asyncio.get_running_loop()
+        if KP._async_client is None or KP._async_client.is_closed or KP._async_client_loop is not loop:
+            cls._discard_async_client()
+            KP._async_client = httpx.AsyncClient(http2=True, timeout=cls.TIMEOUT, limits=cls.LIMITS)
+            KP._async_client_loop = loop
+            KP._async_client_closer = loop.create_task(cls._close_with_loop(KP._async_client))
+            logger.debug("Создан общий httpx.AsyncClient")
+        return KP._async_client
+
+    @staticmethod
+    async def _close_with_loop(client: httpx.AsyncClient) -> None:
+        """Задача-сторож: ждёт отмены (конец цикла или aclose_clients) и закрывает клиент."""
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            await client.aclose()
+
+    @staticmethod
+    def _discard_async_client() -> None:
+        """Закрытие клиента чужого цикла перед заменой."""
+        client, loop = KP._async_client, KP._async_client_loop
+        KP._async_client, KP._async_client_loop, KP._async_client_closer = None, None, None
+        if client is None or client.is_closed:
+            return
+        if isinstance(loop, asyncio.AbstractEventLoop) and loop.is_running():
+            # цикл работает в другом потоке — закрываем клиент в нём
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            # цикл завершился, не отменив задачи (сторож не сработал): закрыть соединения уже нечем
+            logger.warning("httpx.AsyncClient завершившегося event loop не закрыт")
+
+    @classmethod
+    async def aclose_clients(cls) -> None:
+        """Закрытие общих клиентов. Вызывается при остановке приложения (ASGI lifespan)."""
+        # фоновые обновления кэша без клиента всё равно не завершатся
+        for task in list(KP._refresh_tasks):
+            task.cancel()
+
+        if KP._async_client is not None and KP._async_client_loop is asyncio.get_running_loop():
+            await KP._async_client.aclose()
+            if KP._async_client_closer is not None:
+                KP._async_client_closer.cancel()
+        cls._discard_async_client()
+
+        with KP._client_lock:
+            if KP._client is not None:
+                KP._client.close()
+            KP._client = None
+        logger.debug("Общие httpx-клиенты закрыты")
+
+    def _url(self, url: str) -> str:
+        """Абсолютный адрес эндпоинта (у общего клиента нет base_url — он один на всех наследников)."""
+        base_url = self.BASE_URL.rstrip("/")
+        return f"{base_url}/{url.lstrip('/')}" if url else base_url
+
+    def _validate_request(self, url: str, params: dict[str, Any] | None) -> bool:
+        """
+        Проверка аргументов запроса и наличия API-ключа.
 
         Returns:
-            Response data as a dictionary if successful, None if an error occurs.
+            True, если запрос можно отправлять. Иначе заполняется self.error.
         """
-        if not url or not isinstance(url, str):
+        # пустой url допустим: это сам списочный эндпоинт (BASE_URL)
+        if not isinstance(url, str):
             logger.error("Invalid URL: %s", url)
             self.error = "Invalid URL provided"
-            return None
+            return False
 
         if params and not isinstance(params, dict):
             logger.error("Invalid params type: %s", type(params))
             self.error = "Invalid params type"
-            return None
+            return False
 
         if not self.headers.get("X-API-KEY"):
             logger.error("Cannot make request: Missing API key")
             self.error = "Missing API key"
+            return False
+
+        return True
+
+    def _cache_key(self, url: str, params: dict[str, Any] | None) -> str:
+        """
+        Канонический ключ запроса: полный адрес и параметры, отсортированные по имени.
+        Одинаковые запросы дают один ключ независимо от порядка ключей в params.
+        """
+        key = self._url(url)
+        if params:
+            key += "?" + urlencode(sorted(params.items()), doseq=True)
+        return key
+
+    def _process_response(self, response: httpx.Response, url: str, cache_key: str | None) -> dict:
+        """Проверка статуса, разбор json и кэширование ответа (если передан cache_key)."""
+        response.raise_for_status()
+        response_data = response.json()
+        self.breaker.record_success()
+        if cache_key:
+            self._store(cache_key, response_data)
+        logger.info("Successfully fetched data from %s", url)
+        return response_data
+
+    def _entry(self, data: Any, fresh_for: int | None = None) -> dict:
+        """Обёртка ответа со сроком свежести (хранится до CACHE_STALE_DURATION)."""
+        return {"data": data, "error": None, "fresh_until": time.time() + (fresh_for or self.CACHE_DURATION)}
+
+    def _negative_entry(self, error: str) -> dict:
+        """Обёртка окончательного отказа API: повторный запрос того же ответа не изменит."""
+        return {"data": None, "error": error, "fresh_until": time.time() + self.NEGATIVE_CACHE_DURATION}
+
+    def _store(self, cache_key: str, data: Any, fresh_for: int | None = None) -> None:
+        self.cache.set_cache(cache_key, self._entry(data, fresh_for), ttl=self.CACHE_STALE_DURATION)
+
+    async def _astore(self, cache_key: str, data: Any, fresh_for: int | None = None) -> None:
+        await self.cache.aset(cache_key, self._entry(data, fresh_for), ttl=self.CACHE_STALE_DURATION)
+
+    def _store_negative(self, cache_key: str, error: str) -> None:
+        self.cache.set_cache(cache_key, self._negative_entry(error), ttl=self.NEGATIVE_CACHE_DURATION)
+
+    def _get_cached(self, cache_key: str | None) -> dict | None:
+        """Запись кэша {"data", "error", "fresh_until"} или None, если её нет."""
+        if not cache_key:
             return None
+        return self._valid_entry(cache_key, self.cache.get_cache(cache_key))
 
-        # Generate cache key
-        cache_key = f"{self.BASE_URL}{url}" + (str(params) if params else "")
-        cached_value = self.cache.get_cache(cache_key)
-        if cached_value:
-            logger.info("Retrieved cached data for %s", cache_key)
-            return cached_value
+    async def _aget_cached(self, cache_key: str | None) -> dict | None:
+        """Асинхронный _get_cached: чтение diskcache не блокирует event loop."""
+        if not cache_key:
+            return None
+        return self._valid_entry(cache_key, await self.cache.aget(cache_key))
+
+    @staticmethod
+    def _valid_entry(cache_key: str, entry: Any) -> dict | None:
+        # записи старого формата (голый ответ без обёртки) считаем промахом
+        if not isinstance(entry, dict) or "fresh_until" not in entry:
+            return None
+        logger.info("Retrieved cached data for %s", cache_key)
+        return entry
+
+    @staticmethod
+    def _is_fresh(entry: dict) -> bool:
+        return entry["fresh_until"] > time.time()
 
+    @staticmethod
+    def _entry_result(entry: dict) -> tuple[Any, str | None]:
+        return entry["data"], entry["error"]
+
+    def _shared_result(self, data: dict | None, error: str | None) -> dict | None:
+        """Результат общего (single-flight) запроса или кэша: ошибка достаётся и ожидавшим."""
+        if data is None and error:
+            self.error = error
+        return data
+
+    def _retry_after(self, response: httpx.Response, attempt: int) -> float:
+        """Сколько ждать после 429: Retry-After в секундах или HTTP-дате, иначе растущая пауза."""
+        header = response.headers.get("Retry-After", "")
         try:
-            with httpx.Client(base_url=self.BASE_URL, headers=self.headers) as client:
-                response = client.get(url, params=params)
-                response.raise_for_status()
-                response_data = response.json()
-                self.cache.set_cache(cache_key, response_data)
-                logger.info("Successfully fetched data from %s", url)
-                return response_data
-
-        except httpx.HTTPStatusError as e:
+            delay = float(header)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(header).timestamp() - pendulum.now().timestamp()
+            except (TypeError, ValueError):
+                delay = float(2**attempt)
+        return min(max(delay, 0.0), self.MAX_RETRY_AFTER)
+
+    def _allow_request(self) -> bool:
+        """Предохранитель и суточная квота: можно ли отправлять запрос прямо сейчас."""
+        if not self.breaker.allow():
+            logger.warning("Request skipped: circuit is %s", self.breaker.state)
+            self.error = self.CIRCUIT_OPEN_ERROR
+            return False
+        return self._consume_quota()
+
+    def _consume_quota(self) -> bool:
+        if self.quota.consume():
+            return True
+        self.error = "Daily API quota exhausted"
+        return False
+
+    def _process_error(self, url: str, e: Exception, cache_key: str | None = None) -> None:
+        """Перевод исключения запроса в self.error. Окончательные отказы API кэшируются (если передан cache_key)."""
+        # сеть и 5xx — сбой API; ответы 4xx и битый json значат, что API живо
+        if isinstance(e, httpx.RequestError) or (
+            isinstance(e, httpx.HTTPStatusError) and e.response.status_code >= httpx.codes.INTERNAL_SERVER_ERROR
+        ):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        if isinstance(e, httpx.HTTPStatusError):
             logger.warning("HTTP error for %s: %s", url, str(e))
             self.error = f"HTTP error: {e!s}"
-            return None
-        except httpx.RequestError as e:
+            if cache_key and e.response.status_code in self.NEGATIVE_STATUS_CODES:
+                self._store_negative(cache_key, self.error)
+        elif isinstance(e, httpx.RequestError):
             logger.error("Network error for %s: %s", url, str(e))
             self.error = f"Network error: {e!s}"
-            return None
-        except ValueError as e:
+        elif isinstance(e, ValueError):
             logger.error("Invalid JSON response for %s: %s", url, str(e))
             self.error = f"Invalid JSON response: {e!s}"
-            return None
-        except Exception as e:
+        else:
             logger.error("Unexpected error for %s: %s", url, str(e))
             self.error = f"Unexpected error: {e!s}"
+
+    def _make_request(self, url: str, params: dict[str, Any] | None = None, use_cache: bool = True) -> dict | None:
+        """
+        Make an HTTP request to the Kinopoisk API with caching.
+
+        Args:
+            url: API endpoint URL (relative to BASE_URL).
+            params: Optional query parameters for the request.
+            use_cache: False — ответ не кэшируется целиком (например, пачки фильмов раскладываются по id).
+
+        Returns:
+            Response data as a dictionary if successful, None if an error occurs.
+        """
+        if not self._validate_request(url, params):
+            return None
+
+        # Generate cache key
+        key = self._cache_key(url, params)
+        cache_key = key if use_cache else None
+        entry = self._get_cached(cache_key)
+        if entry is not None:
+            if not self._is_fresh(entry):
+                refresher = replace(self, error=None)
+                self._refresh_executor.submit(self._flights.do, key, lambda: refresher._fetch(url, params, cache_key))
+            return self._shared_result(*self._entry_result(entry))
+
+        return self._shared_result(*self._flights.do(key, lambda: self._fetch(url, params, cache_key)))
+
+    def _fetch(self, url: str, params: dict[str, Any] | None, cache_key: str | None) -> tuple[dict | None, str | None]:
+        """Сам запрос к API (выполняется под single-flight). Возвращает (данные, ошибка)."""
+        # пока ждали очереди, такой же запрос мог уже положить свежий ответ в кэш
+        entry = self._get_cached(cache_key)
+        if entry is not None and self._is_fresh(entry):
+            return self._entry_result(entry)
+
+        if not self._allow_request():
+            return None, self.error
+
+        try:
+            response = self.get_client().get(self._url(url), params=params, headers=self.headers)
+            return self._process_response(response, url, cache_key), None
+        except Exception as e:
+            self._process_error(url, e, cache_key)
+            return None, self.error
+
+    async def _amake_request(
+        self, url: str, params: dict[str, Any] | None = None, use_cache: bool = True
+    ) -> dict | None:
+        """
+        Асинхронный вариант _make_request на общем httpx.AsyncClient.
+        Аргументы и результат те же.
+        """
+        if not self._validate_request(url, params):
             return None
 
+        key = self._cache_key(url, params)
+        cache_key = key if use_cache else None
+        entry = await self._aget_cached(cache_key)
+        if entry is not None:
+            if not self._is_fresh(entry):
+                refresher = replace(self, error=None)
+                task = asyncio.get_running_loop().create_task(
+                    self._flights.ado(key, lambda: refresher._afetch(url, params, cache_key))
+                )
+                # держим ссылку, иначе задачу может собрать сборщик мусора
+                KP._refresh_tasks.add(task)
+                task.add_done_callback(KP._refresh_tasks.discard)
+            return self._shared_result(*self._entry_result(entry))
+
+        return self._shared_result(*await self._flights.ado(key, lambda: self._afetch(url, params, cache_key)))
+
+    async def _afetch(
+        self, url: str, params: dict[str, Any] | None, cache_key: str | None
+    ) -> tuple[dict | None, str | None]:
+        """Асинхронный вариант _fetch: лимитер запросов и повтор после 429."""
+        entry = await self._aget_cached(cache_key)
+        if entry is not None and self._is_fresh(entry):
+            return self._entry_result(entry)
+
+        # предохранитель, квота и отказы API живут в diskcache (SQLite): всё, что их читает
+        # и пишет, выполняется в пуле потоков кэша, а не на event loop
+        limiter = self.get_limiter()
+        for attempt in range(1, self.MAX_RETRIES + 1):
+            if not await self.cache.arun(self._allow_request):
+                return None, self.error
+            await limiter.acquire()
+
+            try:
+                response = await self.get_async_client().get(self._url(url), params=params, headers=self.headers)
+                if response.status_code == httpx.codes.TOO_MANY_REQUESTS and attempt < self.MAX_RETRIES:
+                    delay = self._retry_after(response, attempt)
+                    logger.warning("429 for %s, retry %d/%d in %.1fs", url, attempt, self.MAX_RETRIES, delay)
+                    limiter.pause(delay)
+                    continue
+                data = await self.cache.arun(self._process_response, response, url, None)
+            except Exception as e:
+                await self.cache.arun(self._process_error, url, e, cache_key)
+                return None, self.error
+            if cache_key:
+                await self._astore(cache_key, data)
+            return data, None
+        return None, self.error
+
 
 @dataclass
 class KP_Movie(KP):
     """
     Класс для получения фильмов кинопоиска
+
+    slim=True — облегчённый режим: фильмы запрашиваются списочным эндпоинтом с selectFields
+    (только поля, которые читают KPFilmModel, KpFilmPersonModel и KpFilmGenresModel),
+    а из персон в кэш попадают только актёры, режиссёры и сценаристы. Полный ответ /movie/{id}
+    с фактами, похожими фильмами и сотнями персон не качается и не хранится.
     """
 
+    slim: bool = False
+
     BASE_URL: ClassVar[str] = KP.BASE_URL + "movie"
+    BATCH_SIZE: ClassVar[int] = 250  # максимальный limit списочного эндпоинта /v1.4/movie
+
+    # Поля ответа, которые используются при сохранении фильма (pydantic_models/kp_movie_api.py)
+    SLIM_FIELDS: ClassVar[tuple[str, ...]] = (
+        "id",
+        "name",
+        "countries",
+        "budget",
+        "fees",
+        "premiere",
+        "description",
+        "shortDescription",
+        "slogan",
+        "movieLength",
+        "poster",
+        "rating",
+        "votes",
+        "genres",
+        "persons",
+    )
+    PERSON_FIELDS: ClassVar[tuple[str, ...]] = ("id", "name", "photo", "enProfession")
+    PERSON_PROFESSIONS: ClassVar[tuple[str, ...]] = ("actor", "director", "writer")
+    NOT_FOUND_ERROR: ClassVar[str] = "Movie not found"
+
+    # Поиск по названию (/v1.4/movie/search) для автодополнения
+    SEARCH_LIMIT: ClassVar[int] = 20
+    SEARCH_MIN_LENGTH: ClassVar[int] = 2
+    SEARCH_NARROW_MIN: ClassVar[int] = 3  # столько совпадений в кэше префикса хватает, чтобы не идти в API
+    SEARCH_CACHE_DURATION: ClassVar[int] = 60 * 60  # 1 hour
+    SEARCH_FIELDS: ClassVar[tuple[str, ...]] = ("id", "name", "alternativeName", "enName", "year", "poster", "rating")
+
+    def _validate_movie_id(self, movie_id: str | int) -> bool:
+        if not movie_id or not isinstance(movie_id, (str, int)) or (isinstance(movie_id, int) and movie_id <= 0):
+            logger.error("Invalid movie_id: %s", movie_id)
+            self.error = "Invalid movie_id provided"
+            return False
+        return True
 
     def get_movie_by_id(self, movie_id: str | int) -> dict | None:
         """
@@ -111,9 +494,275 @@ class KP_Movie(KP):
 
         :return: Словарь с информацией о фильме или None в случаи ошибки.
         """
-        if not movie_id or not isinstance(movie_id, (str, int)) or (isinstance(movie_id, int) and movie_id <= 0):
-            logger.error("Invalid movie_id: %s", movie_id)
-            self.error = "Invalid movie_id provided"
+        if not self._validate_movie_id(movie_id):
             return None
 
+        if self.slim:
+            return self._single(movie_id, self.get_movies_by_ids([movie_id]))
         return self._make_request(str(movie_id))
+
+    async def aget_movie_by_id(self, movie_id: str | int) -> dict | None:
+        """
+        Асинхронное получение информации о фильме (не блокирует event loop).
+
+        :param movie_id: Id кинопоиска нужного фильма.
+
+        :return: Словарь с информацией о фильме или None в случаи ошибки.
+        """
+        if not self._validate_movie_id(movie_id):
+            return None
+
+        if self.slim:
+            return self._single(movie_id, await self.aget_movies_by_ids([movie_id]))
+        return await self._amake_request(str(movie_id))
+
+    def get_movies_by_ids(self, ids: list[str | int]) -> dict[int, dict]:
+        """
+        Получение пачки фильмов списочным эндпоинтом /v1.4/movie?id=1&id=2...
+        Вместо N запросов по одному фильму — один запрос (и страница) на BATCH_SIZE id.
+        Каждый полученный фильм раскладывается в кэш под тем же ключом, что и у get_movie_by_id.
+
+        :param ids: Id кинопоиска нужных фильмов.
+
+        :return: Словарь {kp_id: информация о фильме}. Не найденных фильмов в словаре нет.
+        """
+        movies, missing = self._split_cached(ids)
+
+        for chunk in self._chunks(missing):
+            page = 1
+            while True:
+                response = self._make_request("", self._batch_params(chunk, page), use_cache=False)
+                if not response:
+                    break
+                self._fan_out(response, movies)
+                if page >= response.get("pages", 1):
+                    self._store_not_found(chunk, movies)
+                    break
+                page += 1
+
+        logger.info("Batch-запрос фильмов: запрошено %d, получено %d", len(set(ids)), len(movies))
+        return movies
+
+    async def aget_movies_by_ids(self, ids: list[str | int]) -> dict[int, dict]:
+        """
+        Асинхронный вариант get_movies_by_ids. Аргументы и результат те же.
+        Кэш читается одним aget_many, а фильмы пачки записываются одной транзакцией.
+        """
+        cached = await self.cache.aget_many(self._movie_key(movie_id) for movie_id in self._valid_ids(ids))
+        movies, missing = self._split_cached(ids, lambda key: self._valid_entry(key, cached.get(key)))
+
+        for chunk in self._chunks(missing):
+            page = 1
+            while True:
+                response = await self._amake_request("", self._batch_params(chunk, page), use_cache=False)
+                if not response:
+                    break
+                found = self._collect(response)
+                movies.update(found)
+                entries = {self._movie_key(movie_id): self._entry(movie) for movie_id, movie in found.items()}
+                await self.cache.aset_many(entries, ttl=self.CACHE_STALE_DURATION)
+                if page >= response.get("pages", 1):
+                    entries = {
+                        self._movie_key(movie_id): self._negative_entry(self.NOT_FOUND_ERROR)
+                        for movie_id in chunk
+                        if movie_id not in movies
+                    }
+                    await self.cache.aset_many(entries, ttl=self.NEGATIVE_CACHE_DURATION)
+                    break
+                page += 1
+
+        logger.info("Batch-запрос фильмов: запрошено %d, получено %d", len(set(ids)), len(movies))
+        return movies
+
+    def search(self, query: str) -> list[dict] | None:
+        """
+        Поиск фильмов по названию.
+
+        Результаты кэшируются по нормализованному запросу. Запрос, продолжающий уже закэшированный
+        префикс («матри» после «матр»), отвечается из кэша префикса без обращения к API, если
+        результат префикса был полным или в нём нашлось достаточно совпадений.
+
+        :param query: Строка поиска.
+
+        :return: Список найденных фильмов (id, названия, год, постер, рейтинг) или None в случаи ошибки.
+        """
+        query = self._normalize_query(query)
+        if not self._validate_query(query):
+            return None
+
+        docs = self._search_cached(query, self._get_cached)
+        if docs is not None:
+            return docs
+        result = self._search_result(self._make_request("search", self._search_params(query), use_cache=False))
+        if result is None:
+            return None
+        self._store(self._search_key(query), result, self.SEARCH_CACHE_DURATION)
+        return result["docs"]
+
+    async def asearch(self, query: str) -> list[dict] | None:
+        """
+        Асинхронный вариант search. Аргументы и результат те же.
+        """
+        query = self._normalize_query(query)
+        if not self._validate_query(query):
+            return None
+
+        # сам запрос и все его префиксы — одним чтением кэша
+        keys = [self._search_key(query[:end]) for end in range(len(query), self.SEARCH_MIN_LENGTH - 1, -1)]
+        cached = await self.cache.aget_many(keys)
+        docs = self._search_cached(query, lambda key: self._valid_entry(key, cached.get(key)))
+        if docs is not None:
+            return docs
+        result = self._search_result(await self._amake_request("search", self._search_params(query), use_cache=False))
+        if result is None:
+            return None
+        await self._astore(self._search_key(query), result, self.SEARCH_CACHE_DURATION)
+        return result["docs"]
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        if not isinstance(query, str):
+            return ""
+        return " ".join(query.lower().replace("ё", "е").split())
+
+    def _validate_query(self, query: str) -> bool:
+        if len(query) < self.SEARCH_MIN_LENGTH:
+            logger.error("Search query is too short: %r", query)
+            self.error = "Search query is too short"
+            return False
+        return True
+
+    def _search_params(self, query: str) -> dict[str, Any]:
+        return {"query": query, "limit": self.SEARCH_LIMIT, "page": 1}
+
+    def _search_key(self, query: str) -> str:
+        return self._cache_key("search", self._search_params(query))
+
+    def _search_cached(self, query: str, get_entry: Callable[[str], dict | None]) -> list[dict] | None:
+        """
+        Результат из кэша: сам запрос или сужение ближайшего закэшированного префикса.
+
+        :param get_entry: чтение записи кэша по ключу (из diskcache или из уже прочитанной пачки).
+        """
+
+        def fresh_entry(key: str) -> dict | None:
+            # запись живёт CACHE_STALE_DURATION, но отвечать ей можно только SEARCH_CACHE_DURATION
+            entry = get_entry(key)
+            return entry if entry is not None and self._is_fresh(entry) else None
+
+        entry = fresh_entry(self._search_key(query))
+        if entry is not None:
+            return entry["data"]["docs"]
+
+        for end in range(len(query) - 1, self.SEARCH_MIN_LENGTH - 1, -1):
+            entry = fresh_entry(self._search_key(query[:end]))
+            if entry is None:
+                continue
+            result = entry["data"]
+            docs = [doc for doc in result["docs"] if self._matches(doc, query)]
+            if result["complete"] or len(docs) >= self.SEARCH_NARROW_MIN:
+                logger.info("Search %r answered from cached prefix %r", query, query[:end])
+                return docs
+            # более короткие префиксы ещё шире и тоже обрезаны — они не помогут
+            return None
+        return None
+
+    def _matches(self, doc: dict, query: str) -> bool:
+        """Каждое слово запроса — начало какого-то слова в названиях фильма."""
+        titles = " ".join(doc.get(field) or "" for field in ("name", "alternativeName", "enName"))
+        words = self._normalize_query(titles).replace("-", " ").split()
+        return all(any(word.startswith(part) for word in words) for part in query.split())
+
+    def _search_result(self, response: dict | None) -> dict | None:
+        """Запись поиска для кэша: {"docs": облегчённые фильмы, "complete": всё ли уместилось}."""
+        if response is None:
+            return None
+        docs = [{field: doc.get(field) for field in self.SEARCH_FIELDS} for doc in response.get("docs", [])]
+        # полный результат (всё уместилось на первой странице) можно сужать без оглядки на API
+        complete = response.get("total", len(docs)) <= len(docs)
+        return {"docs": docs, "complete": complete}
+
+    def _movie_key(self, movie_id: str | int) -> str:
+        """Ключ фильма в кэше. Облегчённые ответы храним отдельно от полных."""
+        key = self._cache_key(str(movie_id), None)
+        return f"{key}#slim" if self.slim else key
+
+    def _single(self, movie_id: str | int, movies: dict[int, dict]) -> dict | None:
+        """Один фильм из результата пачки (облегчённый режим get_movie_by_id)."""
+        if not str(movie_id).isdigit():
+            self.error = "Invalid movie_id provided"
+            return None
+        movie = movies.get(int(movie_id))
+        if movie is None and not self.error:
+            self.error = self.NOT_FOUND_ERROR
+        return movie
+
+    def _valid_ids(self, ids: list[str | int]) -> list[str | int]:
+        """Уникальные корректные id с сохранением порядка."""
+        return [
+            movie_id for movie_id in dict.fromkeys(ids) if self._validate_movie_id(movie_id) and str(movie_id).isdigit()
+        ]
+
+    def _split_cached(
+        self, ids: list[str | int], get_entry: Callable[[str], dict | None] | None = None
+    ) -> tuple[dict[int, dict], list[int]]:
+        """
+        Делит id на уже лежащие в кэше фильмы и те, что надо запросить.
+        Устаревшие записи запрашиваются заново (пачка сама и есть обновление),
+        фильмы с закэшированным отказом API пропускаются.
+
+        :param get_entry: чтение записи кэша по ключу; по умолчанию _get_cached.
+        """
+        get_entry = get_entry or self._get_cached
+        movies: dict[int, dict] = {}
+        missing: list[int] = []
+        for movie_id in self._valid_ids(ids):
+            entry = get_entry(self._movie_key(movie_id))
+            if entry is None or not self._is_fresh(entry):
+                missing.append(int(movie_id))
+            elif entry["data"] is not None:
+                movies[int(movie_id)] = entry["data"]
+            else:
+                self.error = entry["error"]
+        return movies, missing
+
+    def _chunks(self, ids: list[int]) -> list[list[int]]:
+        return [ids[i : i + self.BATCH_SIZE] for i in range(0, len(ids), self.BATCH_SIZE)]
+
+    def _batch_params(self, chunk: list[int], page: int) -> dict[str, Any]:
+        # список в params httpx разворачивает в повторяющиеся id=1&id=2
+        params = {"id": chunk, "limit": len(chunk), "page": page}
+        if self.slim:
+            params["selectFields"] = list(self.SLIM_FIELDS)
+        return params
+
+    def _trim(self, movie: dict) -> dict:
+        """Облегчённая копия фильма: нужные поля и только актёры, режиссёры и сценаристы."""
+        trimmed = {field: movie[field] for field in self.SLIM_FIELDS if field in movie}
+        trimmed["persons"] = [
+            {field: person.get(field) for field in self.PERSON_FIELDS}
+            for person in movie.get("persons") or []
+            if person.get("enProfession") in self.PERSON_PROFESSIONS
+        ]
+        return trimmed
+
+    def _collect(self, response: dict) -> dict[int, dict]:
+        """Фильмы из ответа списочного эндпоинта по id (в облегчённом режиме — урезанные)."""
+        found: dict[int, dict] = {}
+        for movie in response.get("docs", []):
+            movie_id = movie.get("id")
+            if movie_id:
+                found[movie_id] = self._trim(movie) if self.slim else movie
+        return found
+
+    def _fan_out(self, response: dict, movies: dict[int, dict]) -> None:
+        """Раскладывает фильмы из ответа списочного эндпоинта по id-ключам кэша."""
+        for movie_id, movie in self._collect(response).items():
+            self._store(self._movie_key(movie_id), movie)
+            movies[movie_id] = movie
+
+    def _store_not_found(self, chunk: list[int], movies: dict[int, dict]) -> None:
+        """Id, которых нет в полном (все страницы) ответе, кэшируются как несуществующие."""
+        for movie_id in chunk:
+            if movie_id not in movies:
+                self._store_negative(self._movie_key(movie_id), self.NOT_FOUND_ERROR)
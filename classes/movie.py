@@ -1,18 +1,25 @@
-import asyncio
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+from decimal import Decimal
 import logging
-from typing import NamedTuple
+from typing import Any, NamedTuple
 
 from asgiref.sync import sync_to_async
 from django.core.files.base import ContentFile
-import httpx
+from django.db.models import F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
 from pydantic import ValidationError as PydanticValidationError
 from rest_framework.exceptions import ValidationError
-
-from classes.kp import KP_Movie
-from features.serializers import MovieRatingSerializer
-from lists.models import Actor, Director, Genre, Movie, Writer
-from lists.serializers import MovieDictSerializer, MoviePosterSerializer
-from pydantic_models import KpFilmGenresModel, KPFilmModel, KpFilmPersonModel
+from rest_framework.utils.encoders import JSONEncoder
+
+from classes.caching import CacheTags
+from classes.kp import KP, KP_Movie
+from classes.pagination import KeysetPaginator
+from lists.models import Actor, Director, Genre, Movie, MovieCard, Note, Writer
+from lists.projections import MOVIE_DICT, MOVIE_RATING
+from lists.serializers import MovieDictSerializer
+from pydantic_models import KpFilmGenresModel, KPFilmModel, KpFilmPersonModel, MoviesQueryModel
+from utils.cache_handler import cached
 from utils.exception_handler import handle_exceptions
 
 
@@ -36,6 +43,18 @@ class MovieHandler:
     Класс для работы с фильмами в базе данных.
     """
 
+    PAGINATOR: KeysetPaginator = KeysetPaginator("rating_kp")
+    # сортировки списка (MoviesQueryModel.sort): поле или аннотация и тип значения в курсоре
+    SORT_FIELDS: dict[str, tuple[str, Callable[[str], Any]]] = {
+        "rating_kp": ("rating_kp", Decimal),
+        "rating_imdb": ("rating_imdb", Decimal),
+        "premiere": ("premiere", datetime.fromisoformat),
+        "duration": ("duration", int),
+        "name": ("name", str),
+        "rating_user": ("user_rating", int),
+    }
+    EXPORT_CHUNK_SIZE: int = 500
+
     @classmethod
     @handle_exceptions("Фильм")
     @sync_to_async
@@ -53,6 +72,7 @@ class MovieHandler:
 
     @classmethod
     @handle_exceptions("Фильмы")
+    @cached("movies", ttl=60 * 60, tags=(CacheTags.MOVIES, CacheTags.NOTES))
     @sync_to_async
     def get_all_movies(cls, info_type: str | None = None, is_archive: bool = False) -> list[dict]:
         """
@@ -61,18 +81,19 @@ class MovieHandler:
         :param is_archive: Фильтрация по архивным фильмам.
         :return: Список сериализованных фильмов.
         """
-        raw_films = Movie.mgr.filter(is_archive=is_archive)
-
-        # prefetch под конкретный сериализатор, иначе N+1: жанры и заметки
-        # дёргаются отдельным запросом на каждый фильм
         if info_type == MoviesStructure.posters:
-            raw_films = raw_films.prefetch_related("genres", "note_set")
-        elif info_type != MoviesStructure.rating:
-            raw_films = raw_films.prefetch_related("genres")
-
-        serialisers = {MoviesStructure.posters: MoviePosterSerializer, MoviesStructure.rating: MovieRatingSerializer}
-        serializer = serialisers.get(info_type, MovieDictSerializer)
-        movies = serializer(raw_films, many=True).data
+            # сетка постеров — готовые карточки (MovieCard): один проход по индексу, без сериализаторов
+            movies = list(
+                MovieCard.mgr.filter(is_archive=is_archive)
+                .order_by("-rating_kp", "pk")
+                .values("poster", "poster_local", "genres", "ratings", kp_id=F("movie_id"))
+            )
+        else:
+            # values()-проекция вместо сериализатора: тот же результат без DRF-полей на каждую строку
+            projection = MOVIE_RATING if info_type == MoviesStructure.rating else MOVIE_DICT
+            movies = projection.all(Movie.mgr.filter(is_archive=is_archive))
+            if projection is MOVIE_DICT:
+                movies = {movie["kp_id"]: movie for movie in movies}
 
         logger.info(
             "Получено %d фильмов (is_archive=%s, info_type=%s)",
@@ -82,6 +103,145 @@ class MovieHandler:
         )
         return movies
 
+    @classmethod
+    @handle_exceptions("Фильмы")
+    @cached("movies_page", ttl=60 * 60, tags=(CacheTags.MOVIES, CacheTags.NOTES))
+    @sync_to_async
+    def get_movies_page(
+        cls,
+        info_type: str | None = None,
+        is_archive: bool = False,
+        limit: int | str | None = None,
+        cursor: str | None = None,
+        filters: dict | None = None,
+    ) -> dict:
+        """
+        Страница фильмов в выбранном порядке (при равенстве — по kp_id), см. KeysetPaginator.
+        :param info_type: Тип данных (posters — карточки сетки, rating или None для полных данных).
+        :param is_archive: Фильтрация по архивным фильмам.
+        :param limit: Размер страницы (по умолчанию KeysetPaginator.DEFAULT_LIMIT).
+        :param cursor: next_cursor предыдущей страницы; None — первая страница.
+        :param filters: Фильтры и сортировка из query-параметров (см. MoviesQueryModel).
+        :return: {"results": фильмы страницы (как у get_all_movies), "next_cursor": курсор или None};
+            для posters ещё "movies" — полные данные фильмов страницы {kp_id: фильм}, как у info_type=None.
+        """
+        try:
+            query = MoviesQueryModel(**(filters or {}))
+        except PydanticValidationError as e:
+            raise ValidationError(f"Некорректные фильтры: {e.errors()[0]['msg']}", 400) from e
+
+        sort = query.sort.lstrip("-")
+        field, cast = cls.SORT_FIELDS[sort]
+        descending = query.sort.startswith("-")
+
+        extra = {}
+        if info_type == MoviesStructure.posters:
+            # карточка хранит rating_kp сама, остальные поля — у фильма (join только когда они нужны)
+            cards = cls._filter_movies(MovieCard.mgr.filter(is_archive=is_archive), query, prefix="movie__")
+            order_field = field if field in ("rating_kp", "user_rating") else f"movie__{field}"
+            queryset = cards.values(
+                "poster", "poster_local", "genres", "ratings", kp_id=F("movie_id"), order_value=F(order_field)
+            )
+            paginator = KeysetPaginator(order_field, descending, cast)
+            results, next_cursor = paginator.paginate(
+                queryset, limit, cursor, key=lambda card: (card["order_value"], card["kp_id"])
+            )
+            for card in results:
+                del card["order_value"]
+            # данные фильмов для карточки, оценки и закладок на клиенте едут вместе с постерами страницы
+            movies = MOVIE_DICT.all(Movie.mgr.filter(kp_id__in=[card["kp_id"] for card in results]))
+            extra["movies"] = {movie["kp_id"]: movie for movie in movies}
+        else:
+            projection = MOVIE_RATING if info_type == MoviesStructure.rating else MOVIE_DICT
+            queryset = cls._filter_movies(Movie.mgr.filter(is_archive=is_archive), query)
+            queryset = projection.query(queryset, *(() if field in projection.columns else (field,)))
+            paginator = KeysetPaginator(field, descending, cast)
+            rows, next_cursor = paginator.paginate(queryset, limit, cursor, key=lambda row: (row[field], row["kp_id"]))
+            results = projection.convert(rows)
+            if projection is MOVIE_DICT:
+                results = {movie["kp_id"]: movie for movie in results}
+
+        return {"results": results, "next_cursor": next_cursor, **extra}
+
+    @classmethod
+    def _filter_movies(cls, queryset: QuerySet, query: MoviesQueryModel, prefix: str = "") -> QuerySet:
+        """
+        Фильтры MoviesQueryModel в SQL.
+        :param prefix: путь от модели queryset до Movie (movie__ для MovieCard); rating_kp есть у обеих.
+        """
+        for genre in query.genre:
+            # каждый жанр — отдельный join: фильм должен быть во всех выбранных
+            queryset = queryset.filter(**{f"{prefix}genres": genre})
+        if query.min_rating is not None:
+            queryset = queryset.filter(rating_kp__gte=query.min_rating)
+        if query.year_from is not None:
+            queryset = queryset.filter(**{f"{prefix}premiere__year__gte": query.year_from})
+        if query.year_to is not None:
+            queryset = queryset.filter(**{f"{prefix}premiere__year__lte": query.year_to})
+        if query.duration_max is not None:
+            queryset = queryset.filter(**{f"{prefix}duration__lte": query.duration_max})
+        if query.sort.lstrip("-") == "rating_user":
+            # последняя оценка пользователя; без оценки — 0, как на клиенте
+            rating = Note.mgr.filter(movie_id=OuterRef("pk"), user_id=query.user).order_by("-id").values("rating")
+            queryset = queryset.annotate(user_rating=Coalesce(Subquery(rating[:1]), 0))
+        return queryset
+
+    @classmethod
+    async def export_movies(cls, is_archive: bool | None = None, lines: bool = False) -> AsyncIterator[str]:
+        """
+        Выгрузка всего каталога частями — для StreamingHttpResponse.
+        Фильмы читаются aiterator пачками по EXPORT_CHUNK_SIZE (проекция MOVIE_DICT), жанры подгружаются
+        одним запросом на пачку, а в память попадает только текущая пачка — сколько бы фильмов ни было в базе.
+        :param is_archive: Только архив (True), только закладки (False) или все фильмы (None).
+        :param lines: NDJSON — по фильму на строку; иначе JSON-объект {kp_id: фильм}, как у get_all_movies.
+        :return: Асинхронный генератор кусков текста.
+        """
+        movies = Movie.mgr.order_by("pk")
+        if is_archive is not None:
+            movies = movies.filter(is_archive=is_archive)
+
+        encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        convert = sync_to_async(MOVIE_DICT.convert)
+        count, rows = 0, []
+        if not lines:
+            yield "{"
+        async for row in MOVIE_DICT.query(movies).aiterator(chunk_size=cls.EXPORT_CHUNK_SIZE):
+            rows.append(row)
+            if len(rows) < cls.EXPORT_CHUNK_SIZE:
+                continue
+            yield cls._export_chunk(encoder, await convert(rows), lines, first=not count)
+            count += len(rows)
+            rows = []
+        if rows:
+            yield cls._export_chunk(encoder, await convert(rows), lines, first=not count)
+            count += len(rows)
+        if not lines:
+            yield "}"
+
+        logger.info("Выгружено %d фильмов (is_archive=%s, ndjson=%s)", count, is_archive, lines)
+
+    @staticmethod
+    def _export_chunk(encoder: JSONEncoder, movies: list[dict], lines: bool, first: bool) -> str:
+        """Пачка фильмов выгрузки одним куском: каждый кусок — отдельная отправка в ASGI."""
+        if lines:
+            return "".join(f"{encoder.encode(movie)}\n" for movie in movies)
+        chunk = ",".join(f'"{movie["kp_id"]}":{encoder.encode(movie)}' for movie in movies)
+        return chunk if first else f",{chunk}"
+
+    @classmethod
+    @handle_exceptions("Жанры")
+    @cached("genres", ttl=60 * 60, tags=(CacheTags.MOVIES,))
+    @sync_to_async
+    def get_genres(cls, is_archive: bool = False) -> list[str]:
+        """
+        Жанры фильмов списка (для фильтра и сортировки страницы, которая грузит фильмы постранично).
+        :param is_archive: Архив или закладки.
+        :return: Отсортированный список названий жанров.
+        """
+        return list(
+            Genre.mgr.filter(movie__is_archive=is_archive).distinct().order_by("name").values_list("name", flat=True)
+        )
+
     @classmethod
     @handle_exceptions("Фильм")
     async def change_movie_status(cls, kp_id: int | str, is_archive: bool) -> bool:
@@ -135,9 +295,9 @@ class MovieHandler:
         if not movie.get("error"):
             raise ValidationError("Фильм уже существует", 400)
 
-        kp_client = KP_Movie()
-        # запрос к API синхронный (httpx.Client) — уводим в поток, чтобы не блокировать event loop
-        api_response = kp_scheme if kp_scheme else await asyncio.to_thread(kp_client.get_movie_by_id, kp_id)
+        # облегчённый ответ: только поля, которые сохраняем (без фактов, похожих фильмов и сотен персон)
+        kp_client = KP_Movie(slim=True)
+        api_response = kp_scheme if kp_scheme else await kp_client.aget_movie_by_id(kp_id)
         if not api_response:
             raise ValidationError("Данные не получены из Kinopoisk API", 500)
 
@@ -152,24 +312,64 @@ class MovieHandler:
         logger.info("Асинхронно загружен и сохранен фильм %s: success=%s", kp_id, success)
         return api_response.get("id", -1)
 
+    @classmethod
+    @handle_exceptions("Поиск фильмов")
+    async def search(cls, query: str) -> list[dict]:
+        """
+        Поиск фильмов в Kinopoisk API по названию (автодополнение на странице добавления).
+        Фильмы, которые уже есть в клубе, помечаются по локальной таблице Movie.
+        :param query: Строка поиска.
+        :return: Список найденных фильмов.
+        """
+        if not isinstance(query, str) or len(query.strip()) < KP_Movie.SEARCH_MIN_LENGTH:
+            raise ValidationError("Слишком короткий запрос", 400)
+
+        kp_client = KP_Movie()
+        docs = await kp_client.asearch(query)
+        if docs is None:
+            raise ValidationError("Данные не получены из Kinopoisk API", 500)
+
+        ids = [doc["id"] for doc in docs if doc.get("id")]
+        owned = {
+            kp_id: is_archive
+            async for kp_id, is_archive in Movie.mgr.filter(kp_id__in=ids).values_list("kp_id", "is_archive")
+        }
+
+        movies = [
+            {
+                "kp_id": doc["id"],
+                "name": doc.get("name") or doc.get("alternativeName") or doc.get("enName"),
+                "alternative_name": doc.get("alternativeName"),
+                "year": doc.get("year"),
+                "poster": (doc.get("poster") or {}).get("previewUrl"),
+                "rating_kp": (doc.get("rating") or {}).get("kp"),
+                "in_club": doc["id"] in owned,
+                "is_archive": owned.get(doc["id"], False),
+            }
+            for doc in docs
+            if doc.get("id")
+        ]
+        logger.info("Поиск фильмов %r: найдено %d, из них в клубе %d", query, len(movies), len(owned))
+        return movies
+
     @classmethod
     async def _download_and_save_poster(cls, movie_model: Movie, poster_url: str, kp_id: str) -> bool:
         """
         Асинхронная загрузка и сохранение постера фильма.
         """
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.get(poster_url)
-                response.raise_for_status()
+            # общий пул соединений KP: постеры лежат на нескольких CDN-хостах, keep-alive окупается
+            response = await KP.get_async_client().get(poster_url)
+            response.raise_for_status()
 
-                file_name = f"poster_{kp_id}.jpg"
-                content_file = ContentFile(response.content)
+            file_name = f"poster_{kp_id}.jpg"
+            content_file = ContentFile(response.content)
 
-                save_file = sync_to_async(movie_model.poster_local.save, thread_sensitive=True)
-                await save_file(file_name, content_file, save=True)
+            save_file = sync_to_async(movie_model.poster_local.save, thread_sensitive=True)
+            await save_file(file_name, content_file, save=True)
 
-                logger.info("Загружен и сохранен постер для фильма %s", kp_id)
-                return True
+            logger.info("Загружен и сохранен постер для фильма %s", kp_id)
+            return True
         except Exception as e:
             logger.error("Не удалось загрузить постер для фильма %s: %s", kp_id, str(e))
             movie_model.poster_local = None
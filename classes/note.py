@@ -5,9 +5,11 @@ from asgiref.sync import sync_to_async
 from pydantic import ValidationError as PydanticValidationError
 from rest_framework.exceptions import ValidationError
 
-from lists.models import Movie, Note, User
-from lists.serializers import NoteSerializer
+from classes.caching import CacheTags
+from lists.models import Movie, MovieCard, Note, User
+from lists.projections import NOTE
 from pydantic_models import RateMovieRequestModel
+from utils.cache_handler import cached
 from utils.exception_handler import handle_exceptions
 
 
@@ -22,6 +24,7 @@ class NoteHandler:
 
     @classmethod
     @handle_exceptions("Заметки")
+    @cached("notes", ttl=60 * 60, tags=(CacheTags.NOTES,))
     @sync_to_async
     def get_all_notes(cls, result_format: str = "dict", movie_info: bool = False) -> dict[int, list[dict]] | list[dict]:
         """
@@ -33,9 +36,8 @@ class NoteHandler:
         if result_format not in ("dict", "list"):
             raise ValidationError("Некорректный result_format")
 
-        raw_notes = Note.mgr.all()
-        serialized_notes = NoteSerializer(raw_notes, many=True).data
-        logger.info("Получено %d заметок", raw_notes.count())
+        serialized_notes = NOTE.all(Note.mgr.all())
+        logger.info("Получено %d заметок", len(serialized_notes))
 
         if result_format == "list":
             return serialized_notes
@@ -84,6 +86,9 @@ class NoteHandler:
             update_fields=["rating", "text"],
             unique_fields=["movie", "user"],
         )
+        # bulk_create не шлёт post_save — сбрасываем кэш заметок и обновляем карточку фильма сами
+        await sync_to_async(MovieCard.refresh)([film.kp_id])
+        await CacheTags.ainvalidate(CacheTags.NOTES)
         logger.info(
             "Создана/обновлена заметка для пользователя %s, фильма %s",
             user.id,
@@ -0,0 +1,89 @@
+import base64
+from collections.abc import Callable
+from datetime import date
+from decimal import Decimal, InvalidOperation
+import json
+from typing import Any
+
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import ValidationError
+
+
+class KeysetPaginator:
+    """
+    Постраничная выдача по ключу (keyset, «курсорная»): порядок — order_field по убыванию
+    (или по возрастанию), при равенстве pk по возрастанию. Следующая страница начинается строго
+    после последней строки предыдущей, поэтому читается ровно limit + 1 строк по индексу (без OFFSET),
+    а вставка или удаление фильмов выше по списку не сдвигает страницы.
+
+    Курсор — base64url от JSON [значение order_field строкой, pk]: непрозрачен для клиента,
+    но стабилен — одна и та же строка даёт один и тот же курсор.
+    """
+
+    DEFAULT_LIMIT: int = 48
+    MAX_LIMIT: int = 200
+
+    def __init__(self, order_field: str, descending: bool = True, cast: Callable[[str], Any] = Decimal) -> None:
+        """
+        :param order_field: (str) поле или аннотация сортировки, например rating_kp или movie__premiere.
+        :param descending: (bool) по убыванию order_field.
+        :param cast: функция, восстанавливающая значение order_field из строки курсора.
+        """
+        self.order_field = order_field
+        self.descending = descending
+        self.cast = cast
+
+    def parse_limit(self, limit: int | str | None) -> int:
+        """:return: (int) размер страницы; None — DEFAULT_LIMIT."""
+        if limit is None or limit == "":
+            return self.DEFAULT_LIMIT
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError) as e:
+            raise ValidationError("Некорректный limit", 400) from e
+        if not 1 <= limit <= self.MAX_LIMIT:
+            raise ValidationError(f"limit должен быть от 1 до {self.MAX_LIMIT}", 400)
+        return limit
+
+    @staticmethod
+    def encode(value: Any, pk: int) -> str:
+        value = value.isoformat() if isinstance(value, date) else str(value)
+        payload = json.dumps([value, pk], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> tuple[Any, int]:
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            value, pk = json.loads(payload)
+            if type(pk) is not int or type(value) is not str:
+                raise ValueError(pk)
+            return self.cast(value), pk
+        except (ValueError, TypeError, InvalidOperation) as e:
+            raise ValidationError("Некорректный курсор", 400) from e
+
+    def paginate(
+        self,
+        queryset: QuerySet,
+        limit: int | str | None,
+        cursor: str | None,
+        key: Callable[[Any], tuple[Any, int]],
+    ) -> tuple[list, str | None]:
+        """
+        Страница queryset после cursor.
+        :param key: функция строки → (значение order_field, pk) для курсора следующей страницы.
+        :return: (строки страницы, курсор следующей страницы или None, если это последняя).
+        """
+        limit = self.parse_limit(limit)
+        queryset = queryset.order_by(f"-{self.order_field}" if self.descending else self.order_field, "pk")
+        if cursor:
+            value, pk = self.decode(cursor)
+            after = "lt" if self.descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{self.order_field}__{after}": value}) | Q(**{self.order_field: value, "pk__gt": pk})
+            )
+
+        rows = list(queryset[: limit + 1])
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, self.encode(*key(rows[-1]))
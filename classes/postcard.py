@@ -6,9 +6,11 @@ from django.db.models import Prefetch
 from rest_framework.exceptions import ValidationError
 from rest_framework.request import Request
 
+from classes.caching import CacheTags
 from lists.models import Movie, Note
 from postcard.models import Postcard
 from postcard.serializers import PostcardSerializer
+from utils.cache_handler import cached
 from utils.exception_handler import handle_exceptions
 
 
@@ -91,6 +93,7 @@ class PostcardHandler:
         return PostcardSerializer(postcards, many=True).data
 
     @classmethod
+    @cached("postcards_ratings", ttl=60 * 60, tags=(CacheTags.POSTCARDS, CacheTags.MOVIES, CacheTags.NOTES))
     @sync_to_async
     def get_all_postcards_with_ratings(cls) -> dict[int, dict]:
         # Все открытки + подгружаем фильмы с нужными полями
@@ -203,6 +206,8 @@ class PostcardHandler:
         """
         if update_all:
             Postcard.objects.all().update(is_active=False)
+            # QuerySet.update не шлёт post_save — сбрасываем кэш открыток сами
+            CacheTags.invalidate(CacheTags.POSTCARDS)
             return True
         if not isinstance(postcard_id, int) or postcard_id <= 0:
             raise ValidationError("Некорректный ID открытки")
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+import pendulum
+
+from classes.caching import Caching
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Асинхронный token bucket: не больше rate запросов в секунду со всплеском до capacity.
+
+    Реализован через «теоретическое время прихода» (GCRA), поэтому обходится без asyncio.Lock:
+    очередной слот вычисляется синхронно, а ждём уже вне критической секции.
+    Это позволяет одному лимитеру жить в процессе, где asyncio.run вызывается несколько раз.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        """
+        :param rate: (float) сколько запросов в секунду разрешено.
+        :param capacity: (int) сколько запросов можно сделать разом после простоя.
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tat = 0.0  # время, к которому «израсходованы» все выданные токены
+        self._paused_until = 0.0
+
+    @property
+    def interval(self) -> float:
+        return 1 / self.rate if self.rate > 0 else 0.0
+
+    def reserve(self) -> float:
+        """Занимаем слот и возвращаем, сколько секунд до него ждать."""
+        now = time.monotonic()
+        tat = max(self._tat, now, self._paused_until)
+        wait = max(tat - (self.capacity - 1) * self.interval - now, self._paused_until - now, 0.0)
+        self._tat = tat + self.interval
+        return wait
+
+    async def acquire(self) -> None:
+        """Дождаться разрешения на запрос."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Остановить выдачу токенов (ответ 429 с Retry-After).
+        Касается всех ожидающих: сервер ограничивает нас целиком, а не отдельный запрос.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.warning("Лимитер API на паузе %.1f сек", seconds)
+
+
+class DailyQuota:
+    """
+    Суточная квота запросов к API. Счётчик хранится в diskcache, поэтому общий для
+    веб-приложения и management-команд и переживает перезапуски.
+    """
+
+    KEY_PREFIX: str = "kp_quota"
+    KEY_TTL: int = 60 * 60 * 48  # счётчик за день нужен не дольше пары суток
+
+    def __init__(self, cache: Caching, limit: int | None = None) -> None:
+        """
+        :param cache: (Caching) хранилище счётчика.
+        :param limit: (int) запросов в сутки. 0 или None — без ограничения.
+        """
+        self.cache = cache
+        self.limit = limit
+
+    def _key(self) -> str:
+        # сутки считаем по часовому поясу приложения
+        return f"{self.KEY_PREFIX}:{pendulum.now(tz=settings.TIME_ZONE).to_date_string()}"
+
+    def used(self) -> int:
+        return self.cache.get_cache(self._key(), use_memory=False) or 0
+
+    def remaining(self) -> int | None:
+        """Сколько запросов осталось сегодня. None — квота не ограничена."""
+        if not self.limit:
+            return None
+        return max(self.limit - self.used(), 0)
+
+    def consume(self, amount: int = 1) -> bool:
+        """
+        Списать запросы из квоты.
+        :return: (bool) False, если квота на сегодня исчерпана (ничего не списано).
+        """
+        if not self.limit:
+            return True
+        # сначала списываем (incr атомарен между процессами), потом сверяем: проверка до записи
+        # пропустила бы сверх лимита одновременные запросы воркеров и команд
+        key = self._key()
+        used = self.cache.incr_cache(key, amount, ttl=self.KEY_TTL)
+        if used is None:
+            return True  # кэш недоступен — квоту не считаем, как и без лимита
+        if used > self.limit:
+            self.cache.incr_cache(key, -amount, ttl=self.KEY_TTL)
+            logger.warning("Суточная квота API исчерпана: %d из %d", used - amount, self.limit)
+            return False
+        return True
@@ -0,0 +1,88 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+import threading
+from typing import Any
+from weakref import WeakKeyDictionary
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """Запрос, который сейчас выполняется в одном из потоков."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.exception: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Схлопывание одинаковых одновременных запросов (single-flight).
+
+    Первый вызов с ключом выполняет функцию, остальные с тем же ключом дожидаются
+    его результата вместо того, чтобы повторять запрос. Как только запрос завершился,
+    ключ освобождается — следующий вызов снова пойдёт за свежими данными (или в кэш).
+
+    Синхронные вызовы схлопываются между потоками, асинхронные — внутри одного event loop
+    (задачи asyncio привязаны к своему циклу).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self._tasks: WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Task]] = WeakKeyDictionary()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Выполнить fn() или дождаться результата такого же вызова из другого потока.
+
+        :param key: (str) ключ запроса, одинаковый у одинаковых запросов.
+        :param fn: функция без аргументов, делающая сам запрос.
+
+        :return: результат fn(). Исключение ведущего вызова получают все ожидающие.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            logger.debug("Ждём уже идущий запрос %s", key)
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Асинхронный вариант do: fn — корутинная функция без аргументов.
+
+        Запрос выполняется отдельной задачей, поэтому отмена одного из ожидающих
+        не обрывает запрос остальным.
+        """
+        loop = asyncio.get_running_loop()
+        tasks = self._tasks.setdefault(loop, {})
+
+        task = tasks.get(key)
+        if task is None:
+            task = tasks[key] = loop.create_task(fn())
+            task.add_done_callback(lambda _: tasks.pop(key, None))
+        else:
+            logger.debug("Ждём уже идущий запрос %s", key)
+
+        return await asyncio.shield(task)
@@ -1,6 +1,7 @@
 from collections import namedtuple
 from itertools import combinations
 import logging
+from typing import Any
 
 from asgiref.sync import sync_to_async
 from django.db.models import Count
@@ -9,8 +10,11 @@ import pandas as pd
 import plotly
 import plotly.express as px
 
-from lists.models import Actor, Director, Genre, Writer
+from lists.models import Actor, Director, Genre, Movie, Writer
+from lists.projections import MOVIE_STATS
+from utils.cache_handler import cached
 
+from .caching import CacheTags
 from .movie import MovieHandler, MoviesStructure
 from .note import NoteHandler
 from .postcard import PostcardHandler
@@ -67,18 +71,44 @@ class Statistic:
     MIN_COMMON_MOVIES = 3  # минимум общих фильмов, чтобы сравнивать вкусы пары
     Rating = namedtuple("Rating", ["top", "bot"])
 
+    @classmethod
+    @cached("statistic", ttl=60 * 60, key=lambda: "page", tags=(CacheTags.MOVIES, CacheTags.NOTES, CacheTags.USERS))
+    async def get_page_context(cls) -> dict[str, Any]:
+        """
+        Все блоки страницы статистики (pandas-расчёты и графики plotly).
+        Кэшируются до изменения фильмов, оценок или участников.
+        """
+        statistic = cls()
+        await statistic.extract_data()
+        return {
+            "statistic": await statistic.statistic(),
+            "movies_rating": await statistic.outstanding_movies(),
+            "genres_table": await statistic.outstanding_genres(),
+            "graphs": await statistic.draw(),
+            "persons": await statistic.outstanding_persons(),
+            "users_statistic": await statistic.users_statistic(),
+            "records": await statistic.records(),
+            "compatibility": await statistic.taste_compatibility(),
+            "disputes": await statistic.controversial_movies(),
+        }
+
+    @staticmethod
+    @sync_to_async
+    def _archive_movies() -> pd.DataFrame:
+        """Фильмы архива с типами для pandas (MOVIE_STATS): рейтинги float, премьера ISO 8601."""
+        return pd.DataFrame(MOVIE_STATS.all(Movie.mgr.filter(is_archive=True)), columns=list(MOVIE_STATS.fields))
+
     async def extract_data(self) -> None:
         """
         Загружаем из бд все нужные таблицы и кастуем их в DataFrame
         """
-        archive_movies = await MovieHandler.get_all_movies("rating", is_archive=True)
+        archive_movies = await self._archive_movies()
         notes = await NoteHandler.get_all_notes("list")
         users = await UserHandler.get_all_users()
 
         # формат dataframe
         genres = await ModelsHandler.get_all(Genre)
         notes = pd.DataFrame(notes)
-        archive_movies = pd.DataFrame(archive_movies)
 
         # участники: отображаемое имя — first_name, если задано, иначе username
         # (битые аватарки уже подменены в UserHandler)
@@ -86,11 +116,8 @@ class Statistic:
         users["name"] = users["first_name"].replace("", np.nan).fillna(users["username"])
         self.users = users[["id", "name", "avatar"]]
 
-        # Невероятные приключения с исправлением типа для рейтинга.
-        # Скорее всего из-за запятых - 3,5 вместо 3.5
-        wrong_types = ["rating_kp", "rating_imdb"]
-        archive_movies[wrong_types] = archive_movies[wrong_types].replace(",", ".", regex=True)
-        archive_movies[wrong_types] = archive_movies[wrong_types].astype(np.float64).round(2)
+        ratings = ["rating_kp", "rating_imdb"]
+        archive_movies[ratings] = archive_movies[ratings].round(2)
 
         # добавляем наши оценки фильмов
         polka = notes.groupby("movie", as_index=False).agg({"rating": "mean", "user": "count"}).round(1)
@@ -0,0 +1,65 @@
+# Общее для тестов клиента Кинопоиска. Сеть не нужна: общий httpx-клиент подменяется
+# клиентом на httpx.MockTransport, кэш — временной папкой.
+import asyncio
+from collections.abc import Callable
+from contextlib import ExitStack
+import tempfile
+from typing import Any
+from unittest.mock import patch
+
+import httpx
+
+from classes.caching import Caching
+from classes.kp import KP, KP_Movie
+
+
+MOVIE = {"id": 301, "name": "Матрица", "rating": {"kp": 8.5, "imdb": 8.7}}
+
+
+class KPClientTestMixin:
+    """Подмена общего клиента KP и отдельный кэш на время теста."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.requests: list[httpx.Request] = []
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self.cache = Caching(self._cache_dir.name, KP.CACHE_DURATION)
+
+    def tearDown(self) -> None:
+        KP._async_client = None
+        KP._async_client_loop = None
+        self._cache_dir.cleanup()
+        super().tearDown()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(200, json=MOVIE)
+
+    def mock_client(self, handler: Callable | None = None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler or self.handler))
+
+    def install_client(self) -> httpx.AsyncClient:
+        """Клиент для асинхронного теста: принадлежит его event loop."""
+        client = self.mock_client()
+        KP._async_client = client
+        KP._async_client_loop = asyncio.get_running_loop()
+        return client
+
+    def patch_kp(self, target: str, handler: Callable | None = None) -> ExitStack:
+        """
+        Подмена KP_Movie в синхронном коде (view, команды), который сам запускает event loop.
+
+        :param target: (str) путь к KP_Movie в модуле вызывающего кода.
+        :param handler: (Callable | None) обработчик MockTransport; None — self.handler.
+        """
+
+        def kp_factory(**kwargs: Any) -> KP_Movie:
+            return KP_Movie(cache=self.cache, **kwargs)
+
+        # атрибуты класса, которые вызывающий код читает до создания экземпляра
+        kp_factory.BATCH_SIZE = KP_Movie.BATCH_SIZE
+        kp_factory.SEARCH_MIN_LENGTH = KP_Movie.SEARCH_MIN_LENGTH
+        stack = ExitStack()
+        stack.enter_context(patch(target, kp_factory))
+        stack.enter_context(patch.object(KP, "get_async_client", return_value=self.mock_client(handler)))
+        return stack
@@ -0,0 +1,161 @@
+# Тесты Caching: L1 в памяти процесса, асинхронный API, компактный кодек и пространства из настроек.
+import tempfile
+import threading
+from typing import Any
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from classes.cache_codec import CompactDisk
+from classes.caching import CacheRegistry, CacheTags, Caching
+
+
+class CachingMemoryTierTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self.cache = Caching(self._cache_dir.name, 60, memory_limit=4096)
+
+    def tearDown(self) -> None:
+        Caching._memory_tiers.clear()
+        self._cache_dir.cleanup()
+
+    def test_hot_key_is_served_from_memory_as_a_copy(self) -> None:
+        self.cache.set_cache("users", [{"name": "a"}])
+        self.cache.get_cache("users")[0]["name"] = "changed"
+        with patch("diskcache.Cache.get", side_effect=AssertionError("диск не нужен")):
+            self.assertEqual(self.cache.get_cache("users"), [{"name": "a"}])
+        self.assertEqual(self.cache.memory_stats()["hits"], 1)
+
+    def test_delete_is_seen_by_every_instance_on_the_directory(self) -> None:
+        other = Caching(self._cache_dir.name, 60, memory_limit=1024)
+        self.cache.set_cache("users", ["a"])
+        self.assertEqual(other.get_cache("users"), ["a"])
+        self.cache.delete_cache("users")
+        self.assertIsNone(other.get_cache("users"))
+
+    def test_other_process_delete_drops_memory(self) -> None:
+        self.cache.set_cache("users", ["a"])
+        self.cache.get_cache("users")
+        # другой процесс: свой L1, общий diskcache
+        Caching._memory_tiers.clear()
+        Caching(self._cache_dir.name, 60, memory_limit=1024).delete_cache("users")
+        with patch.object(Caching, "GENERATION_CHECK", 0):
+            self.assertIsNone(self.cache.get_cache("users"))
+
+    def test_lru_is_bounded_by_size(self) -> None:
+        for i in range(50):
+            self.cache.set_cache(f"key:{i}", "x" * 200)
+            self.cache.get_cache(f"key:{i}")
+        stats = self.cache.memory_stats()
+        self.assertLessEqual(stats["bytes"], 4096)
+        self.assertLess(stats["entries"], 50)
+        self.assertEqual(self.cache.get_cache("key:0"), "x" * 200)  # вытесненное читается с диска
+
+
+class CachingAsyncTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self.cache = Caching(self._cache_dir.name, 60, memory_limit=4096)
+
+    def tearDown(self) -> None:
+        Caching._memory_tiers.clear()
+        self._cache_dir.cleanup()
+
+    async def test_disk_io_runs_off_the_event_loop(self) -> None:
+        loop_thread = threading.get_ident()
+        threads = set()
+        disk_get = Caching.get_cache
+
+        def get_cache(cache: Caching, *args: Any) -> Any:
+            threads.add(threading.get_ident())
+            return disk_get(cache, *args)
+
+        self.assertTrue(await self.cache.aset("users", ["a"]))
+        with patch.object(Caching, "get_cache", get_cache):
+            self.assertEqual(await self.cache.aget_many(["users", "missing"]), {"users": ["a"]})
+        self.assertNotIn(loop_thread, threads)
+        self.assertTrue(await self.cache.adelete("users"))
+        self.assertIsNone(await self.cache.aget("users"))
+
+    async def test_memory_hit_skips_the_pool(self) -> None:
+        await self.cache.aset("users", ["a"])
+        self.assertEqual(await self.cache.aget("users"), ["a"])
+        with patch.object(Caching, "arun", side_effect=AssertionError("пул не нужен")):
+            self.assertEqual(await self.cache.aget("users"), ["a"])
+            self.assertEqual(await self.cache.aget_many(["users"]), {"users": ["a"]})
+
+    async def test_aset_many_writes_every_key(self) -> None:
+        self.assertTrue(await self.cache.aset_many({"a": 1, "b": 2}, ttl=10))
+        self.assertEqual(self.cache.get_cache("b"), 2)
+
+
+class CompactDiskTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self._cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self._cache_dir.cleanup()
+
+    def test_values_round_trip_in_every_format(self) -> None:
+        cache = Caching(self._cache_dir.name, 60, codec="json", compress_threshold=100)
+        movie = {"id": 301, "persons": [{"name": "Киану Ривз", "rating": 8.7}] * 20, "slogan": None}
+        values = {"movie": movie, "small": {"id": 1}, "tuple": (1, 2), "int_keys": {1: "a"}, "count": 5}
+        for key, value in values.items():
+            cache.set_cache(key, value)
+        for key, value in values.items():
+            self.assertEqual(cache.get_cache(key), value)
+        disk = CompactDisk(self._cache_dir.name, codec="json", compress_threshold=100)
+        self.assertTrue(disk.encode(movie).startswith(CompactDisk.ZLIB))
+        self.assertTrue(disk.encode({"id": 1}).startswith(CompactDisk.JSON))
+        self.assertFalse(disk.encode((1, 2)).startswith(CompactDisk.JSON))  # кортеж json превратил бы в список
+
+    def test_switching_codec_keeps_old_entries_readable(self) -> None:
+        Caching(self._cache_dir.name, 60).set_cache("users", [{"name": "a"}])
+        self.assertEqual(
+            Caching(self._cache_dir.name, 60, codec="json", compress_threshold=1).get_cache("users"), [{"name": "a"}]
+        )
+
+    def test_unknown_codec_fails_initialization(self) -> None:
+        self.assertFalse(Caching(self._cache_dir.name, codec="yaml").get_status())
+
+
+class CacheRegistryTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self._cache_dir = tempfile.TemporaryDirectory()
+        patcher = patch.dict(CacheRegistry._instances, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        Caching._memory_tiers.clear()
+        self._cache_dir.cleanup()
+
+    def test_namespace_settings_are_applied(self) -> None:
+        namespaces = {
+            "hot": {"ttl": 5, "size_limit": 2**20, "eviction_policy": "least-frequently-used", "cull_limit": 3},
+            "sharded": {"shards": 2},
+        }
+        with self.settings(CACHE_DIRECTORY=self._cache_dir.name, CACHE_NAMESPACES=namespaces):
+            hot = CacheRegistry.get("hot")
+            self.assertIs(CacheRegistry.get("hot"), hot)
+            self.assertTrue(hot.get_status())
+            self.assertEqual(hot.name, "hot")
+            settings = hot.diskcache_settings()
+            self.assertEqual(settings["eviction_policy"], "least-frequently-used")
+            self.assertEqual((settings["size_limit"], settings["cull_limit"]), (2**20, 3))
+
+            sharded = CacheRegistry.get("sharded")
+            self.assertTrue(sharded.set_cache("key", 1, tag=CacheTags.MOVIES))
+            self.assertEqual(sharded.invalidate_tag(CacheTags.MOVIES), 1)
+
+    def test_unknown_namespace_is_a_configuration_error(self) -> None:
+        with self.settings(CACHE_NAMESPACES={}), self.assertRaises(ImproperlyConfigured):
+            CacheRegistry.get("missing")
+
+    def test_invalid_option_value_is_a_configuration_error(self) -> None:
+        namespaces = {"typo": {"eviction_policy": "least-recently-usd"}}
+        with self.settings(CACHE_DIRECTORY=self._cache_dir.name, CACHE_NAMESPACES=namespaces):
+            with self.assertRaises(ImproperlyConfigured):
+                CacheRegistry.get("typo")
+            self.assertNotIn("typo", CacheRegistry._instances)
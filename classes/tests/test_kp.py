@@ -0,0 +1,423 @@
+# Тесты клиента Кинопоиска: общий httpx-клиент, пачки, поиск, single-flight, stale-while-revalidate,
+# предохранитель и повторы.
+import asyncio
+from collections.abc import Callable
+import threading
+import time
+from typing import Any
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+import httpx
+from pydantic import AliasChoices, AliasPath
+
+from classes.caching import Caching
+from classes.circuit_breaker import CircuitBreaker
+from classes.kp import KP, KP_Movie
+from classes.single_flight import SingleFlight
+from classes.tests import MOVIE, KPClientTestMixin
+from lists.models import Movie
+from pydantic_models import KPFilmModel
+
+
+@override_settings(KP_API_TOKEN="test-token")
+class KPAsyncClientTests(KPClientTestMixin, SimpleTestCase):
+    async def test_aget_movie_by_id_uses_shared_client(self) -> None:
+        client = self.install_client()
+        movie = await KP_Movie(cache=self.cache).aget_movie_by_id(301)
+
+        self.assertEqual(movie["name"], "Матрица")
+        self.assertIs(KP.get_async_client(), client)
+        self.assertEqual(str(self.requests[0].url), "https://api.poiskkino.dev/v1.4/movie/301")
+        # ключ передаётся в запросе, а не в клиенте: пул общий и для постеров со сторонних хостов
+        self.assertEqual(self.requests[0].headers["X-API-KEY"], "test-token")
+        self.assertNotIn("X-API-KEY", client.headers)
+
+    async def test_second_call_is_served_from_cache(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        await kp.aget_movie_by_id(301)
+        await kp.aget_movie_by_id(301)
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_http_error_sets_error(self) -> None:
+        self.handler = lambda request: httpx.Response(404, json={})
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        self.assertIsNone(await kp.aget_movie_by_id(404))
+        self.assertIn("HTTP error", kp.error)
+
+    @override_settings(KP_DAILY_QUOTA=10)
+    async def test_cache_io_stays_off_the_event_loop(self) -> None:
+        # успех, окончательный отказ (кэшируется) и сбой API (предохранитель) — всё через diskcache
+        statuses = iter([200, 404, 500])
+        self.handler = lambda request: httpx.Response(next(statuses), json=MOVIE)
+        self.install_client()
+        loop_thread = threading.get_ident()
+        calls_on_loop = []
+
+        def on_loop(method: Callable) -> Callable:
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if threading.get_ident() == loop_thread:
+                    calls_on_loop.append(method.__name__)
+                return method(*args, **kwargs)
+
+            return wrapper
+
+        with patch.multiple(
+            Caching,
+            **{
+                name: on_loop(getattr(Caching, name))
+                for name in ("get_cache", "set_cache", "incr_cache", "delete_cache")
+            },
+        ):
+            for movie_id in (301, 404, 500):
+                await KP_Movie(cache=self.cache).aget_movie_by_id(movie_id)
+
+        self.assertEqual(calls_on_loop, [])
+
+    async def test_invalid_movie_id(self) -> None:
+        kp = KP_Movie()
+        self.assertIsNone(await kp.aget_movie_by_id(-1))
+        self.assertEqual(kp.error, "Invalid movie_id provided")
+
+    async def test_client_is_recreated_for_new_event_loop(self) -> None:
+        stale = httpx.AsyncClient()
+        KP._async_client = stale
+        KP._async_client_loop = object()  # клиент от другого цикла (asyncio.run в командах)
+        self.assertIsNot(KP.get_async_client(), stale)
+        await KP.aclose_clients()
+        self.assertIsNone(KP._async_client)
+
+
+class KPAsyncClientLifetimeTests(SimpleTestCase):
+    def tearDown(self) -> None:
+        KP._async_client = None
+        KP._async_client_loop = None
+        KP._async_client_closer = None
+
+    def test_client_is_closed_with_its_event_loop(self) -> None:
+        async def client() -> httpx.AsyncClient:
+            return KP.get_async_client()
+
+        # asyncio.run отменяет оставшиеся задачи — сторож закрывает клиент до закрытия цикла
+        first = asyncio.run(client())
+        self.assertTrue(first.is_closed)
+        second = asyncio.run(client())
+        self.assertIsNot(second, first)
+        self.assertTrue(second.is_closed)
+
+
+@override_settings(KP_API_TOKEN="test-token")
+class KPBatchLookupTests(KPClientTestMixin, SimpleTestCase):
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        ids = [int(i) for i in request.url.params.get_list("id")]
+        return httpx.Response(200, json={"docs": [{"id": i, "name": f"Фильм {i}"} for i in ids], "pages": 1})
+
+    async def test_batch_request_and_fan_out_to_per_id_cache(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        movies = await kp.aget_movies_by_ids([1, 2, 3, 2])
+
+        self.assertEqual(sorted(movies), [1, 2, 3])
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.requests[0].url.params.get_list("id"), ["1", "2", "3"])
+        self.assertEqual(str(self.requests[0].url).split("?")[0], "https://api.poiskkino.dev/v1.4/movie")
+
+        # одиночный запрос того же фильма уже не ходит в API
+        self.assertEqual((await kp.aget_movie_by_id(2))["name"], "Фильм 2")
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_cached_ids_are_not_requested(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        await kp.aget_movies_by_ids([1])
+        await kp.aget_movies_by_ids([1, 5])
+        self.assertEqual(self.requests[-1].url.params.get_list("id"), ["5"])
+
+    async def test_ids_are_split_into_batches(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        kp.BATCH_SIZE = 2
+        movies = await kp.aget_movies_by_ids([1, 2, 3, 4, 5])
+        self.assertEqual(len(movies), 5)
+        self.assertEqual(len(self.requests), 3)
+
+
+@override_settings(KP_API_TOKEN="test-token")
+class KPSlimPayloadTests(KPClientTestMixin, SimpleTestCase):
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        persons = [
+            {"id": 1, "name": "Актёр", "photo": "a.jpg", "enProfession": "actor", "description": "Нео"},
+            {"id": 2, "name": "Продюсер", "photo": "p.jpg", "enProfession": "producer"},
+        ]
+        ids = [int(i) for i in request.url.params.get_list("id") if int(i) != 404]
+        return httpx.Response(200, json={"docs": [{**MOVIE, "id": i, "persons": persons} for i in ids], "pages": 1})
+
+    def test_slim_fields_cover_models(self) -> None:
+        # каждое поле ответа, которое читают pydantic-модели, должно запрашиваться
+        for field in KPFilmModel.model_fields.values():
+            alias = field.validation_alias
+            choices = alias.choices if isinstance(alias, AliasChoices) else [alias]
+            for choice in choices:
+                root = choice.path[0] if isinstance(choice, AliasPath) else choice
+                if root and root != "is_archive":
+                    self.assertIn(root, KP_Movie.SLIM_FIELDS)
+
+    async def test_slim_lookup_uses_select_fields_and_trims_persons(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache, slim=True)
+        movie = await kp.aget_movie_by_id(301)
+
+        self.assertEqual(self.requests[0].url.params.get_list("selectFields"), list(KP_Movie.SLIM_FIELDS))
+        self.assertEqual(movie["persons"], [{"id": 1, "name": "Актёр", "photo": "a.jpg", "enProfession": "actor"}])
+        # в кэше лежит облегчённая версия
+        cached = self.cache.get_cache(kp._movie_key(301))["data"]
+        self.assertEqual(cached, movie)
+
+    async def test_missing_movie_is_cached_as_not_found(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache, slim=True)
+        self.assertIsNone(await kp.aget_movie_by_id(404))
+        self.assertEqual(kp.error, KP_Movie.NOT_FOUND_ERROR)
+        self.assertIsNone(await KP_Movie(cache=self.cache, slim=True).aget_movie_by_id(404))
+        self.assertEqual(len(self.requests), 1)
+
+
+SEARCH_DOCS = [
+    {"id": 301, "name": "Матрица", "alternativeName": "The Matrix", "year": 1999},
+    {"id": 302, "name": "Матрёшка", "alternativeName": None, "year": 2015},
+    {"id": 303, "name": "Матрица: Перезагрузка", "alternativeName": "The Matrix Reloaded", "year": 2003},
+]
+
+
+@override_settings(KP_API_TOKEN="test-token")
+class KPSearchTests(KPClientTestMixin, TransactionTestCase):
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(200, json={"docs": SEARCH_DOCS, "total": len(SEARCH_DOCS), "pages": 1})
+
+    async def test_longer_query_is_narrowed_from_cached_prefix(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        self.assertEqual(len(await kp.asearch("  Матр ")), 3)
+        self.assertEqual(self.requests[0].url.params["query"], "матр")
+
+        movies = await kp.asearch("матри")
+        self.assertEqual([movie["id"] for movie in movies], [301, 303])
+        # ё и е не различаются
+        self.assertEqual([movie["id"] for movie in await kp.asearch("матреш")], [302])
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_truncated_prefix_goes_upstream_when_too_few_matches(self) -> None:
+        self.handler = lambda request: self.requests.append(request) or httpx.Response(
+            200, json={"docs": SEARCH_DOCS, "total": 500, "pages": 25}
+        )
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        await kp.asearch("матр")
+        await kp.asearch("матреш")  # одно совпадение из обрезанного результата — мало
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_results_expire_after_search_cache_duration(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        await kp.asearch("матр")
+        later = time.time() + KP_Movie.SEARCH_CACHE_DURATION + 1
+        with patch("classes.kp.time.time", return_value=later):
+            await kp.asearch("матри")  # устаревший префикс не сужается
+            await kp.asearch("матр")
+        self.assertEqual(len(self.requests), 3)
+
+    def test_search_endpoint_marks_owned_movies(self) -> None:
+        Movie.mgr.create(kp_id=303, name="Матрица: Перезагрузка", is_archive=True)
+        with self.patch_kp("classes.movie.KP_Movie"):
+            response = self.client.get("/movies/search/", {"query": "матрица"})
+
+        self.assertEqual(response.status_code, 200)
+        owned = {movie["kp_id"]: (movie["in_club"], movie["is_archive"]) for movie in response.json()}
+        self.assertEqual(owned[301], (False, False))
+        self.assertEqual(owned[303], (True, True))
+
+    def test_short_query_is_rejected(self) -> None:
+        response = self.client.get("/movies/search/", {"query": "м"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.requests, [])
+
+
+@override_settings(KP_API_TOKEN="test-token")
+class KPSingleFlightTests(KPClientTestMixin, SimpleTestCase):
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=MOVIE)
+
+    def test_cache_key_does_not_depend_on_params_order(self) -> None:
+        kp = KP_Movie(cache=self.cache)
+        self.assertEqual(kp._cache_key("", {"id": [1, 2], "page": 1}), kp._cache_key("", {"page": 1, "id": [1, 2]}))
+        self.assertEqual(kp._cache_key("301", None), "https://api.poiskkino.dev/v1.4/movie/301")
+
+    async def test_concurrent_callers_share_one_request(self) -> None:
+        self.install_client()
+        movies = await asyncio.gather(*(KP_Movie(cache=self.cache).aget_movie_by_id(301) for _ in range(5)))
+        self.assertEqual(len(self.requests), 1)
+        self.assertTrue(all(movie["id"] == 301 for movie in movies))
+
+    async def test_error_is_shared_with_waiting_callers(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(500, json={})
+
+        self.handler = handler
+        self.install_client()
+        clients = [KP_Movie(cache=self.cache) for _ in range(3)]
+        await asyncio.gather(*(kp.aget_movie_by_id(301) for kp in clients))
+        self.assertEqual(len(self.requests), 1)
+        self.assertTrue(all("HTTP error" in kp.error for kp in clients))
+
+    def test_sync_calls_are_coalesced_across_threads(self) -> None:
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fetch() -> int:
+            calls.append(1)
+            release.wait(1)
+            return 42
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do("key", fetch))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, [42] * 4)
+
+
+@override_settings(KP_API_TOKEN="test-token")
+class KPStaleWhileRevalidateTests(KPClientTestMixin, SimpleTestCase):
+    async def test_stale_entry_is_served_and_refreshed_in_background(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        key = kp._cache_key("301", None)
+        self.cache.set_cache(key, {"data": {"id": 301, "name": "Старое"}, "error": None, "fresh_until": 0})
+
+        movie = await kp.aget_movie_by_id(301)
+        self.assertEqual(movie["name"], "Старое")
+
+        await asyncio.gather(*KP._refresh_tasks)
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual((await kp.aget_movie_by_id(301))["name"], "Матрица")
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_not_found_is_cached(self) -> None:
+        self.handler = lambda request: self.requests.append(request) or httpx.Response(404, json={})
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        self.assertIsNone(await kp.aget_movie_by_id(999))
+        other = KP_Movie(cache=self.cache)
+        self.assertIsNone(await other.aget_movie_by_id(999))
+        self.assertIn("HTTP error", other.error)
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_server_errors_are_not_cached(self) -> None:
+        self.handler = lambda request: self.requests.append(request) or httpx.Response(503, json={})
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        await kp.aget_movie_by_id(301)
+        await kp.aget_movie_by_id(301)
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_empty_payload_is_a_cache_hit(self) -> None:
+        self.handler = lambda request: self.requests.append(request) or httpx.Response(200, json={})
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        self.assertEqual(await kp.aget_movie_by_id(301), {})
+        self.assertEqual(await kp.aget_movie_by_id(301), {})
+        self.assertEqual(len(self.requests), 1)
+
+
+@override_settings(KP_API_TOKEN="test-token")
+class KPCircuitBreakerTests(KPClientTestMixin, SimpleTestCase):
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(503, json={})
+
+    async def test_circuit_opens_and_fails_fast(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        kp.breaker = CircuitBreaker(self.cache, "kp", min_calls=3, open_duration=60)
+        for movie_id in (1, 2, 3):
+            await kp.aget_movie_by_id(movie_id)
+        self.assertEqual(kp.breaker.state, "open")
+
+        # другой экземпляр (другой воркер) видит то же состояние через diskcache
+        other = KP_Movie(cache=self.cache)
+        self.assertIsNone(await other.aget_movie_by_id(4))
+        self.assertEqual(other.error, KP.CIRCUIT_OPEN_ERROR)
+        self.assertEqual(len(self.requests), 3)
+        self.assertGreater(other.breaker.retry_after(), 50)
+
+    def test_half_open_probe_closes_or_reopens(self) -> None:
+        breaker = CircuitBreaker(self.cache, "kp", min_calls=1, open_duration=0.05)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, "half-open")
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # пробный запрос только один
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+
+    def test_success_without_failures_writes_nothing(self) -> None:
+        breaker = CircuitBreaker(self.cache, "kp", min_calls=4)
+        with patch.object(Caching, "incr_cache", wraps=self.cache.incr_cache) as incr:
+            breaker.record_success()
+            incr.assert_not_called()
+
+        # после сбоя успехи снова считаются: 1 сбой из 4 — меньше failure_rate
+        breaker.record_failure()
+        for _ in range(3):
+            breaker.record_success()
+        self.assertEqual(breaker._counts(), (3, 1))
+        self.assertEqual(breaker.state, "closed")
+
+
+@override_settings(KP_API_TOKEN="test-token")
+class KPRetryTests(KPClientTestMixin, SimpleTestCase):
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if len(self.requests) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.05"})
+        return httpx.Response(200, json=MOVIE)
+
+    async def test_429_is_retried_after_retry_after(self) -> None:
+        self.install_client()
+        started = time.monotonic()
+        movie = await KP_Movie(cache=self.cache).aget_movie_by_id(301)
+        self.assertEqual(movie["id"], 301)
+        self.assertEqual(len(self.requests), 2)
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+    @override_settings(KP_DAILY_QUOTA=1)
+    async def test_exhausted_quota_fails_fast(self) -> None:
+        self.install_client()
+        kp = KP_Movie(cache=self.cache)
+        kp.quota.consume()
+        self.assertIsNone(await kp.aget_movie_by_id(301))
+        self.assertEqual(kp.error, "Daily API quota exhausted")
+        self.assertEqual(self.requests, [])
@@ -0,0 +1,53 @@
+# Тесты ограничителей запросов к API: TokenBucket в процессе и суточная квота в diskcache.
+import tempfile
+import threading
+
+from django.test import SimpleTestCase
+
+from classes.caching import Caching
+from classes.rate_limit import DailyQuota, TokenBucket
+
+
+class RateLimitTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self.cache = Caching(self._cache_dir.name)
+
+    def tearDown(self) -> None:
+        self._cache_dir.cleanup()
+
+    def test_token_bucket_allows_burst_then_spaces_requests(self) -> None:
+        bucket = TokenBucket(rate=10, capacity=2)
+        waits = [bucket.reserve() for _ in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertGreater(waits[2], 0)
+        self.assertGreater(waits[3], waits[2])
+
+    def test_token_bucket_pause_delays_everyone(self) -> None:
+        bucket = TokenBucket(rate=100, capacity=5)
+        bucket.pause(2)
+        self.assertGreater(bucket.reserve(), 1.5)
+
+    def test_daily_quota_is_persistent_and_exhaustible(self) -> None:
+        self.assertTrue(DailyQuota(self.cache, limit=2).consume())
+        # новый экземпляр (другой процесс) видит тот же счётчик
+        quota = DailyQuota(self.cache, limit=2)
+        self.assertEqual(quota.remaining(), 1)
+        self.assertTrue(quota.consume())
+        self.assertFalse(quota.consume())
+        self.assertEqual(quota.remaining(), 0)
+
+    def test_daily_quota_is_not_exceeded_by_concurrent_workers(self) -> None:
+        quota = DailyQuota(self.cache, limit=5)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(quota.consume())) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 5)
+        self.assertEqual(quota.used(), 5)
+
+    def test_unlimited_quota(self) -> None:
+        self.assertIsNone(DailyQuota(self.cache, limit=0).remaining())
+        self.assertTrue(DailyQuota(self.cache, limit=0).consume())
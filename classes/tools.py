@@ -1,3 +1,4 @@
+from functools import cache
 import logging
 import os
 import random
@@ -62,7 +63,7 @@ class Tools:
 
         full_path = f"{IMAGES_PATH}/themes/{theme}/{folder}"
 
-        file_names = os.listdir(full_path)
+        file_names = cls.list_images(full_path)
         if not file_names:
             logger.warning("No images found in %s", full_path)
             return empty_file
@@ -70,3 +71,27 @@ class Tools:
         random_img = random.choice(file_names)
 
         return f"/{full_path}/{random_img}"
+
+    @staticmethod
+    @cache
+    def list_images(full_path: str) -> tuple[str, ...]:
+        """
+        Файлы папки темы. Картинки тем меняются только с деплоем, поэтому список
+        читается с диска один раз на процесс, а не на каждый запрос.
+        """
+        return tuple(sorted(os.listdir(full_path)))
+
+    @classmethod
+    def warm_images(cls) -> int:
+        """
+        Заранее читает папки всех тем.
+        :return: (int) сколько папок прочитано.
+        """
+        folders = 0
+        for theme in Themes:
+            for folder in ImageFolders:
+                full_path = f"{IMAGES_PATH}/themes/{theme.value}/{folder.value}"
+                if os.path.isdir(full_path):
+                    cls.list_images(full_path)
+                    folders += 1
+        return folders
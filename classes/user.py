@@ -3,8 +3,11 @@ import logging
 from asgiref.sync import sync_to_async
 from rest_framework.exceptions import ValidationError
 
+from classes.caching import CacheTags
 from lists.models import User
+from lists.projections import USER
 from lists.serializers import UserSerializer
+from utils.cache_handler import cached
 from utils.exception_handler import handle_exceptions
 
 
@@ -33,12 +36,13 @@ class UserHandler:
 
     @classmethod
     @handle_exceptions("Пользователи")
+    @cached("users", ttl=60 * 60, tags=(CacheTags.USERS,))
     @sync_to_async
     def get_all_users(cls) -> list[dict]:
         """
         Получение всех пользователей.
         :return: Список сериализованных пользователей.
         """
-        all_app_users = User.objects.all()
-        logger.info("Получено %d пользователей", all_app_users.count())
-        return UserSerializer(all_app_users, many=True).data
+        all_app_users = USER.all(User.objects.all())
+        logger.info("Получено %d пользователей", len(all_app_users))
+        return all_app_users
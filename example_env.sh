@@ -7,6 +7,16 @@ export ENVIRONMENT=${ENVIRONMENT:-dev}
 
 # kinopoisk
 export KP_API_TOKEN=""
+# Запросов к API в секунду и суточная квота тарифа (0 — без ограничения).
+# Квота по умолчанию не ограничена; для бесплатного тарифа poiskkino — 200 запросов в сутки:
+# сверх неё запросы к API отклоняются до полуночи (по TIME_ZONE), ответы из кэша отдаются как обычно
+export KP_RATE_LIMIT="5"
+export KP_DAILY_QUOTA="0"
+
+# Папка diskcache; пространства кэша и их лимиты — CACHE_NAMESPACES в filmoclub/settings.py
+export CACHE_DIRECTORY="app_cache"
+# Прогреть кэши дорогих страниц до приёма запросов (то же, что manage.py warm_cache)
+export CACHE_PREWARM="0"
 
 # django
 export DEBUG="1"
@@ -13,6 +13,8 @@ class Photo(models.Model):
         verbose_name = "Фотография"
         verbose_name_plural = "Фотографии"
         ordering = ["-uploaded_at"]
+        # галерея: все фотографии, свежие сверху — чтение по индексу без сортировки
+        indexes = [models.Index(fields=["-uploaded_at"], name="photo_uploaded")]
 
     def __str__(self) -> str:
         return self.name
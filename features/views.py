@@ -28,30 +28,7 @@ class MoviesStatistic(GlobalDataMixin, APIView):
     http_method_names = ["get"]
 
     async def get(self, request: Request) -> HttpResponse:
-        statistic = Statistic()
-        await statistic.extract_data()
-
-        common_stats = await statistic.statistic()
-        movies = await statistic.outstanding_movies()
-        genres = await statistic.outstanding_genres()
-        graphs = await statistic.draw()
-        persons = await statistic.outstanding_persons()
-        users_stat = await statistic.users_statistic()
-        records = await statistic.records()
-        compatibility = await statistic.taste_compatibility()
-        disputes = await statistic.controversial_movies()
-
-        context = {
-            "statistic": common_stats,
-            "movies_rating": movies,
-            "genres_table": genres,
-            "graphs": graphs,
-            "persons": persons,
-            "users_statistic": users_stat,
-            "records": records,
-            "compatibility": compatibility,
-            "disputes": disputes,
-        }
+        context = await Statistic.get_page_context()
 
         return render(
             request,
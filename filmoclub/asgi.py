@@ -11,7 +11,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from filmoclub.lifespan import LifespanMiddleware
+
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "filmoclub.settings")
 
-application = get_asgi_application()
+# Lifespan-обёртка: общие ресурсы процесса (пул соединений к Кинопоиску) живут от старта до остановки uvicorn
+application = LifespanMiddleware(get_asgi_application())
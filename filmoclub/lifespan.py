@@ -0,0 +1,98 @@
+"""
+ASGI lifespan для приложения.
+
+Django сам lifespan-события не обрабатывает (на scope["type"] == "lifespan" падает с ValueError,
+и uvicorn просто отключает lifespan). Поэтому оборачиваем Django-приложение и выполняем
+свои хуки на старте и остановке uvicorn: открываем/закрываем общие ресурсы процесса
+и, если включено, прогреваем кэши до приёма первых запросов.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+async def on_startup() -> None:
+    """Открываем общие ресурсы процесса."""
+    # Импорт внутри: модуль загружается до django.setup()
+    from classes.kp import KP
+
+    KP.get_async_client()
+    logger.info("Lifespan: общий httpx-клиент Кинопоиска открыт")
+
+
+async def prewarm_caches() -> None:
+    """
+    Прогрев кэшей дорогих страниц (CACHE_PREWARM): uvicorn начнёт принимать запросы,
+    когда он закончится, но не позже CACHE_PREWARM_TIMEOUT секунд.
+    """
+    from django.conf import settings
+
+    if not settings.CACHE_PREWARM:
+        return
+
+    from classes.cache_warmup import CacheWarmer
+
+    try:
+        results = await asyncio.wait_for(CacheWarmer.warm(), timeout=settings.CACHE_PREWARM_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("Lifespan: прогрев кэшей не уложился в %.0f с", settings.CACHE_PREWARM_TIMEOUT)
+        return
+    report = ", ".join(f"{r.target} {r.seconds:.2f} с" + (" (ошибка)" if r.error else "") for r in results)
+    logger.info("Lifespan: кэши прогреты: %s", report)
+
+
+async def on_shutdown() -> None:
+    """Закрываем общие ресурсы процесса."""
+    from classes.kp import KP
+
+    await KP.aclose_clients()
+    logger.info("Lifespan: общий httpx-клиент Кинопоиска закрыт")
+
+
+class LifespanMiddleware:
+    """
+    Перехватывает lifespan-события, остальные запросы отдаёт Django.
+    Хуки best-effort: сбой хука логируется, но приложение всё равно стартует.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        startup_hooks: tuple[Callable[[], Awaitable[None]], ...] = (on_startup, prewarm_caches),
+        shutdown_hooks: tuple[Callable[[], Awaitable[None]], ...] = (on_shutdown,),
+    ) -> None:
+        self.app = app
+        self.startup_hooks = startup_hooks
+        self.shutdown_hooks = shutdown_hooks
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "lifespan":
+            await self.app(scope, receive, send)
+            return
+
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self._run_hooks(self.startup_hooks)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self._run_hooks(self.shutdown_hooks)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _run_hooks(hooks: tuple[Callable[[], Awaitable[None]], ...]) -> None:
+        for hook in hooks:
+            try:
+                await hook()
+            except Exception:
+                logger.exception("Lifespan-хук %s завершился ошибкой", hook.__name__)
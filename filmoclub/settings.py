@@ -202,6 +202,79 @@ TELEGRAM_GROUP_ID = os.getenv("TELEGRAM_GROUP_ID")
 
 # kinopoisk api token
 KP_API_TOKEN = os.getenv("KP_API_TOKEN")
+# Адрес API и папка кэша ответов. Для бенчмарков API подменяется локальным scripts/fake_kp_server.py
+KP_BASE_URL = os.getenv("KP_BASE_URL", "https://api.poiskkino.dev/v1.4/")
+KP_CACHE_DIRECTORY = os.getenv("KP_CACHE_DIRECTORY")
+# Ограничения API: запросов в секунду и в сутки (0 — без лимита). Суточную квоту задаём под тариф
+# в env (бесплатный тариф poiskkino — 200 в сутки, см. example_env.sh)
+KP_RATE_LIMIT = float(os.getenv("KP_RATE_LIMIT", "5"))
+KP_DAILY_QUOTA = int(os.getenv("KP_DAILY_QUOTA", "0"))
+
+# Пространства кэша (CacheRegistry в classes/caching.py). У каждого своя папка diskcache
+# (directory, по умолчанию CACHE_DIRECTORY/<имя>) и свои настройки:
+#   ttl — время жизни записи по умолчанию, сек; size_limit — объём на диске, байт;
+#   eviction_policy — least-recently-used / least-frequently-used / least-recently-stored / none;
+#   cull_limit — сколько записей вытеснять за одну запись сверх size_limit;
+#   shards — FanoutCache из N баз для параллельной записи (0 — одна база);
+#   memory_limit / memory_ttl — L1 в памяти процесса (байт / сек).
+CACHE_DIRECTORY = os.getenv("CACHE_DIRECTORY", "app_cache")
+CACHE_NAMESPACES = {
+    # ответы Кинопоиска, счётчики квоты и предохранителя
+    "kp": {
+        "directory": KP_CACHE_DIRECTORY,
+        "ttl": 60 * 2,
+        "size_limit": 512 * 1024 * 1024,
+        "eviction_policy": "least-recently-used",
+        "memory_limit": 16 * 1024 * 1024,
+        # zlib сжимает ответы API впятеро ценой ~20 мкс на чтение; json + zlib не меньше,
+        # но декодируется медленнее pickle (scripts/bench_cache_codec.py)
+        "codec": "pickle",
+        "compress_threshold": 1024,
+    },
+    # данные для всех страниц (GlobalDataMixin)
+    "global": {
+        "ttl": 60 * 15,
+        "size_limit": 16 * 1024 * 1024,
+        "eviction_policy": "least-recently-used",
+        "memory_limit": 1024 * 1024,
+    },
+    # результаты обработчиков (@cached), сбрасываются по тегам
+    "handlers": {
+        "ttl": 60 * 60,
+        "size_limit": 256 * 1024 * 1024,
+        "eviction_policy": "least-frequently-used",
+        "cull_limit": 20,
+        "shards": 4,
+        "memory_limit": 16 * 1024 * 1024,
+        # списки сериализованных моделей: сжимаются только крупные, мелкие отдаёт L1
+        "codec": "pickle",
+        "compress_threshold": 4096,
+    },
+}
+
+# Кэш результатов обработчиков (@cached в utils/cache_handler.py). В тестах выключен (filmoclub/test_runner.py)
+HANDLER_CACHE_ENABLED = os.getenv("HANDLER_CACHE_ENABLED", "1") == "1"
+
+# Кэш фрагментов шаблонов ({% cache ... using="fragments" %}): отрисованная сетка постеров.
+# В ключе фрагмента версии наборов данных (CacheTags.versions) — записи не сбрасываются, а устаревают
+# и вытесняются по size_limit. В тестах выключен, как и HANDLER_CACHE_ENABLED
+FRAGMENT_CACHE_ENABLED = os.getenv("FRAGMENT_CACHE_ENABLED", "1") == "1"
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "fragments": {
+        "BACKEND": "diskcache.DjangoCache" if FRAGMENT_CACHE_ENABLED else "django.core.cache.backends.dummy.DummyCache",
+        "LOCATION": os.path.join(CACHE_DIRECTORY, "fragments"),
+        "OPTIONS": {"SHARDS": 4, "size_limit": 64 * 1024 * 1024, "eviction_policy": "least-recently-used"},
+    },
+}
+
+# Тесты работают с кэшами во временной папке, а не в CACHE_DIRECTORY (см. filmoclub/test_runner.py)
+TEST_RUNNER = "filmoclub.test_runner.TestRunner"
+
+# Прогрев кэшей (classes/cache_warmup.py) на старте uvicorn, до приёма запросов.
+# Не дольше CACHE_PREWARM_TIMEOUT секунд: не успевшее прогреется первым запросом
+CACHE_PREWARM = os.getenv("CACHE_PREWARM", "0") == "1"
+CACHE_PREWARM_TIMEOUT = float(os.getenv("CACHE_PREWARM_TIMEOUT", "60"))
 
 # Код «свой-чужой»: без него блокируются изменяющие запросы (см. TeaCodeMiddleware).
 # Только ASCII (код живёт в куке). Пустой — проверка выключена.
@@ -0,0 +1,44 @@
+import tempfile
+from typing import Any
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from classes.caching import CacheRegistry, Caching
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Запуск тестов (settings.TEST_RUNNER) с кэшами во временной папке.
+
+    Пространства CacheRegistry и кэш фрагментов создаются в ней, а не в рабочей CACHE_DIRECTORY,
+    и удаляются вместе с ней после прогона. Кэш обработчиков (@cached) и фрагментов шаблонов выключен:
+    откат транзакции TestCase не шлёт сигналов, и закэшированные данные пережили бы тест.
+    Тесты самих кэшей включают их через override_settings.
+    """
+
+    def setup_test_environment(self, **kwargs: Any) -> None:
+        super().setup_test_environment(**kwargs)
+        self._cache_dir = tempfile.TemporaryDirectory(prefix="filmoclub-cache-")
+        # KP_CACHE_DIRECTORY из окружения тоже не должен достаться тестам
+        namespaces = {
+            name: {option: value for option, value in config.items() if option != "directory"}
+            for name, config in settings.CACHE_NAMESPACES.items()
+        }
+        self._cache_settings = override_settings(
+            CACHE_DIRECTORY=self._cache_dir.name,
+            CACHE_NAMESPACES=namespaces,
+            HANDLER_CACHE_ENABLED=False,
+            FRAGMENT_CACHE_ENABLED=False,
+            CACHES={**settings.CACHES, "fragments": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+        )
+        self._cache_settings.enable()
+        CacheRegistry._instances.clear()
+
+    def teardown_test_environment(self, **kwargs: Any) -> None:
+        self._cache_settings.disable()
+        CacheRegistry._instances.clear()
+        Caching._memory_tiers.clear()
+        self._cache_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -1,12 +1,16 @@
-# Тесты обработчиков ошибок проекта (filmoclub/view.py).
+# Тесты обработчиков ошибок проекта (filmoclub/view.py), тестового раннера и lifespan.
 # В тестах DEBUG всегда False, поэтому кастомные обработчики активны
 # и для запросов через test client.
 import json
 from unittest.mock import patch
 
+from django.conf import settings
 from django.http import Http404
-from django.test import Client, RequestFactory, TestCase
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase
 
+from classes.caching import CacheTags
+from classes.kp import KP_Movie
+from filmoclub.lifespan import LifespanMiddleware
 from filmoclub.view import handler404, handler500
 
 
@@ -64,3 +68,39 @@ class ErrorHandlersIntegrationTests(TestCase):
         response = client.get("/test/500/")
         self.assertEqual(response.status_code, 500)
         self.assertTemplateUsed(response, "errors/500.html")
+
+
+class TestRunnerTests(SimpleTestCase):
+    def test_caches_live_in_temporary_directory(self) -> None:
+        # рабочая папка кэша (app_cache) тестами не трогается
+        self.assertIn("filmoclub-cache-", settings.CACHE_DIRECTORY)
+        for cache in (CacheTags.cache, KP_Movie().cache):
+            self.assertTrue(cache.diskcache_settings()["directory"].startswith(settings.CACHE_DIRECTORY))
+        self.assertFalse(settings.HANDLER_CACHE_ENABLED)
+
+
+class LifespanTests(SimpleTestCase):
+    async def test_hooks_run_on_startup_and_shutdown(self) -> None:
+        calls = []
+
+        async def startup() -> None:
+            calls.append("startup")
+
+        async def broken_shutdown() -> None:
+            raise RuntimeError("хук упал")
+
+        app = LifespanMiddleware(None, startup_hooks=(startup,), shutdown_hooks=(broken_shutdown,))
+        messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+        sent = []
+
+        async def receive() -> dict:
+            return next(messages)
+
+        async def send(message: dict) -> None:
+            sent.append(message["type"])
+
+        await app({"type": "lifespan"}, receive, send)
+
+        self.assertEqual(calls, ["startup"])
+        # упавший хук не мешает корректно завершить lifespan
+        self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
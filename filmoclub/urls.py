@@ -23,6 +23,8 @@ from django.views.generic import TemplateView
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 
+from tools.views import cache_stats_view
+
 from . import view
 
 
@@ -54,12 +56,15 @@ urlpatterns = [
     # Для поисковиков; содержимое статичное, поэтому просто шаблоны
     path("robots.txt", TemplateView.as_view(template_name="robots.txt", content_type="text/plain")),
     path("sitemap.xml", TemplateView.as_view(template_name="sitemap.xml", content_type="application/xml")),
+    # своя страница админки без модели: до admin.site.urls, иначе её перехватит catch-all админки
+    path("boss/cache-stats/", admin.site.admin_view(cache_stats_view), name="admin_cache_stats"),
     path("boss/", admin.site.urls),
     path("api-auth/", include("rest_framework.urls")),
     path("movies/", include("lists.urls")),
     path("", include("postcard.urls")),
     path("features/", include("features.urls")),
     path("bar/", include("bar.urls")),
+    path("tools/", include("tools.urls")),
     # API Documentation Endpoints
     path("api/schema/", schema_view.without_ui(cache_timeout=0), name="schema"),
     path(
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ListsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "lists"
+
+    def ready(self) -> None:
+        from lists import signals  # noqa: F401
@@ -7,25 +7,38 @@
 последние N лет, заново запрашивает их у Кинопоиска и обновляет ТОЛЬКО эти поля.
 
 Остальные поля (название, описание, постер, watch_date, is_archive, оценки клуба и
-т.д.) не трогаются — сохраняются через save(update_fields=...).
+т.д.) не трогаются — сохраняются через bulk_update(fields=VOLATILE_FIELDS).
 
 Примеры:
     uv run manage.py update_recent_movies                 # премьеры за 2 года
     uv run manage.py update_recent_movies --years 3
     uv run manage.py update_recent_movies --dry-run       # показать, но не сохранять
-    uv run manage.py update_recent_movies --limit 5 --delay 2
+    uv run manage.py update_recent_movies --limit 5
+    uv run manage.py update_recent_movies --concurrency 4 --rate 2
+
+Как устроено: фильмы делятся на пачки (--batch-size, одна пачка = один запрос к API,
+KP_Movie.aget_movies_by_ids), пачки обрабатываются параллельно, но не больше
+--concurrency одновременно. Темп задаёт общий лимитер запросов KP (token bucket,
+на 429 ждёт Retry-After), а суточная квота API учитывается в diskcache — если она
+кончилась, оставшиеся пачки пропускаются. Если API лежит и предохранитель KP разомкнут,
+пачки ждут его (не дольше --max-pause), а не тратят время на заведомо неудачные запросы.
+Изменения каждой пачки сохраняются одним bulk_update.
 """
 
+import asyncio
+from dataclasses import dataclass
 from datetime import timedelta
 import logging
-import time
 
+from asgiref.sync import sync_to_async
 from django.core.management.base import BaseCommand, CommandParser
 from django.utils import timezone
 from pydantic import ValidationError as PydanticValidationError
 
-from classes.kp import KP_Movie
-from lists.models import Movie
+from classes.caching import CacheTags
+from classes.kp import KP, KP_Movie
+from classes.rate_limit import TokenBucket
+from lists.models import Movie, MovieCard
 from pydantic_models import KPFilmModel
 
 
@@ -37,81 +50,173 @@ INT_FIELDS = ("votes_kp", "votes_imdb", "fees")
 VOLATILE_FIELDS = DECIMAL_FIELDS + INT_FIELDS
 
 
+@dataclass
+class RefreshStats:
+    updated: int = 0
+    unchanged: int = 0
+    errors: int = 0
+    skipped: int = 0  # не запрошены: кончилась суточная квота или API так и не поднялось
+
+
 class Command(BaseCommand):
     help = "Обновляет оценки KP/IMDb, число голосов и кассовые сборы у фильмов с премьерой за последние N лет."
 
     def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument("--years", type=int, default=2, help="За сколько последних лет брать фильмы (по премьере).")
-        parser.add_argument("--delay", type=float, default=1.0, help="Пауза между запросами к API, сек.")
         parser.add_argument("--limit", type=int, default=0, help="Ограничить число фильмов (0 — без ограничения).")
         parser.add_argument("--dry-run", action="store_true", help="Показать изменения, но не сохранять.")
+        parser.add_argument(
+            "--batch-size", type=int, default=KP_Movie.BATCH_SIZE, help="Фильмов в одном запросе к API (до 250)."
+        )
+        parser.add_argument("--concurrency", type=int, default=2, help="Сколько пачек обрабатывать одновременно.")
+        parser.add_argument(
+            "--rate", type=float, default=0, help="Запросов к API в секунду (0 — из настройки KP_RATE_LIMIT)."
+        )
+        parser.add_argument(
+            "--max-pause", type=float, default=300, help="Сколько секунд пачка ждёт недоступный API, потом пропуск."
+        )
 
     def handle(self, *args, **options) -> None:
         years = options["years"]
-        delay = options["delay"]
         limit = options["limit"]
         dry_run = options["dry_run"]
+        batch_size = min(max(options["batch_size"], 1), KP_Movie.BATCH_SIZE)
+        concurrency = max(options["concurrency"], 1)
+        self.max_pause = max(options["max_pause"], 0)
+
+        if options["rate"] > 0:
+            KP._limiter = TokenBucket(rate=options["rate"], capacity=max(int(options["rate"]), 1))
 
         cutoff = timezone.now() - timedelta(days=365 * years)
         movies = Movie.mgr.filter(premiere__gte=cutoff).order_by("-premiere")
         if limit:
             movies = movies[:limit]
+        movies = list(movies)
 
         total = len(movies)
         self.stdout.write(f"Фильмов с премьерой за последние {years} г.: {total}" + (" (dry-run)" if dry_run else ""))
         if not total:
             return
 
-        kp = KP_Movie()
-        updated = unchanged = errors = 0
+        kp = KP_Movie(slim=True)
+        remaining = kp.quota.remaining()
+        if remaining is not None:
+            self.stdout.write(f"Осталось запросов к API на сегодня: {remaining}")
+
+        # (номер первого фильма пачки, пачка)
+        batches = [(start, movies[start : start + batch_size]) for start in range(0, total, batch_size)]
+        stats = asyncio.run(self._refresh(batches, total, concurrency, dry_run))
+
+        action = "будет обновлено" if dry_run else "обновлено"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово. {action}: {stats.updated}, без изменений: {stats.unchanged}, "
+                f"ошибок: {stats.errors}, пропущено (квота/API недоступен): {stats.skipped}"
+            )
+        )
+        logger.info(
+            "update_recent_movies: %s=%d, unchanged=%d, errors=%d, skipped=%d, years=%d, dry_run=%s",
+            action,
+            stats.updated,
+            stats.unchanged,
+            stats.errors,
+            stats.skipped,
+            years,
+            dry_run,
+        )
+
+    async def _refresh(
+        self, batches: list[tuple[int, list[Movie]]], total: int, concurrency: int, dry_run: bool
+    ) -> RefreshStats:
+        """
+        Параллельная обработка пачек, не больше concurrency одновременно.
+        У каждой пачки свой KP_Movie: kp.error пишется запросом, и общий экземпляр выдал бы ошибку
+        одной пачки за ошибку другой. Квота, предохранитель, лимитер и клиент от этого не дробятся —
+        они общие (diskcache и атрибуты класса).
+        """
+        stats = RefreshStats()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(start: int, batch: list[Movie]) -> None:
+            async with semaphore:
+                await self._refresh_batch(KP_Movie(slim=True), batch, start, total, stats, dry_run)
+
+        try:
+            await asyncio.gather(*(run(start, batch) for start, batch in batches))
+        finally:
+            await KP.aclose_clients()
+        return stats
+
+    async def _refresh_batch(
+        self, kp: KP_Movie, batch: list[Movie], start: int, total: int, stats: RefreshStats, dry_run: bool
+    ) -> None:
+        """Один запрос к API на пачку и один bulk_update на все её изменения."""
+        # квота и предохранитель читают diskcache — в пуле потоков кэша, а не на event loop
+        if await kp.cache.arun(kp.quota.remaining) == 0:
+            stats.skipped += len(batch)
+            self.stdout.write(
+                self.style.WARNING(f"[{start + 1}-{start + len(batch)}/{total}]: квота API исчерпана, пропуск")
+            )
+            return
+
+        if not await self._wait_for_api(kp, f"[{start + 1}-{start + len(batch)}/{total}]"):
+            stats.skipped += len(batch)
+            return
 
-        for i, movie in enumerate(movies, 1):
-            prefix = f"[{i}/{total}] {movie.kp_id} {movie.name}"
+        api_movies = await kp.aget_movies_by_ids([movie.kp_id for movie in batch])
+        changed: list[Movie] = []
 
-            api_response = kp.get_movie_by_id(movie.kp_id)
+        for offset, movie in enumerate(batch, 1):
+            prefix = f"[{start + offset}/{total}] {movie.kp_id} {movie.name}"
+
+            api_response = api_movies.get(movie.kp_id)
             if not api_response:
-                self.stdout.write(self.style.WARNING(f"{prefix}: нет данных ({kp.error})"))
-                errors += 1
-                time.sleep(delay)
+                self.stdout.write(self.style.WARNING(f"{prefix}: нет данных ({kp.error or 'не найден'})"))
+                stats.errors += 1
                 continue
 
             try:
                 parsed = KPFilmModel(**api_response)
             except PydanticValidationError as e:
                 self.stdout.write(self.style.ERROR(f"{prefix}: ошибка разбора ({e})"))
-                errors += 1
-                time.sleep(delay)
+                stats.errors += 1
                 continue
 
             changes = self._collect_changes(movie, parsed)
             if not changes:
-                unchanged += 1
-                time.sleep(delay)
+                stats.unchanged += 1
                 continue
 
             for field, (_old, new) in changes.items():
                 setattr(movie, field, new)
 
             diff = ", ".join(f"{f}: {o}→{n}" for f, (o, n) in changes.items())
-            if not dry_run:
-                movie.save(update_fields=list(changes.keys()))
             self.stdout.write(f"{prefix}: {diff}")
-            updated += 1
-            time.sleep(delay)
+            changed.append(movie)
+            stats.updated += 1
 
-        action = "будет обновлено" if dry_run else "обновлено"
-        self.stdout.write(
-            self.style.SUCCESS(f"Готово. {action}: {updated}, без изменений: {unchanged}, ошибок: {errors}")
-        )
-        logger.info(
-            "update_recent_movies: %s=%d, unchanged=%d, errors=%d, years=%d, dry_run=%s",
-            action,
-            updated,
-            unchanged,
-            errors,
-            years,
-            dry_run,
-        )
+        if changed and not dry_run:
+            await Movie.mgr.abulk_update(changed, fields=list(VOLATILE_FIELDS))
+            # bulk_update не шлёт post_save — сбрасываем кэш фильмов и обновляем карточки (rating_kp) сами
+            await sync_to_async(MovieCard.refresh)([movie.kp_id for movie in changed])
+            await CacheTags.ainvalidate(CacheTags.MOVIES)
+
+    async def _wait_for_api(self, kp: KP_Movie, prefix: str) -> bool:
+        """
+        Пауза, пока предохранитель KP разомкнут.
+        :return: False, если API не поднялось за --max-pause секунд.
+        """
+        waited = 0.0
+        while (delay := await kp.cache.arun(kp.breaker.retry_after)) > 0:
+            if waited + delay > self.max_pause:
+                self.stdout.write(
+                    self.style.WARNING(f"{prefix}: API недоступно дольше {self.max_pause:.0f} сек, пропуск")
+                )
+                return False
+            self.stdout.write(self.style.WARNING(f"{prefix}: API недоступно, пауза {delay:.0f} сек"))
+            await asyncio.sleep(delay)
+            waited += delay
+        return True
 
     @staticmethod
     def _collect_changes(movie: Movie, parsed: KPFilmModel) -> dict[str, tuple]:
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:21
+
+import django.db.models.deletion
+import django.db.models.manager
+from django.db import migrations, models
+
+
+def build_cards(apps, schema_editor):
+    """
+    Карточки для уже существующих фильмов (дальше их поддерживают сигналы).
+    Та же сборка, что MovieCard.build, но на исторических моделях.
+    """
+    Movie = apps.get_model("lists", "Movie")
+    MovieCard = apps.get_model("lists", "MovieCard")
+    Note = apps.get_model("lists", "Note")
+
+    genres = {}
+    for movie_id, genre in Movie.genres.through.objects.values_list("movie_id", "genre_id"):
+        genres.setdefault(movie_id, []).append(genre)
+    ratings = {}
+    for movie_id, user_id, rating in Note._default_manager.order_by("id").values_list("movie_id", "user_id", "rating"):
+        ratings.setdefault(movie_id, {})[str(user_id)] = rating
+
+    MovieCard._default_manager.bulk_create(
+        [
+            MovieCard(
+                movie_id=movie.kp_id,
+                is_archive=movie.is_archive,
+                rating_kp=movie.rating_kp,
+                poster=movie.poster,
+                poster_local=movie.poster_local.url if movie.poster_local else "/media/posters/default.png",
+                genres=genres.get(movie.kp_id, []),
+                ratings=ratings.get(movie.kp_id, {}),
+            )
+            for movie in Movie._default_manager.all()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0007_alter_user_avatar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieCard',
+            fields=[
+                ('movie', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='lists.movie')),
+                ('is_archive', models.BooleanField(default=False)),
+                ('rating_kp', models.DecimalField(decimal_places=3, default=0.0, max_digits=4)),
+                ('poster', models.URLField(default='https://banner2.cleanpng.com/20180715/yag/aavjmwzok.webp')),
+                ('poster_local', models.CharField(default='/media/posters/default.png', max_length=255)),
+                ('genres', models.JSONField(default=list)),
+                ('ratings', models.JSONField(default=dict)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_archive', '-rating_kp'], name='moviecard_archive_rating')],
+            },
+            managers=[
+                ('mgr', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.RunPython(build_cards, migrations.RunPython.noop),
+    ]
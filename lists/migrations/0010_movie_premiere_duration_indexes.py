@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0009_movie_archive_rating_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['is_archive', 'premiere'], name='movie_archive_premiere'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['is_archive', 'duration'], name='movie_archive_duration'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0010_movie_premiere_duration_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='movie',
+            name='movie_archive_rating',
+        ),
+        migrations.RemoveIndex(
+            model_name='movie',
+            name='movie_archive_premiere',
+        ),
+        migrations.RemoveIndex(
+            model_name='movie',
+            name='movie_archive_duration',
+        ),
+        migrations.RemoveIndex(
+            model_name='moviecard',
+            name='moviecard_archive_rating',
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(('is_archive', True)), fields=['-rating_kp'], name='movie_archive_rating_kp'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(('is_archive', True)), fields=['premiere'], name='movie_archive_premiere'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(('is_archive', True)), fields=['duration'], name='movie_archive_duration'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(('is_archive', False)), fields=['-rating_kp'], name='movie_wish_rating_kp'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(('is_archive', False)), fields=['premiere'], name='movie_wish_premiere'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(('is_archive', False)), fields=['duration'], name='movie_wish_duration'),
+        ),
+        migrations.AddIndex(
+            model_name='moviecard',
+            index=models.Index(condition=models.Q(('is_archive', True)), fields=['-rating_kp'], name='moviecard_archive_rating_kp'),
+        ),
+        migrations.AddIndex(
+            model_name='moviecard',
+            index=models.Index(condition=models.Q(('is_archive', False)), fields=['-rating_kp'], name='moviecard_wish_rating_kp'),
+        ),
+    ]
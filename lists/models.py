@@ -10,6 +10,25 @@ def default_countries() -> list[str]:
 
 
 QUESTION_MARK_URL = "https://banner2.cleanpng.com/20180715/yag/aavjmwzok.webp"
+DEFAULT_POSTER = "/media/posters/default.png"
+
+
+def archive_indexes(prefix: str, *fields: str) -> list[models.Index]:
+    """
+    Частичные индексы по полям сортировки — отдельно для архива и для фильмов «к просмотру».
+    Составной индекс (is_archive, поле) SQLite не применяет: filter(is_archive=True) Django пишет
+    как WHERE "is_archive", а не сравнение, — а частичный индекс с тем же условием подходит.
+    Первичный ключ лежит в индексе последним, так что ORDER BY поле, kp_id тоже читается из индекса.
+    :param prefix: (str) начало имени индекса.
+    :param fields: (str) поля сортировки, "-" — по убыванию.
+    """
+    return [
+        models.Index(
+            fields=[field], condition=models.Q(is_archive=is_archive), name=f"{prefix}_{state}_{field.lstrip('-')}"
+        )
+        for is_archive, state in ((True, "archive"), (False, "wish"))
+        for field in fields
+    ]
 
 
 # Create your models here.
@@ -86,6 +105,9 @@ class Movie(Model):
 
     class Meta:
         ordering = ["-rating_kp"]
+        # постраничная выдача списков (KeysetPaginator): WHERE is_archive ORDER BY <поле сортировки>, kp_id;
+        # по ним же фильтры year_from/year_to и duration_max (MovieHandler._filter_movies)
+        indexes = archive_indexes("movie", "-rating_kp", "premiere", "duration")
 
 
 class Note(Model):
@@ -99,3 +121,75 @@ class Note(Model):
         constraints = [
             models.UniqueConstraint(fields=["user", "movie"], name="user_movie_key"),
         ]
+
+
+class MovieCard(Model):
+    """
+    Денормализованная карточка фильма для сетки постеров: всё, что нужно странице, в одной строке.
+    Сетка читается одним проходом по частичному индексу по -rating_kp (archive_indexes), без сериализаторов,
+    жанров и заметок.
+
+    Поддерживается сигналами (lists/signals.py) при изменении фильма, его жанров и заметок;
+    массовые операции без сигналов (bulk_create, bulk_update) вызывают refresh сами.
+    """
+
+    mgr = models.Manager()
+    movie = models.OneToOneField(Movie, on_delete=models.CASCADE, primary_key=True, related_name="card")
+    is_archive = models.BooleanField(default=False)
+    rating_kp = models.DecimalField(default=0.0, decimal_places=3, max_digits=4)
+    poster = models.URLField(default=QUESTION_MARK_URL)
+    poster_local = models.CharField(max_length=255, default=DEFAULT_POSTER)
+    genres = models.JSONField(default=list)
+    # {"<id пользователя>": оценка}; ключи строками — так их хранит JSON
+    ratings = models.JSONField(default=dict)
+
+    FIELDS = ("is_archive", "rating_kp", "poster", "poster_local", "genres", "ratings")
+
+    class Meta:
+        indexes = archive_indexes("moviecard", "-rating_kp")
+
+    @classmethod
+    def build(cls, kp_ids: list[int]) -> list["MovieCard"]:
+        """Карточки фильмов kp_ids по текущим данным: три запроса на любое число фильмов."""
+        movies = Movie.mgr.filter(kp_id__in=kp_ids).only("kp_id", "is_archive", "rating_kp", "poster", "poster_local")
+        genres: dict[int, list[str]] = {}
+        for movie_id, genre in Movie.genres.through.objects.filter(movie_id__in=kp_ids).values_list(
+            "movie_id", "genre_id"
+        ):
+            genres.setdefault(movie_id, []).append(genre)
+        ratings: dict[int, dict[str, int]] = {}
+        for movie_id, user_id, rating in (
+            Note.mgr.filter(movie_id__in=kp_ids).order_by("id").values_list("movie_id", "user_id", "rating")
+        ):
+            ratings.setdefault(movie_id, {})[str(user_id)] = rating
+
+        return [
+            cls(
+                movie_id=movie.kp_id,
+                is_archive=movie.is_archive,
+                rating_kp=movie.rating_kp,
+                poster=movie.poster,
+                poster_local=movie.poster_local.url if movie.poster_local else DEFAULT_POSTER,
+                genres=genres.get(movie.kp_id, []),
+                ratings=ratings.get(movie.kp_id, {}),
+            )
+            for movie in movies
+        ]
+
+    @classmethod
+    def refresh(cls, kp_ids: list[int], create: bool = False) -> int:
+        """
+        Пересобирает карточки фильмов kp_ids.
+        :param create: (bool) создавать недостающие карточки. Без него обновляются только
+            существующие: заметки удаляются каскадом раньше фильма, и новая карточка
+            ссылалась бы на уже удалённый фильм.
+        :return: (int) сколько карточек записано.
+        """
+        cards = cls.build(list(kp_ids))
+        if create:
+            cls.mgr.bulk_create(cards, update_conflicts=True, update_fields=list(cls.FIELDS), unique_fields=["movie"])
+            return len(cards)
+        existing = set(
+            cls.mgr.filter(movie_id__in=[card.movie_id for card in cards]).values_list("movie_id", flat=True)
+        )
+        return cls.mgr.bulk_update([card for card in cards if card.movie_id in existing], fields=list(cls.FIELDS))
@@ -0,0 +1,163 @@
+"""
+Проекции моделей через values(): готовые словари без DRF-сериализаторов.
+
+Сериализатор на каждую строку создаёт поля, вызывает to_representation и собирает OrderedDict —
+на списках из сотен фильмов это основная часть времени ответа. Проекция читает только нужные
+колонки одним values() и приводит значения явными функциями: результат тот же, что у сериализатора
+(MOVIE_DICT, MOVIE_RATING, NOTE, USER — проверяется тестами и scripts/bench_projections.py),
+или типизированный для pandas (MOVIE_STATS: float, int и даты ISO 8601).
+"""
+
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from lists.models import DEFAULT_POSTER, Movie
+
+
+# значение колонки → значение в ответе; None — как есть
+Converter = Callable[[Any], Any] | None
+
+GENRES = "genres"
+
+
+def drf_decimal(value: Decimal) -> str:
+    """Decimal строкой с тремя знаками, как DecimalField DRF ("8.000")."""
+    return f"{value.quantize(Decimal('0.001')):f}"
+
+
+def drf_datetime(value: datetime) -> str:
+    """Дата в ISO 8601 в часовом поясе проекта, как DateTimeField DRF ("Z" вместо "+00:00")."""
+    value = timezone.localtime(value).isoformat()
+    return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+
+def date_format(output_format: str) -> Callable[[datetime], str]:
+    """Дата строкой в часовом поясе проекта, как DateTimeField(format=...) DRF."""
+    return lambda value: timezone.localtime(value).strftime(output_format)
+
+
+def iso_date(value: datetime) -> str:
+    """Дата в ISO 8601 в часовом поясе проекта."""
+    return timezone.localtime(value).isoformat()
+
+
+def poster_url(name: str) -> str:
+    """Путь локального постера (ImageField хранит имя файла)."""
+    return Movie._meta.get_field("poster_local").storage.url(name) if name else DEFAULT_POSTER
+
+
+class Projection:
+    """
+    Набор полей и их приведение.
+
+        rows, cursor = paginator.paginate(MOVIE_DICT.query(movies), limit, cursor, key=...)
+        results = MOVIE_DICT.convert(rows)
+
+    query() и convert() разделены, чтобы пагинация и сортировка работали по исходным значениям
+    колонок (Decimal, datetime), а приводились только строки страницы.
+    """
+
+    def __init__(self, fields: dict[str, Converter], post: Callable[[dict, dict], None] | None = None) -> None:
+        """
+        :param fields: (dict) поле ответа → приведение значения. GENRES — названия жанров фильма
+            (для пачки строк одним запросом).
+        :param post: функция (строка values(), готовая строка) для полей, зависящих от нескольких колонок.
+        """
+        self.fields = fields
+        self.post = post
+        self.columns = [name for name in fields if name != GENRES]
+        self.genres = GENRES in fields
+
+    def query(self, queryset: QuerySet, *extra: str) -> QuerySet:
+        """
+        values() с колонками проекции.
+        :param extra: дополнительные колонки (например, аннотация сортировки) — в ответ не попадут.
+        """
+        return queryset.values(*self.columns, *extra)
+
+    def convert(self, rows: Iterable[dict]) -> list[dict]:
+        """Строки values() → словари ответа в порядке fields."""
+        rows = list(rows)
+        genres = self._genres([row["kp_id"] for row in rows]) if self.genres else {}
+        result = []
+        for row in rows:
+            item = {}
+            for name, converter in self.fields.items():
+                if name == GENRES:
+                    item[name] = genres.get(row["kp_id"], [])
+                else:
+                    item[name] = row[name] if converter is None else converter(row[name])
+            if self.post is not None:
+                self.post(row, item)
+            result.append(item)
+        return result
+
+    def all(self, queryset: QuerySet) -> list[dict]:
+        return self.convert(self.query(queryset))
+
+    @staticmethod
+    def _genres(kp_ids: list[int]) -> dict[int, list[str]]:
+        """Жанры фильмов одним запросом к промежуточной таблице (по алфавиту, как prefetch в SQLite)."""
+        genres: dict[int, list[str]] = {}
+        through = Movie.genres.through.objects.filter(movie_id__in=kp_ids).order_by("movie_id", "genre_id")
+        for movie_id, genre in through.values_list("movie_id", "genre_id"):
+            genres.setdefault(movie_id, []).append(genre)
+        return genres
+
+
+def _movie_dict_poster(row: dict, item: dict) -> None:
+    # как MovieDictSerializer: без своего файла — ссылка на постер Кинопоиска
+    poster_local = poster_url(row["poster_local"])
+    item["poster_local"] = row["poster"] if "default" in poster_local else poster_local
+
+
+# MovieDictSerializer: {kp_id: фильм} для страниц и ?format=json
+MOVIE_DICT = Projection(
+    {
+        "kp_id": None,
+        "name": None,
+        "poster": None,
+        "poster_local": None,
+        "premiere": date_format("%d/%m/%Y"),
+        "description": None,
+        "duration": None,
+        "rating_kp": drf_decimal,
+        "rating_imdb": drf_decimal,
+        GENRES: None,
+        "is_archive": None,
+    },
+    post=_movie_dict_poster,
+)
+
+# MovieRatingSerializer: рейтинги и цифры фильма
+MOVIE_RATING = Projection(
+    {
+        "kp_id": None,
+        "name": None,
+        "rating_imdb": drf_decimal,
+        "rating_kp": drf_decimal,
+        "votes_kp": None,
+        "votes_imdb": None,
+        "poster_local": poster_url,
+        "duration": None,
+        "budget": None,
+        "fees": None,
+        "premiere": drf_datetime,
+    }
+)
+
+# Поля MOVIE_RATING с типами для pandas (статистика): рейтинги float, дата ISO 8601
+MOVIE_STATS = Projection(
+    {**MOVIE_RATING.fields, "rating_imdb": float, "rating_kp": float, "premiere": iso_date},
+)
+
+# NoteSerializer (fields="__all__")
+NOTE = Projection({"id": None, "text": None, "rating": None, "user": None, "movie": None})
+
+# UserSerializer
+USER = Projection({"id": None, "username": None, "first_name": None, "last_name": None, "email": None, "avatar": None})
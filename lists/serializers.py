@@ -11,9 +11,6 @@ from rest_framework.serializers import (
 from lists.models import Movie, Note, User
 
 
-DEFAULT_POSTER = "/media/posters/default.png"
-
-
 class NoteSerializer(ModelSerializer):
     """
     Сериализатор для оценок пользователей
@@ -75,34 +72,6 @@ class MovieDictSerializer(ModelSerializer):
         return representation
 
 
-class MoviePosterSerializer(ModelSerializer):
-    """
-    Сериализтаор для отрисовки постеров в html.
-    Поэтому многие поля не нужны.
-    Жанры добавлены для сортировки.
-    """
-
-    genres = SlugRelatedField(slug_field="name", many=True, read_only=True)
-
-    class Meta:
-        model = Movie
-        fields = [
-            "kp_id",
-            "poster",
-            "poster_local",
-            "genres",
-        ]
-
-    def to_representation(self, instance: Movie) -> dict:
-        representation = super().to_representation(instance)
-        notes = instance.note_set.all()
-        poster_local = instance.poster_local
-        representation["poster_local"] = poster_local.url if poster_local else DEFAULT_POSTER
-        representation["notes"] = NoteSerializer(notes, many=True).data
-
-        return representation
-
-
 class UserSerializer(ModelSerializer):
     class Meta:
         model = User
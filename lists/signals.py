@@ -0,0 +1,78 @@
+"""
+Сброс тегов общего кэша при изменении фильмов, заметок и пользователей (см. CacheTags)
+и поддержка карточек сетки постеров (MovieCard).
+"""
+
+from typing import Any
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from classes.caching import CacheTags
+from lists.models import Genre, Movie, MovieCard, Note, User
+
+
+# Карточки пересобираются раньше сброса тегов: иначе запрос, пришедший между сбросом и пересборкой,
+# закэшировал бы старую карточку под новой версией данных (и отдавал бы её до конца ttl)
+
+
+@receiver(post_save, sender=Movie)
+def refresh_card_on_movie_save(sender: type, instance: Movie, **kwargs: Any) -> None:
+    MovieCard.refresh([instance.pk], create=True)
+    CacheTags.invalidate(CacheTags.MOVIES)
+
+
+@receiver(post_delete, sender=Movie)
+def invalidate_movies(sender: type, **kwargs: Any) -> None:
+    # карточка удаляется каскадом вместе с фильмом
+    CacheTags.invalidate(CacheTags.MOVIES)
+
+
+@receiver(m2m_changed, sender=Movie.directors.through)
+@receiver(m2m_changed, sender=Movie.actors.through)
+@receiver(m2m_changed, sender=Movie.writers.through)
+def invalidate_movie_relations(sender: type, action: str, **kwargs: Any) -> None:
+    if action.startswith("post_"):
+        CacheTags.invalidate(CacheTags.MOVIES)
+
+
+@receiver([post_save, post_delete], sender=Note)
+def refresh_card_on_note_change(sender: type, instance: Note, **kwargs: Any) -> None:
+    MovieCard.refresh([instance.movie_id])
+    CacheTags.invalidate(CacheTags.NOTES)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_users(sender: type, update_fields: frozenset | None = None, **kwargs: Any) -> None:
+    # вход на сайт (update_last_login) сохраняет только last_login — в кэшированных данных его нет
+    if update_fields == frozenset({"last_login"}):
+        return
+    CacheTags.invalidate(CacheTags.USERS)
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+def refresh_cards_on_genres_change(
+    sender: type, instance: Movie | Genre, action: str, reverse: bool, pk_set: set | None, **kwargs: Any
+) -> None:
+    # genre.movie_set.clear(): после очистки уже не узнать, каких фильмов она касалась
+    if action == "pre_clear" and reverse:
+        instance._card_movie_ids = list(instance.movie_set.values_list("kp_id", flat=True))
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        MovieCard.refresh([instance.pk])
+    else:
+        MovieCard.refresh(list(pk_set) if pk_set else getattr(instance, "_card_movie_ids", []))
+    CacheTags.invalidate(CacheTags.MOVIES)
+
+
+@receiver(pre_delete, sender=Genre)
+def remember_genre_movies(sender: type, instance: Genre, **kwargs: Any) -> None:
+    # связи с фильмами удаляются каскадом без m2m_changed
+    instance._card_movie_ids = list(instance.movie_set.values_list("kp_id", flat=True))
+
+
+@receiver(post_delete, sender=Genre)
+def refresh_cards_on_genre_delete(sender: type, instance: Genre, **kwargs: Any) -> None:
+    MovieCard.refresh(getattr(instance, "_card_movie_ids", []))
+    CacheTags.invalidate(CacheTags.MOVIES)
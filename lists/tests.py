@@ -1 +1,509 @@
-# Create your tests here.
+# Тесты приложения lists: инвалидация кэша по тегам, карточки фильмов, выгрузка, условные GET,
+# пагинация, фильтры, проекции, индексы и команда update_recent_movies.
+from collections.abc import Callable
+from decimal import Decimal
+from functools import partial
+from io import StringIO
+import json
+import re
+import tempfile
+from typing import Any
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+import httpx
+
+from classes.caching import CacheTags, Caching
+from classes.movie import MovieHandler, MoviesStructure
+from classes.note import NoteHandler
+from classes.pagination import KeysetPaginator
+from classes.photo import PhotoHandler
+from classes.postcard import PostcardHandler
+from classes.tests import KPClientTestMixin
+from features.models import Photo
+from features.serializers import MovieRatingSerializer
+from lists.models import Genre, Movie, MovieCard, Note, User
+from lists.projections import MOVIE_DICT, MOVIE_RATING, MOVIE_STATS, NOTE, USER
+from lists.serializers import MovieDictSerializer, NoteSerializer, UserSerializer
+from postcard.models import Postcard
+
+
+class CacheTagsTests(TestCase):
+    def setUp(self) -> None:
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self.cache = Caching(self._cache_dir.name, 60, memory_limit=4096)
+        patcher = patch.object(CacheTags, "cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        Caching._memory_tiers.clear()
+        self._cache_dir.cleanup()
+
+    def test_invalidate_tag_drops_only_tagged_entries(self) -> None:
+        self.cache.set_cache("movies:list", [1], tag=CacheTags.MOVIES)
+        self.cache.set_cache("bar:list", [2], tag=CacheTags.BAR)
+        self.assertEqual(self.cache.get_cache("movies:list"), [1])  # попало в L1
+
+        self.assertEqual(self.cache.invalidate_tag(CacheTags.MOVIES), 1)
+        self.assertIsNone(self.cache.get_cache("movies:list"))
+        self.assertEqual(self.cache.get_cache("bar:list"), [2])
+
+    def test_model_signals_invalidate_tags(self) -> None:
+        self.cache.set_cache("movies:list", [1], tag=CacheTags.MOVIES)
+        movie = Movie.mgr.create(kp_id=301, name="Матрица")
+        self.assertIsNone(self.cache.get_cache("movies:list"))
+
+        self.cache.set_cache("movies:list", [1], tag=CacheTags.MOVIES)
+        movie.genres.add(Genre.mgr.create(name="фантастика"))
+        self.assertIsNone(self.cache.get_cache("movies:list"))
+
+        self.cache.set_cache("notes:list", [1], tag=CacheTags.NOTES)
+        Note.mgr.create(user=User.objects.create(username="neo"), movie=movie, rating=10)
+        self.assertIsNone(self.cache.get_cache("notes:list"))
+
+    def test_login_keeps_users_version(self) -> None:
+        user = User.objects.create(username="neo")
+        before = async_to_sync(CacheTags.versions)(CacheTags.USERS)
+        self.client.force_login(user)  # update_last_login: save(update_fields=["last_login"])
+        user.refresh_from_db()
+        self.assertIsNotNone(user.last_login)
+        self.assertEqual(async_to_sync(CacheTags.versions)(CacheTags.USERS), before)
+
+
+class MovieCardTests(TestCase):
+    def setUp(self) -> None:
+        self.neo = User.objects.create(username="neo")
+        self.trinity = User.objects.create(username="trinity")
+        self.movie = Movie.mgr.create(kp_id=301, name="Матрица", rating_kp=8.5)
+        self.movie.genres.add(Genre.mgr.create(name="фантастика"), Genre.mgr.create(name="боевик"))
+
+    def card(self) -> MovieCard:
+        return MovieCard.mgr.get(movie_id=301)
+
+    def test_card_follows_movie_genres_and_notes(self) -> None:
+        Note.mgr.create(user=self.neo, movie=self.movie, rating=10)
+        note = Note.mgr.create(user=self.trinity, movie=self.movie, rating=7)
+        card = self.card()
+        self.assertEqual(sorted(card.genres), ["боевик", "фантастика"])
+        self.assertEqual(card.ratings, {str(self.neo.id): 10, str(self.trinity.id): 7})
+        self.assertEqual(card.poster_local, "/media/posters/default.png")
+
+        note.delete()
+        Genre.mgr.get(name="боевик").delete()
+        self.movie.is_archive = True
+        self.movie.save()
+        card = self.card()
+        self.assertEqual((card.genres, card.ratings, card.is_archive), (["фантастика"], {str(self.neo.id): 10}, True))
+
+        self.movie.delete()
+        self.assertFalse(MovieCard.mgr.exists())
+
+    def test_card_is_rebuilt_before_tags_are_invalidated(self) -> None:
+        seen = []
+        with patch.object(CacheTags, "invalidate", lambda *tags: seen.append(self.card().ratings)):
+            Note.mgr.create(user=self.neo, movie=self.movie, rating=9)
+        self.assertEqual(seen, [{str(self.neo.id): 9}])
+
+    async def test_posters_grid_is_read_from_cards(self) -> None:
+        await Movie.mgr.acreate(kp_id=302, name="Матрица: Перезагрузка", rating_kp=7.0)
+        await NoteHandler.create_note({"user": self.neo.id, "movie": 302, "rating": 6})
+
+        movies = await MovieHandler.get_all_movies(info_type=MoviesStructure.posters)
+
+        self.assertEqual([movie["kp_id"] for movie in movies], [301, 302])
+        self.assertEqual(movies[1]["ratings"], {str(self.neo.id): 6})
+        self.assertEqual(MovieHandler.extract_genres(movies), ["боевик", "фантастика"])
+
+
+class MoviesExportTests(TestCase):
+    def setUp(self) -> None:
+        drama, comedy = Genre.mgr.create(name="драма"), Genre.mgr.create(name="комедия")
+        for kp_id in range(1, 6):
+            movie = Movie.mgr.create(kp_id=kp_id, name=f"Фильм {kp_id}", rating_kp=kp_id, is_archive=kp_id > 3)
+            movie.genres.set([drama, comedy][: kp_id % 3])
+
+    async def read(self, url: str, **params: str) -> tuple[Any, bytes]:
+        response = await self.async_client.get(url, params)
+        self.assertTrue(response.streaming)
+        return response, b"".join([chunk async for chunk in response.streaming_content])
+
+    @patch.object(MovieHandler, "EXPORT_CHUNK_SIZE", 2)
+    async def test_json_export_matches_movie_list(self) -> None:
+        _, content = await self.read("/movies/export.json", archive="0")
+        expected = (await self.async_client.get("/movies/", {"format": "json"})).json()
+        self.assertEqual(json.loads(content), expected)
+
+        _, content = await self.read("/movies/export.json")
+        self.assertEqual(sorted(json.loads(content), key=int), ["1", "2", "3", "4", "5"])
+
+    @patch.object(MovieHandler, "EXPORT_CHUNK_SIZE", 2)
+    async def test_ndjson_export(self) -> None:
+        response, content = await self.read("/movies/export.ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        movies = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([movie["kp_id"] for movie in movies], [1, 2, 3, 4, 5])
+        self.assertEqual(movies[1]["genres"], ["драма", "комедия"])
+
+    @patch.object(MovieHandler, "EXPORT_CHUNK_SIZE", 2)
+    def test_export_is_read_in_chunks(self) -> None:
+        async def collect() -> list[str]:
+            return [chunk async for chunk in MovieHandler.export_movies(lines=True)]
+
+        # один SELECT фильмов и по запросу жанров на каждую пачку из двух фильмов
+        with self.assertNumQueries(4):
+            chunks = async_to_sync(collect)()
+        self.assertEqual([chunk.count("\n") for chunk in chunks], [2, 2, 1])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self) -> None:
+        self.movie = Movie.mgr.create(kp_id=1, name="Фильм", rating_kp=8.0)
+        self.user = User.objects.create(username="critic")
+
+    def test_unchanged_list_answers_304(self) -> None:
+        response = self.client.get("/movies/", {"format": "json"})
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/movies/", {"format": "json"}, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_writes_change_etag(self) -> None:
+        etag = self.client.get("/movies/", {"format": "json"})["ETag"]
+        Note.mgr.create(user=self.user, movie=self.movie, rating=7)
+        response = self.client.get("/movies/", {"format": "json"}, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_write_within_the_same_second_is_not_hidden_by_last_modified(self) -> None:
+        last_modified = self.client.get("/movies/", {"format": "json"})["Last-Modified"]
+        Note.mgr.create(user=self.user, movie=self.movie, rating=7)
+        response = self.client.get("/movies/", {"format": "json"}, headers={"if-modified-since": last_modified})
+        self.assertEqual(response.status_code, 200)
+
+    def test_postcards_follow_their_movies(self) -> None:
+        other = Movie.mgr.create(kp_id=2, name="Другой фильм", rating_kp=7.0)
+        Postcard.objects.create(meeting_date="2026-01-01T00:00:00Z", title="Встреча").movies.add(self.movie, other)
+        etag = self.client.get("/archive/", {"format": "json"})["ETag"]
+        other.delete()
+        response = self.client.get("/archive/", {"format": "json"}, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["movies"], [1])
+
+    def test_only_json_lists_are_conditional(self) -> None:
+        self.assertNotIn("ETag", self.client.get("/movies/1/"))
+        self.assertNotIn("ETag", self.client.get("/movies/", {"format": "json", "cursor": "не курсор"}))
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    }
+)
+class MoviesPaginationTests(TestCase):
+    def setUp(self) -> None:
+        # две пары с одинаковым рейтингом: порядок внутри пары решает kp_id
+        for kp_id, rating in ((5, 9.0), (3, 8.0), (1, 8.0), (4, 7.0), (2, 7.0)):
+            Movie.mgr.create(kp_id=kp_id, name=f"Фильм {kp_id}", rating_kp=rating)
+
+    async def pages(self, **kwargs: Any) -> list[list[int]]:
+        pages, cursor = [], None
+        while True:
+            page = await MovieHandler.get_movies_page(limit=2, cursor=cursor, **kwargs)
+            results = page["results"]
+            pages.append(
+                [int(kp_id) for kp_id in results] if isinstance(results, dict) else [r["kp_id"] for r in results]
+            )
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return pages
+
+    async def test_pages_follow_rating_with_kp_id_tie_breaker(self) -> None:
+        self.assertEqual(await self.pages(), [[5, 1], [3, 2], [4]])
+        self.assertEqual(await self.pages(info_type=MoviesStructure.posters), [[5, 1], [3, 2], [4]])
+
+    async def test_cursor_is_stable_when_rows_are_added_above(self) -> None:
+        first = await MovieHandler.get_movies_page(limit=2)
+        await Movie.mgr.acreate(kp_id=6, name="Новый фаворит", rating_kp=9.5)
+        second = await MovieHandler.get_movies_page(limit=2, cursor=first["next_cursor"])
+        self.assertEqual(list(second["results"]), [3, 2])
+
+    async def test_bad_limit_and_cursor_are_rejected(self) -> None:
+        self.assertEqual((await MovieHandler.get_movies_page(limit="0"))["error"]["status"], 400)
+        self.assertEqual((await MovieHandler.get_movies_page(cursor="не курсор"))["error"]["status"], 400)
+
+    def test_views_serve_pages(self) -> None:
+        response = self.client.get("/movies/", {"format": "json", "limit": 2})
+        self.assertEqual(list(response.json()["results"]), ["5", "1"])
+
+        response = self.client.get(
+            "/movies/", {"fragment": "posters", "limit": 2, "cursor": response.json()["next_cursor"]}
+        )
+        self.assertContains(response, 'data-kp-id="3"')
+        self.assertNotContains(response, 'data-kp-id="5"')
+        # курсор и данные фильмов страницы — во фрагменте, отдельный ?format=json скроллу не нужен
+        self.assertContains(response, f'data-next-cursor="{KeysetPaginator.encode(Decimal("7.000"), 2)}"')
+        movies = json.loads(re.search(r'<script type="application/json">(.*?)</script>', response.text)[1])
+        self.assertEqual(sorted(movies), ["2", "3"])
+        self.assertEqual(movies["3"]["name"], "Фильм 3")
+
+        response = self.client.get("/movies/", {"limit": 2})
+        self.assertContains(response, 'data-page-size="2"')
+        self.assertEqual(response.context["next_cursor"], KeysetPaginator.encode(Decimal("8.000"), 1))
+
+        # без limit и cursor — весь список, как раньше
+        self.assertEqual(len(self.client.get("/movies/", {"format": "json"}).json()), 5)
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "fragments": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "fragments-test"},
+    },
+)
+class PostersFragmentCacheTests(TestCase):
+    def setUp(self) -> None:
+        Movie.mgr.create(kp_id=1, name="Фильм", rating_kp=8.0)
+        self.addCleanup(caches["fragments"].clear)
+
+    def repaint(self, poster: str) -> None:
+        # QuerySet.update не шлёт сигналов: версия данных прежняя, а отрисовать надо уже по-новому
+        MovieCard.mgr.filter(movie_id=1).update(poster_local=poster)
+
+    def test_grid_is_served_from_cache_until_data_changes(self) -> None:
+        self.repaint("/media/posters/old.webp")
+        self.assertContains(self.client.get("/movies/"), "/media/posters/old.webp")
+
+        self.repaint("/media/posters/new.webp")
+        self.assertContains(self.client.get("/movies/"), "/media/posters/old.webp")
+        # та же страница фрагментом для скролла — тот же кэш; другая страница или тема — свой
+        self.assertContains(self.client.get("/movies/", {"fragment": "posters"}), "/media/posters/old.webp")
+        self.assertContains(self.client.get("/movies/", {"limit": 5}), "/media/posters/new.webp")
+        self.assertContains(self.client.get("/movies/", {"theme": "new_year"}), "/media/posters/new.webp")
+
+        CacheTags.invalidate(CacheTags.NOTES)
+        self.assertContains(self.client.get("/movies/"), "/media/posters/new.webp")
+
+
+class MoviesFilterTests(TestCase):
+    def setUp(self) -> None:
+        drama, comedy = Genre.mgr.create(name="драма"), Genre.mgr.create(name="комедия")
+        self.user = User.objects.create(username="critic")
+        rows = (
+            # kp_id, название, рейтинг, премьера, длительность, жанры, оценка critic
+            (1, "Вий", 7.0, "1967-11-27", 72, [drama], 9),
+            (2, "Бриллиантовая рука", 8.5, "1969-04-28", 100, [comedy], None),
+            (3, "Асса", 7.0, "1987-12-01", 153, [drama, comedy], 3),
+            (4, "Гараж", 8.0, "1979-10-01", 95, [drama, comedy], 7),
+        )
+        for kp_id, name, rating, premiere, duration, genres, note in rows:
+            movie = Movie.mgr.create(
+                kp_id=kp_id, name=name, rating_kp=rating, premiere=f"{premiere}T00:00:00Z", duration=duration
+            )
+            movie.genres.set(genres)
+            if note:
+                Note.mgr.create(user=self.user, movie=movie, rating=note)
+
+    async def kp_ids(self, info_type: str | None = None, **filters: Any) -> list[int]:
+        """Все страницы по два фильма подряд."""
+        kp_ids, cursor = [], None
+        while True:
+            page = await MovieHandler.get_movies_page(info_type=info_type, limit=2, cursor=cursor, filters=filters)
+            results = page["results"]
+            kp_ids += [int(kp_id) for kp_id in results] if isinstance(results, dict) else [r["kp_id"] for r in results]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return kp_ids
+
+    async def test_filters(self) -> None:
+        for info_type in (None, MoviesStructure.posters):
+            with self.subTest(info_type=info_type):
+                self.assertEqual(await self.kp_ids(info_type, genre=["драма", "комедия"]), [4, 3])
+                self.assertEqual(await self.kp_ids(info_type, min_rating="8"), [2, 4])
+                self.assertEqual(await self.kp_ids(info_type, year_from="1968", year_to="1980"), [2, 4])
+                self.assertEqual(await self.kp_ids(info_type, duration_max="100", genre=["драма"]), [4, 1])
+
+    async def test_sorting_across_pages(self) -> None:
+        for info_type in (None, MoviesStructure.posters):
+            with self.subTest(info_type=info_type):
+                self.assertEqual(await self.kp_ids(info_type, sort="-premiere"), [3, 4, 2, 1])
+                self.assertEqual(await self.kp_ids(info_type, sort="duration"), [1, 4, 2, 3])
+                self.assertEqual(await self.kp_ids(info_type, sort="name"), [3, 2, 1, 4])
+                self.assertEqual(await self.kp_ids(info_type, sort="rating_kp"), [1, 3, 4, 2])
+                self.assertEqual(
+                    await self.kp_ids(info_type, sort="-rating_user", user=str(self.user.id)), [1, 4, 3, 2]
+                )
+
+    async def test_bad_filters_are_rejected(self) -> None:
+        for filters in ({"sort": "budget"}, {"min_rating": "много"}, {"sort": "rating_user"}):
+            with self.subTest(filters=filters):
+                page = await MovieHandler.get_movies_page(filters=filters)
+                self.assertEqual(page["error"]["status"], 400)
+
+    def test_view_passes_filters(self) -> None:
+        response = self.client.get("/movies/", {"format": "json", "genre": "комедия", "sort": "-duration"})
+        self.assertEqual(list(response.json()["results"]), ["3", "2", "4"])
+
+
+class ProjectionTests(TestCase):
+    def setUp(self) -> None:
+        drama, comedy = Genre.mgr.create(name="драма"), Genre.mgr.create(name="комедия")
+        user = User.objects.create(username="critic", first_name="Критик", email="c@example.com")
+        for kp_id, poster_local in ((1, "media/posters/default.png"), (2, "media/posters/2.webp"), (3, "")):
+            movie = Movie.mgr.create(
+                kp_id=kp_id,
+                name=f"Фильм {kp_id}",
+                rating_kp=f"{6 + kp_id}.25",
+                rating_imdb="6.1",
+                premiere="1999-12-31T21:30:00Z",  # в поясе проекта уже 2000 год
+                poster_local=poster_local,
+                is_archive=kp_id > 1,
+            )
+            movie.genres.set([comedy, drama][: kp_id - 1])
+            Note.mgr.create(user=user, movie=movie, rating=kp_id + 5)
+
+    def test_projections_match_serializers(self) -> None:
+        movies = Movie.mgr.all()
+        cases = (
+            (MOVIE_DICT, MovieDictSerializer, movies),
+            (MOVIE_RATING, MovieRatingSerializer, movies),
+            (NOTE, NoteSerializer, Note.mgr.all()),
+            (USER, UserSerializer, User.objects.all()),
+        )
+        for projection, serializer, queryset in cases:
+            with self.subTest(serializer=serializer.__name__):
+                expected = serializer(queryset, many=True).data
+                expected = list(expected.values()) if isinstance(expected, dict) else expected
+                self.assertEqual(json.dumps(projection.all(queryset)), json.dumps(expected))
+
+    def test_stats_projection_is_typed(self) -> None:
+        movie = MOVIE_STATS.all(Movie.mgr.filter(kp_id=2))[0]
+        self.assertEqual((movie["rating_kp"], movie["rating_imdb"]), (8.25, 6.1))
+        self.assertEqual(movie["premiere"], "2000-01-01T02:30:00+05:00")
+        self.assertEqual(movie["poster_local"], "/media/posters/2.webp")
+
+
+class QueryPlanTests(TestCase):
+    """
+    Горячие запросы страниц идут по индексам: EXPLAIN QUERY PLAN каждого SELECT, который выполняет
+    обработчик, не должен содержать полного прохода по таблице (SCAN <таблица> без USING INDEX).
+    """
+
+    FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="critic")
+        drama = Genre.mgr.create(name="драма")
+        for kp_id in range(1, 7):
+            movie = Movie.mgr.create(
+                kp_id=kp_id,
+                name=f"Фильм {kp_id}",
+                rating_kp=kp_id,
+                premiere=f"20{10 + kp_id}-01-01T00:00:00Z",
+                duration=90 + kp_id,
+                is_archive=kp_id % 2 == 0,
+            )
+            movie.genres.set([drama])
+            Note.mgr.create(user=self.user, movie=movie, rating=kp_id)
+        postcard = Postcard.objects.create(meeting_date="2026-01-01T00:00:00Z", title="Встреча")
+        postcard.movies.set([1, 3])
+        Photo.objects.create(name="Встреча", image="media/photos/1.jpg")
+
+    def full_scans(self, call: Callable) -> list[str]:
+        """Строки планов с полным проходом по таблице для всех SELECT, выполненных call()."""
+        with CaptureQueriesContext(connection) as queries:
+            async_to_sync(call)()
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                if not query["sql"].startswith("SELECT"):
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                scans += [
+                    f"{detail} ← {query['sql']}" for *_, detail in cursor.fetchall() if self.FULL_SCAN.match(detail)
+                ]
+        return scans
+
+    def test_movie_pages_use_indexes(self) -> None:
+        page = async_to_sync(MovieHandler.get_movies_page)(limit=1)
+        cases = {
+            "первая страница": dict(),
+            "следующая страница": dict(cursor=page["next_cursor"]),
+            "сетка постеров": dict(info_type=MoviesStructure.posters),
+            "архив с рейтингами": dict(info_type=MoviesStructure.rating, is_archive=True),
+            "по дате премьеры": dict(filters={"sort": "-premiere", "year_from": 2012}),
+            "по длительности": dict(info_type=MoviesStructure.posters, filters={"sort": "duration"}),
+            "по жанру": dict(filters={"genre": ["драма"]}),
+            "по оценкам участника": dict(filters={"sort": "-rating_user", "user": self.user.id}),
+        }
+        for name, kwargs in cases.items():
+            with self.subTest(name):
+                self.assertEqual(self.full_scans(partial(MovieHandler.get_movies_page, limit=2, **kwargs)), [])
+
+    def test_notes_postcards_and_photos_use_indexes(self) -> None:
+        cases = {
+            "заметка участника": sync_to_async(lambda: Note.mgr.get(user__id=self.user.id, movie__kp_id=2)),
+            "карточки фильмов": sync_to_async(lambda: MovieCard.build([1, 2])),
+            "активная открытка": PostcardHandler.get_postcard,
+            "архив открыток": PostcardHandler.get_all_postcards,
+            "фотографии": PhotoHandler.get_all_photos,
+        }
+        for name, call in cases.items():
+            with self.subTest(name):
+                self.assertEqual(self.full_scans(call), [])
+
+
+@override_settings(KP_API_TOKEN="test-token")
+class UpdateRecentMoviesTests(KPClientTestMixin, TransactionTestCase):
+    # abulk_update идёт через sync_to_async в другом потоке — нужен настоящий commit, а не транзакция теста
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        ids = [int(i) for i in request.url.params.get_list("id")]
+        docs = [{"id": i, "rating": {"kp": 7.5, "imdb": 7.0}, "votes": {"kp": 1000, "imdb": 500}} for i in ids]
+        return httpx.Response(200, json={"docs": docs, "pages": 1})
+
+    def test_changes_are_saved_per_batch(self) -> None:
+        for kp_id in (1, 2, 3):
+            Movie.mgr.create(kp_id=kp_id, name=f"Фильм {kp_id}", premiere="2026-01-01T00:00:00Z")
+
+        with self.patch_kp("lists.management.commands.update_recent_movies.KP_Movie"):
+            call_command("update_recent_movies", "--batch-size", "2", stdout=StringIO())
+
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(float(Movie.mgr.get(kp_id=3).rating_kp), 7.5)
+        self.assertEqual(Movie.mgr.get(kp_id=1).votes_imdb, 500)
+
+    def test_batch_errors_are_reported_per_batch(self) -> None:
+        # пачки по премьере: [1, 2] — API отвечает 404, [3, 4] — фильма 4 в ответе нет
+        for kp_id in (1, 2, 3, 4):
+            Movie.mgr.create(kp_id=kp_id, name=f"Фильм {kp_id}", premiere=f"2026-0{5 - kp_id}-01T00:00:00Z")
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            ids = [int(i) for i in request.url.params.get_list("id")]
+            if 1 in ids:
+                return httpx.Response(404, json={})
+            return httpx.Response(200, json={"docs": [{"id": 3, "rating": {"kp": 7.5}}], "pages": 1})
+
+        stdout = StringIO()
+        with self.patch_kp("lists.management.commands.update_recent_movies.KP_Movie", handler):
+            call_command("update_recent_movies", "--batch-size", "2", stdout=stdout)
+
+        lines = {line.split()[1]: line for line in stdout.getvalue().splitlines() if line.startswith("[")}
+        self.assertIn("HTTP error", lines["1"])
+        self.assertIn("не найден", lines["4"])
@@ -1,13 +1,22 @@
 from django.urls import path
 
-from lists.views import MovieAddingViewSet, MovieRatingViewSet, MoviesViewSet
+from lists.views import (
+    MovieAddingViewSet,
+    MovieRatingViewSet,
+    MovieSearchViewSet,
+    MoviesExportViewSet,
+    MoviesViewSet,
+)
 
 
 urlpatterns = [
     path("", MoviesViewSet.as_view(), name="view_movies"),
     path("archive/", MoviesViewSet.as_view(), name="view_archive_movies"),
+    path("export.json", MoviesExportViewSet.as_view(), {"lines": False}, name="export_movies"),
+    path("export.ndjson", MoviesExportViewSet.as_view(), {"lines": True}, name="export_movies_ndjson"),
     path("<int:kp_id>/", MoviesViewSet.as_view(), name="view_movie_by_id"),
     path("add/", MovieAddingViewSet.as_view(), name="add_movie"),
+    path("search/", MovieSearchViewSet.as_view(), name="search_movies"),
     path("remove/", MoviesViewSet.as_view(), name="remove_movie"),
     path("change_archive/", MoviesViewSet.as_view(), name="change_archive_status"),
     path("rate/", MovieRatingViewSet.as_view(), name="rate_movie"),
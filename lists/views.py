@@ -1,15 +1,17 @@
 import logging
 
 from adrf.views import APIView
-from django.http import HttpResponse
+from django.http import HttpResponse, QueryDict, StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from classes import MovieHandler, NoteHandler
+from classes import CacheTags, MovieHandler, NoteHandler
 from classes.movie import MoviesStructure
 from mixins import GlobalDataMixin
+from pydantic_models import MoviesQueryModel
+from utils.conditional import conditional_get, dataset_etag, is_json_request
 from utils.response_handler import handle_response
 
 
@@ -24,6 +26,9 @@ class MoviesViewSet(GlobalDataMixin, APIView):
 
     http_method_names = ["get", "patch", "delete"]
 
+    @conditional_get(
+        CacheTags.MOVIES, CacheTags.NOTES, when=lambda request, kp_id=None: kp_id is None and is_json_request(request)
+    )
     async def get(self, request: Request, kp_id: int | None = None) -> HttpResponse:
         """
         Получение списка фильмов или фильма по ID.
@@ -33,19 +38,50 @@ class MoviesViewSet(GlobalDataMixin, APIView):
             movie = await MovieHandler.get_movie(kp_id)
             return handle_response(movie)
 
-        response_format = request.query_params.get("format")
+        params = request.query_params
+        response_format = params.get("format")
         is_archive = "archive" in request.path
+        limit, cursor = params.get("limit"), params.get("cursor")
+        filters = self._filters(params)
 
         if response_format == "json":
-            movies = await MovieHandler.get_all_movies(is_archive=is_archive)
+            # без limit, cursor и фильтров — весь список одним словарём, как раньше (казино, старые клиенты)
+            if limit is None and cursor is None and not filters:
+                movies = await MovieHandler.get_all_movies(is_archive=is_archive)
+            else:
+                movies = await MovieHandler.get_movies_page(
+                    is_archive=is_archive, limit=limit, cursor=cursor, filters=filters
+                )
             return handle_response(movies)
 
-        movies = await MovieHandler.get_all_movies(info_type=MoviesStructure.posters, is_archive=is_archive)
-        genres = MovieHandler.extract_genres(movies)
-        context = {
-            "movies": movies,
-            "genres": genres,
+        # версии — до данных страницы: изменение посреди запроса не попадёт в кэш под новой версией
+        versions = await CacheTags.versions(CacheTags.MOVIES, CacheTags.NOTES, CacheTags.USERS)
+        page = await MovieHandler.get_movies_page(
+            info_type=MoviesStructure.posters, is_archive=is_archive, limit=limit, cursor=cursor, filters=filters
+        )
+        if page.get("error"):
+            return handle_response(page)
+
+        # сетка постеров (elements/movie_posters.html) и ключ её кэша: версии данных, страница и фильтры
+        grid = {
+            "movies": page["results"],
             "is_archive": is_archive,
+            "dataset_version": dataset_etag(versions),
+            "filters": filters,
+            "cursor": cursor,
+            "page_size": limit or MovieHandler.PAGINATOR.DEFAULT_LIMIT,
+            "next_cursor": page["next_cursor"],
+            "movies_data": page["movies"],
+        }
+
+        # следующие страницы сетки: только постеры, их догружает скролл (movie/pagination.js);
+        # format=posters нельзя — format DRF разбирает как выбор рендерера
+        if params.get("fragment") == "posters":
+            return render(request, "elements/movie_posters.html", context=await self.add_context_data(request, grid))
+
+        context = {
+            **grid,
+            "genres": await MovieHandler.get_genres(is_archive=is_archive),
         }
         return render(
             request,
@@ -53,6 +89,17 @@ class MoviesViewSet(GlobalDataMixin, APIView):
             context=await self.add_context_data(request, context),
         )
 
+    @staticmethod
+    def _filters(params: QueryDict) -> dict:
+        """
+        Фильтры и сортировка списка из query-параметров (см. MoviesQueryModel).
+        Порядок ключей и жанров постоянный — от него зависит ключ кэша страницы.
+        """
+        filters = {name: params[name] for name in MoviesQueryModel.model_fields if params.get(name)}
+        if "genre" in filters:
+            filters["genre"] = sorted(set(params.getlist("genre")))
+        return filters
+
     async def patch(self, request: Request) -> Response:
         """
         Изменение архивного статуса фильма.
@@ -73,6 +120,29 @@ class MoviesViewSet(GlobalDataMixin, APIView):
         return handle_response(result, {"kp_id": kp_id}, status.HTTP_204_NO_CONTENT)
 
 
+class MoviesExportViewSet(APIView):
+    """
+    Выгрузка всего каталога фильмов потоком (JSON или NDJSON).
+    """
+
+    http_method_names = ["get"]
+
+    @conditional_get(CacheTags.MOVIES, when=lambda request, **kwargs: True)
+    async def get(self, request: Request, lines: bool = False) -> HttpResponse:
+        """
+        Все фильмы (?archive=1 — только архив, ?archive=0 — только закладки) частями по мере чтения из БД.
+        """
+        archive = request.query_params.get("archive")
+        is_archive = None if archive is None else archive in ("1", "true")
+
+        response = StreamingHttpResponse(
+            MovieHandler.export_movies(is_archive=is_archive, lines=lines),
+            content_type="application/x-ndjson" if lines else "application/json",
+        )
+        response["Content-Disposition"] = f'attachment; filename="movies.{"ndjson" if lines else "json"}"'
+        return response
+
+
 class MovieRatingViewSet(APIView):
     """
     Запросы на выставление и изменение рейтинга фильма.
@@ -113,6 +183,23 @@ class MovieRatingViewSet(APIView):
         return handle_response(result, note_data)
 
 
+class MovieSearchViewSet(APIView):
+    """
+    Поиск фильмов в Кинопоиске по названию (автодополнение при добавлении).
+    """
+
+    http_method_names = ["get"]
+
+    async def get(self, request: Request) -> Response:
+        """
+        Поиск фильмов по строке query.
+        """
+        query = request.query_params.get("query", "")
+
+        result = await MovieHandler.search(query)
+        return handle_response(result)
+
+
 class MovieAddingViewSet(GlobalDataMixin, APIView):
     """
     Обработка добавления фильмов.
@@ -3,7 +3,7 @@ from typing import Any
 
 from rest_framework.request import Request
 
-from classes import Caching, Tools, UserHandler
+from classes import CacheNamespace, Caching, Tools, UserHandler
 
 
 logger = logging.getLogger(__name__)
@@ -15,11 +15,9 @@ class GlobalDataMixin:
     Эти данные используются во всех html шаблонах, поэтому можно получать их в одном месте.
     """
 
-    # Настройки кэширования (в секундах)
-    CACHE_DIRECTORY: str = "app_cache"
+    # Настройки кэширования: пространство global в settings.CACHE_NAMESPACES
     CACHE_USERS_KEY: str = "global_users"
-    CACHE_USERS_TIMEOUT: int = 60 * 15
-    cache: Caching = Caching(CACHE_DIRECTORY, CACHE_USERS_TIMEOUT)
+    cache: Caching = CacheNamespace("global")
 
     async def get_global_data(self, request: Request, context: dict[str, Any]) -> dict[str, Any]:
         """Возвращает кэшированные или свежие данные."""
@@ -45,12 +43,12 @@ class GlobalDataMixin:
 
     async def _get_cached_users(self) -> list:
         """Возвращает кэшированных пользователей или запрашивает свежих."""
-        cached_users = self.cache.get_cache(self.CACHE_USERS_KEY)
+        cached_users = await self.cache.aget(self.CACHE_USERS_KEY)
         if cached_users:
             return cached_users
 
         users = await UserHandler.get_all_users()
-        self.cache.set_cache(self.CACHE_USERS_KEY, users)
+        await self.cache.aset(self.CACHE_USERS_KEY, users)
         return users
 
     async def add_context_data(self, request: Request, context: dict[str, Any]) -> dict[str, Any]:
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PostcardConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "postcard"
+
+    def ready(self) -> None:
+        from postcard import signals  # noqa: F401
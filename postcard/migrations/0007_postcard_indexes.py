@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('postcard', '0006_alter_postcard_options_alter_postcard_created_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['-meeting_date'], name='postcard_meeting_date'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at'], name='postcard_active_created'),
+        ),
+    ]
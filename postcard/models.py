@@ -13,3 +13,10 @@ class Postcard(models.Model):
 
     class Meta:
         ordering = ["-meeting_date"]
+        indexes = [
+            # архив открыток по дате встречи
+            models.Index(fields=["-meeting_date"], name="postcard_meeting_date"),
+            # текущая открытка: filter(is_active=True).latest("created_at")
+            # (частичный: составной индекс с is_active SQLite не применит, см. lists.models.archive_indexes)
+            models.Index(fields=["created_at"], condition=models.Q(is_active=True), name="postcard_active_created"),
+        ]
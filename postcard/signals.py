@@ -0,0 +1,22 @@
+"""
+Сброс тега открыток в общем кэше при их изменении (см. CacheTags).
+"""
+
+from typing import Any
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from classes.caching import CacheTags
+from postcard.models import Postcard
+
+
+@receiver([post_save, post_delete], sender=Postcard)
+def invalidate_postcards(sender: type, **kwargs: Any) -> None:
+    CacheTags.invalidate(CacheTags.POSTCARDS)
+
+
+@receiver(m2m_changed, sender=Postcard.movies.through)
+def invalidate_postcard_movies(sender: type, action: str, **kwargs: Any) -> None:
+    if action.startswith("post_"):
+        CacheTags.invalidate(CacheTags.POSTCARDS)
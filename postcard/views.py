@@ -7,8 +7,9 @@ from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from classes import Invitation, PostcardHandler, Tools
+from classes import CacheTags, Invitation, PostcardHandler, Tools
 from mixins import GlobalDataMixin
+from utils.conditional import conditional_get
 from utils.response_handler import handle_response
 
 
@@ -18,6 +19,8 @@ logger = logging.getLogger(__name__)
 class PostcardsArchiveViewSet(GlobalDataMixin, APIView):
     http_method_names = ["get"]
 
+    # в открытках — id их фильмов: удаление фильма чистит связи без сигналов открыток
+    @conditional_get(CacheTags.POSTCARDS, CacheTags.MOVIES)
     async def get(self, request: Request) -> HttpResponse:
         """
         Получение страницы архива всех открыток.
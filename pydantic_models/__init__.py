@@ -2,8 +2,10 @@ __all__ = [
     "KPFilmModel",
     "KpFilmGenresModel",
     "KpFilmPersonModel",
+    "MoviesQueryModel",
     "RateMovieRequestModel",
 ]
 
 from .kp_movie_api import KpFilmGenresModel, KPFilmModel, KpFilmPersonModel
+from .movies_query import MoviesQueryModel
 from .rate_movie_request import RateMovieRequestModel
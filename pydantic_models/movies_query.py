@@ -0,0 +1,41 @@
+from decimal import Decimal
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+
+MoviesSort = Literal[
+    "rating_kp",
+    "-rating_kp",
+    "rating_imdb",
+    "-rating_imdb",
+    "premiere",
+    "-premiere",
+    "duration",
+    "-duration",
+    "name",
+    "-name",
+    "rating_user",
+    "-rating_user",
+]
+
+
+class MoviesQueryModel(BaseModel):
+    """
+    Фильтры и сортировка списка фильмов из query-параметров (?genre=драма&genre=комедия&sort=-premiere).
+    Минус перед полем sort — по убыванию.
+    """
+
+    genre: list[str] = Field(default_factory=list)  # фильм должен быть во всех выбранных жанрах
+    min_rating: Decimal | None = Field(None, ge=0, le=10)
+    year_from: int | None = Field(None, ge=1800, le=3000)
+    year_to: int | None = Field(None, ge=1800, le=3000)
+    duration_max: int | None = Field(None, gt=0)
+    sort: MoviesSort = "-rating_kp"
+    user: int | None = Field(None, gt=0)  # чьи оценки для sort=rating_user
+
+    @model_validator(mode="after")
+    def check_user_sort(self) -> "MoviesQueryModel":
+        if self.sort.lstrip("-") == "rating_user" and self.user is None:
+            raise ValueError("Для сортировки по оценкам нужен user")
+        return self
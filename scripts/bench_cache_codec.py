@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк кодеков значений кэша (CompactDisk) на ответах Кинопоиска.
+
+Записи собираются так же, как их кладёт KP (обёртка {"data", "error", "fresh_until"}):
+записанные ответы из scripts/fixtures/kp и сгенерированные fake_kp_server фильмы —
+по одному и пачками (как ответ на запрос списка id в aget_movies_by_ids).
+
+Для каждого кодека в отдельной временной папке замеряются:
+  - байт значений — суммарный размер закодированных значений;
+  - на диске     — Cache.volume() (SQLite + файлы крупных значений);
+  - set / get    — среднее время записи и чтения одной записи с диска, мкс (без L1).
+
+Использование (из корня проекта):
+    uv run scripts/bench_cache_codec.py
+    uv run scripts/bench_cache_codec.py --movies 500 --batch 50 --rounds 5 --threshold 512
+"""
+
+import argparse
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "scripts")]
+
+from fake_kp_server import FakeKP, FakeKPConfig  # noqa: E402
+
+
+def setup_django(cache_dir: str) -> None:
+    """classes импортирует пространства кэша из настроек — их папки уводим во временную."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "filmoclub.settings")
+    os.environ["CACHE_DIRECTORY"] = cache_dir
+
+    import django
+
+    django.setup()
+
+
+def kp_entries(movies: int, batch: int) -> dict[str, dict]:
+    """Записи кэша KP: каждый фильм отдельно и пачки по batch фильмов."""
+    fake = FakeKP(FakeKPConfig())
+    base = "https://image.openmoviedb.com"
+    ids = list(fake.fixtures) + list(range(1_000, 1_000 + movies))
+    docs = [fake.movie(movie_id, base) for movie_id in ids]
+
+    entries = {}
+    fresh_until = time.time() + 60 * 60
+    for doc in docs:
+        entries[f"movie:{doc['id']}"] = {"data": doc, "error": None, "fresh_until": fresh_until}
+    for start in range(0, len(docs), batch):
+        page = {"docs": docs[start : start + batch], "total": len(docs), "limit": batch, "page": 1, "pages": 1}
+        entries[f"list:{start}"] = {"data": page, "error": None, "fresh_until": fresh_until}
+    return entries
+
+
+def codecs(threshold: int) -> list[tuple[str, dict]]:
+    """Доступные в окружении варианты: msgpack и zstd — только если пакеты установлены."""
+    from classes.cache_codec import CompactDisk
+
+    variants = [
+        ("pickle", {"codec": "pickle", "compress_threshold": 0}),
+        ("pickle+zlib", {"codec": "pickle", "compress_threshold": threshold}),
+        ("json", {"codec": "json", "compress_threshold": 0}),
+        ("json+zlib", {"codec": "json", "compress_threshold": threshold}),
+        ("msgpack", {"codec": "msgpack", "compress_threshold": 0}),
+        ("msgpack+zlib", {"codec": "msgpack", "compress_threshold": threshold}),
+        ("json+zstd", {"codec": "json", "compress": "zstd", "compress_threshold": threshold}),
+        ("msgpack+zstd", {"codec": "msgpack", "compress": "zstd", "compress_threshold": threshold}),
+    ]
+    return [
+        (name, options)
+        for name, options in variants
+        if CompactDisk.check_options(options["codec"], options.get("compress", "zlib")) is None
+    ]
+
+
+def bench(name: str, options: dict, entries: dict[str, dict], rounds: int, tmp: str) -> dict:
+    from classes.caching import Caching
+
+    cache = Caching(str(Path(tmp) / name), **options)
+    disk = cache._Caching__cache.disk
+    payload = sum(len(disk.encode(value)) for value in entries.values())
+
+    started = time.perf_counter()
+    for key, value in entries.items():
+        cache.set_cache(key, value)
+    set_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for key in entries:
+            cache.get_cache(key, use_memory=False)
+    get_time = time.perf_counter() - started
+
+    return {
+        "payload": payload,
+        "volume": cache.get_stats()["bytes"],
+        "set_us": set_time / len(entries) * 1e6,
+        "get_us": get_time / (len(entries) * rounds) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение кодеков кэша на ответах Кинопоиска")
+    parser.add_argument("--movies", type=int, default=200, help="Сгенерированных фильмов (кроме записанных).")
+    parser.add_argument("--batch", type=int, default=20, help="Фильмов в одной записи-пачке.")
+    parser.add_argument("--rounds", type=int, default=3, help="Сколько раз прочитать каждую запись.")
+    parser.add_argument("--threshold", type=int, default=1024, help="compress_threshold для вариантов со сжатием.")
+    args = parser.parse_args()
+
+    entries = kp_entries(args.movies, args.batch)
+    print(f"Записей: {len(entries)}, порог сжатия: {args.threshold} байт")
+    print(f"{'кодек':<14} {'байт значений':>14} {'на диске':>12} {'к pickle':>9} {'set, мкс':>9} {'get, мкс':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(str(Path(tmp) / "namespaces"))
+        baseline = None
+        for name, options in codecs(args.threshold):
+            result = bench(name, options, entries, args.rounds, tmp)
+            baseline = baseline or result["payload"]
+            print(
+                f"{name:<14} {result['payload']:>14,} {result['volume']:>12,} {result['payload'] / baseline:>9.2f} "
+                f"{result['set_us']:>9.1f} {result['get_us']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк импорта фильмов из Кинопоиска без сети.
+
+Поднимает в фоне scripts/fake_kp_server.py, направляет на него KP (KP_BASE_URL),
+создаёт тестовую базу (как manage.py test, рабочая db.sqlite3 не трогается),
+отдельную папку кэша и MEDIA_ROOT, и замеряет при разной параллельности:
+
+  - a_download   — MovieHandler.a_download: добавление новых фильмов с постерами,
+                   как из формы «Добавить фильм»;
+  - update_recent_movies — management-команда обновления оценок (--concurrency),
+                   перед каждым прогоном кэш KP очищается.
+
+Для каждого прогона печатается время, фильмов в секунду и число запросов к API.
+
+Использование (из корня проекта):
+    uv run scripts/bench_kp_import.py
+    uv run scripts/bench_kp_import.py --movies 300 --concurrency 1 4 16 --latency 0.2
+    uv run scripts/bench_kp_import.py --throttle-rate 0.05 --error-rate 0.01 --rate 10
+"""
+
+import argparse
+import asyncio
+from io import StringIO
+import logging
+import os
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import time
+
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "scripts")]
+
+from fake_kp_server import FakeKP, FakeKPConfig  # noqa: E402
+
+
+def start_fake_server(fake: FakeKP, port: int) -> "uvicorn.Server":  # noqa: F821
+    """Фейковый API в фоновом потоке со своим event loop."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(fake, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def setup_django(port: int, cache_dir: str, rate: float) -> None:
+    """Настройки читаются из окружения при импорте — поэтому выставляем их до django.setup()."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "filmoclub.settings")
+    os.environ["KP_BASE_URL"] = f"http://127.0.0.1:{port}/v1.4/"
+    os.environ["CACHE_DIRECTORY"] = cache_dir
+    os.environ["KP_API_TOKEN"] = "bench"
+    os.environ["KP_RATE_LIMIT"] = str(rate)
+    os.environ["KP_DAILY_QUOTA"] = "0"
+
+    import django
+
+    django.setup()
+
+
+async def bench_download(ids: list[int], concurrency: int) -> int:
+    """Параллельный a_download; возвращает число успешно добавленных фильмов."""
+    from classes.kp import KP
+    from classes.movie import MovieHandler
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def download(kp_id: int) -> bool:
+        async with semaphore:
+            result = await MovieHandler.a_download(kp_id)
+            return not (isinstance(result, dict) and result.get("error"))
+
+    try:
+        results = await asyncio.gather(*(download(kp_id) for kp_id in ids))
+    finally:
+        await KP.aclose_clients()
+    return sum(results)
+
+
+def report(scenario: str, concurrency: int, movies: int, elapsed: float, requests: int, ok: int | None = None) -> None:
+    print(
+        f"{scenario:<22} c={concurrency:<3} фильмов={movies:<5} успешно={'-' if ok is None else ok:<5} "
+        f"{elapsed:7.2f} с  {movies / elapsed:8.1f} фильм/с  запросов к API={requests}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк импорта фильмов на фейковом API Кинопоиска")
+    parser.add_argument("--movies", type=int, default=100, help="Фильмов на прогон.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Уровни параллельности.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=0, help="KP_RATE_LIMIT на время прогона (0 — без лимита).")
+    parser.add_argument("--latency", type=float, default=0.1, help="Задержка ответа фейкового API, сек.")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--batch-size", type=int, default=20, help="--batch-size для update_recent_movies.")
+    parser.add_argument("--verbose", action="store_true", help="Не глушить логи приложения.")
+    args = parser.parse_args()
+
+    fake = FakeKP(
+        FakeKPConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after,
+        )
+    )
+    server = start_fake_server(fake, args.port)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(args.port, str(Path(tmp) / "cache"), args.rate)
+        if not args.verbose:
+            logging.disable(logging.CRITICAL)
+
+        from django.core.management import call_command
+        from django.db import connection
+        from django.test.utils import override_settings
+
+        from classes.caching import CacheRegistry
+
+        old_db_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(MEDIA_ROOT=str(Path(tmp) / "media")):
+                print(f"Фейковый API: {fake.config}")
+                first_id = 1_000
+                for concurrency in args.concurrency:
+                    ids = list(range(first_id, first_id + args.movies))
+                    first_id += args.movies
+                    requests_before, started = fake.requests, time.perf_counter()
+                    ok = asyncio.run(bench_download(ids, concurrency))
+                    elapsed = time.perf_counter() - started
+                    report("a_download", concurrency, len(ids), elapsed, fake.requests - requests_before, ok)
+
+                movies = first_id - 1_000
+                for concurrency in args.concurrency:
+                    CacheRegistry.get("kp").clear_cache()
+                    requests_before, started = fake.requests, time.perf_counter()
+                    call_command(
+                        "update_recent_movies",
+                        years=3,
+                        concurrency=concurrency,
+                        batch_size=args.batch_size,
+                        stdout=StringIO(),
+                    )
+                    elapsed = time.perf_counter() - started
+                    report("update_recent_movies", concurrency, movies, elapsed, fake.requests - requests_before)
+        finally:
+            connection.creation.destroy_test_db(old_db_name, verbosity=0)
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
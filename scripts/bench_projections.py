@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк values()-проекций (lists/projections.py) против DRF-сериализаторов.
+
+Создаёт тестовую базу (как manage.py test, рабочая db.sqlite3 не трогается), наполняет её
+сгенерированными фильмами с жанрами, участниками и оценками и для каждой пары
+«сериализатор — проекция» проверяет, что ответы совпадают байт в байт (JSON), а затем
+замеряет лучшее время из --rounds прогонов:
+
+  - MovieDictSerializer   / MOVIE_DICT   — ?format=json, страницы фильмов;
+  - MovieRatingSerializer / MOVIE_RATING — списки с рейтингами;
+  - NoteSerializer        / NOTE         — все оценки;
+  - UserSerializer        / USER         — участники;
+  - статистика: фильмы архива для pandas — прежний путь (MovieRatingSerializer, строки с Decimal
+    в float через replace/astype) против MOVIE_STATS; сравниваются готовые DataFrame.
+
+Использование (из корня проекта):
+    uv run scripts/bench_projections.py
+    uv run scripts/bench_projections.py --movies 3000 --users 6 --rounds 7
+"""
+
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def setup_django(cache_dir: str) -> None:
+    """classes импортирует пространства кэша из настроек — их папки уводим во временную."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "filmoclub.settings")
+    os.environ["CACHE_DIRECTORY"] = cache_dir
+
+    import django
+
+    django.setup()
+
+
+def fill(movies: int, users: int) -> None:
+    """Фильмы с 1–4 жанрами, половина — в архиве с оценками всех участников."""
+    from datetime import datetime, timedelta, timezone
+    from decimal import Decimal
+
+    from lists.models import Genre, Movie, Note, User
+
+    rnd = random.Random(42)
+    genres = Genre.mgr.bulk_create(Genre(name=f"жанр {i}") for i in range(20))
+    Movie.mgr.bulk_create(
+        Movie(
+            kp_id=kp_id,
+            name=f"Фильм {kp_id}",
+            description="Описание " * 20,
+            premiere=datetime(1950, 1, 1, tzinfo=timezone.utc) + timedelta(days=rnd.randrange(27_000)),
+            duration=rnd.randrange(70, 200),
+            rating_kp=Decimal(rnd.randrange(3000, 9500)) / 1000,
+            rating_imdb=Decimal(rnd.randrange(3000, 9500)) / 1000,
+            votes_kp=rnd.randrange(100_000),
+            budget=rnd.randrange(10**8),
+            fees=rnd.randrange(10**9),
+            poster_local="media/posters/default.png" if kp_id % 3 else f"media/posters/{kp_id}.webp",
+            is_archive=kp_id % 2 == 0,
+        )
+        for kp_id in range(1, movies + 1)
+    )
+    Movie.genres.through.objects.bulk_create(
+        Movie.genres.through(movie_id=kp_id, genre_id=genre.name)
+        for kp_id in range(1, movies + 1)
+        for genre in rnd.sample(genres, rnd.randrange(1, 5))
+    )
+    members = [User.objects.create(username=f"user{i}", first_name=f"Участник {i}") for i in range(users)]
+    Note.mgr.bulk_create(
+        Note(user=user, movie_id=kp_id, rating=rnd.randrange(1, 11))
+        for kp_id in range(2, movies + 1, 2)
+        for user in members
+    )
+
+
+def best_time(fn: callable, rounds: int) -> tuple[float, object]:
+    result, times = None, []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def stats_frames() -> tuple[callable, callable]:
+    """Фильмы архива для Statistic: прежний путь и MOVIE_STATS, до одинакового DataFrame."""
+    import numpy as np
+    import pandas as pd
+
+    from features.serializers import MovieRatingSerializer
+    from lists.models import Movie
+    from lists.projections import MOVIE_STATS
+
+    ratings = ["rating_kp", "rating_imdb"]
+
+    def drf() -> pd.DataFrame:
+        df = pd.DataFrame(MovieRatingSerializer(Movie.mgr.filter(is_archive=True), many=True).data)
+        df[ratings] = df[ratings].replace(",", ".", regex=True).astype(np.float64).round(2)
+        return df
+
+    def projection() -> pd.DataFrame:
+        df = pd.DataFrame(MOVIE_STATS.all(Movie.mgr.filter(is_archive=True)), columns=list(MOVIE_STATS.fields))
+        df[ratings] = df[ratings].round(2)
+        return df
+
+    return drf, projection
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="values()-проекции против DRF-сериализаторов")
+    parser.add_argument("--movies", type=int, default=1000, help="Фильмов в базе.")
+    parser.add_argument("--users", type=int, default=4, help="Участников (у каждого оценка каждого фильма архива).")
+    parser.add_argument("--rounds", type=int, default=5, help="Прогонов на замер (берётся лучший).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(str(Path(tmp) / "cache"))
+        logging.disable(logging.CRITICAL)
+
+        from django.db import connection
+        import pandas as pd
+
+        from features.serializers import MovieRatingSerializer
+        from lists.models import Movie, Note, User
+        from lists.projections import MOVIE_DICT, MOVIE_RATING, NOTE, USER
+        from lists.serializers import MovieDictSerializer, NoteSerializer, UserSerializer
+
+        old_db_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            fill(args.movies, args.users)
+            movies = Movie.mgr.all()
+            cases = [
+                (
+                    "MovieDict",
+                    lambda: list(MovieDictSerializer(movies.prefetch_related("genres"), many=True).data.values()),
+                    lambda: MOVIE_DICT.all(movies),
+                ),
+                (
+                    "MovieRating",
+                    lambda: MovieRatingSerializer(movies, many=True).data,
+                    lambda: MOVIE_RATING.all(movies),
+                ),
+                ("Note", lambda: NoteSerializer(Note.mgr.all(), many=True).data, lambda: NOTE.all(Note.mgr.all())),
+                (
+                    "User",
+                    lambda: UserSerializer(User.objects.all(), many=True).data,
+                    lambda: USER.all(User.objects.all()),
+                ),
+            ]
+
+            print(f"Фильмов: {args.movies}, оценок: {Note.mgr.count()}, лучший из {args.rounds} прогонов")
+            print(f"{'данные':<12} {'строк':>7} {'DRF, мс':>9} {'values(), мс':>13} {'ускорение':>10}  совпадают")
+            for name, drf, projection in cases:
+                drf_time, expected = best_time(drf, args.rounds)
+                projection_time, result = best_time(projection, args.rounds)
+                same = json.dumps(result) == json.dumps(expected)
+                print(
+                    f"{name:<12} {len(result):>7} {drf_time * 1e3:>9.1f} {projection_time * 1e3:>13.1f} "
+                    f"{drf_time / projection_time:>9.1f}×  {'да' if same else 'НЕТ'}"
+                )
+
+            drf, projection = stats_frames()
+            drf_time, expected = best_time(drf, args.rounds)
+            projection_time, result = best_time(projection, args.rounds)
+            try:
+                pd.testing.assert_frame_equal(
+                    result.assign(premiere=pd.to_datetime(result["premiere"], utc=True)),
+                    expected.assign(premiere=pd.to_datetime(expected["premiere"], utc=True)),
+                )
+                same = True
+            except AssertionError:
+                same = False
+            print(
+                f"{'Статистика':<12} {len(result):>7} {drf_time * 1e3:>9.1f} {projection_time * 1e3:>13.1f} "
+                f"{drf_time / projection_time:>9.1f}×  {'да' if same else 'НЕТ'}"
+            )
+        finally:
+            connection.creation.destroy_test_db(old_db_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Локальная подмена API Кинопоиска (api.poiskkino.dev) для нагрузочных тестов.
+
+Чистое ASGI-приложение без Django: отдаёт эндпоинты /v1.4/movie, которыми пользуется
+classes/kp.py, и байты постеров. Фильмы берутся из записанных ответов
+scripts/fixtures/kp/<id>.json, а для остальных id генерируются правдоподобные
+(стабильные для одного id) данные — так можно гонять импорт хоть тысячи фильмов.
+
+Эндпоинты:
+    GET /v1.4/movie/<id>              — один фильм (404 для id >= NOT_FOUND_FROM)
+    GET /v1.4/movie?id=1&id=2&page=1  — списочный эндпоинт (docs, total, limit, page, pages),
+                                        поддерживает selectFields
+    GET /v1.4/movie/search?query=...  — поиск по названию (записанные фильмы + сгенерированные)
+    GET /posters/<id>.jpg             — постер
+
+Поведение настраивается (аргументы или переменные окружения FAKE_KP_*):
+    --latency 0.2        задержка ответа, сек (FAKE_KP_LATENCY)
+    --jitter 0.05        случайный разброс задержки, сек (FAKE_KP_JITTER)
+    --error-rate 0.01    доля ответов 500 (FAKE_KP_ERROR_RATE)
+    --throttle-rate 0.05 доля ответов 429 (FAKE_KP_THROTTLE_RATE)
+    --retry-after 1      значение Retry-After у 429 (FAKE_KP_RETRY_AFTER)
+
+Использование (из корня проекта):
+    uv run scripts/fake_kp_server.py --port 8765 --latency 0.2 --throttle-rate 0.05
+    KP_BASE_URL=http://127.0.0.1:8765/v1.4/ uv run manage.py update_recent_movies
+
+Или через uvicorn (настройки из окружения):
+    FAKE_KP_LATENCY=0.1 uv run uvicorn --app-dir scripts fake_kp_server:app --port 8765
+"""
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+import io
+import json
+import os
+from pathlib import Path
+import random
+from typing import Any
+from urllib.parse import parse_qs
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "kp"
+
+# id начиная с этого считаются несуществующими (для проверки негативного кэша)
+NOT_FOUND_FROM = 100_000_000
+
+GENRES = ["драма", "комедия", "фантастика", "триллер", "мелодрама", "боевик", "мультфильм", "детектив"]
+COUNTRIES = ["США", "Россия", "Франция", "Великобритания", "Япония", "Германия"]
+PROFESSIONS = [("актеры", "actor"), ("режиссеры", "director"), ("сценаристы", "writer"), ("продюсеры", "producer")]
+
+
+@dataclass
+class FakeKPConfig:
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    fixtures_dir: Path = FIXTURES_DIR
+
+    @classmethod
+    def from_env(cls) -> "FakeKPConfig":
+        return cls(
+            latency=float(os.getenv("FAKE_KP_LATENCY", "0")),
+            jitter=float(os.getenv("FAKE_KP_JITTER", "0")),
+            error_rate=float(os.getenv("FAKE_KP_ERROR_RATE", "0")),
+            throttle_rate=float(os.getenv("FAKE_KP_THROTTLE_RATE", "0")),
+            retry_after=float(os.getenv("FAKE_KP_RETRY_AFTER", "1")),
+            fixtures_dir=Path(os.getenv("FAKE_KP_FIXTURES", str(FIXTURES_DIR))),
+        )
+
+
+class FakeKP:
+    """ASGI-приложение фейкового API."""
+
+    def __init__(self, config: FakeKPConfig) -> None:
+        self.config = config
+        self.fixtures = self._load_fixtures(config.fixtures_dir)
+        self.requests = 0  # сколько запросов обслужено (для отчёта бенчмарка)
+        self._poster: bytes | None = None
+
+    @staticmethod
+    def _load_fixtures(fixtures_dir: Path) -> dict[int, dict]:
+        fixtures = {}
+        for path in sorted(fixtures_dir.glob("*.json")):
+            movie = json.loads(path.read_text(encoding="utf-8"))
+            fixtures[movie["id"]] = movie
+        return fixtures
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] == "lifespan":
+            while (await receive())["type"] != "lifespan.shutdown":
+                await send({"type": "lifespan.startup.complete"})
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+        if scope["type"] != "http":
+            return
+
+        self.requests += 1
+        status, headers, body = await self._handle(scope)
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _handle(self, scope: dict) -> tuple[int, list[tuple[bytes, bytes]], bytes]:
+        config = self.config
+        delay = config.latency + random.uniform(0, config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        path = scope["path"]
+        if path.startswith("/posters/"):
+            return 200, [(b"content-type", b"image/jpeg")], self.poster()
+
+        headers = dict(scope["headers"])
+        if not headers.get(b"x-api-key"):
+            return self._json(401, {"message": "В запросе не указан токен!"})
+        if random.random() < config.throttle_rate:
+            response = self._json(429, {"message": "Too Many Requests"})
+            response[1].append((b"retry-after", str(config.retry_after).encode()))
+            return response
+        if random.random() < config.error_rate:
+            return self._json(500, {"message": "Internal Server Error"})
+
+        base = self._base_url(scope)
+        params = parse_qs(scope["query_string"].decode())
+        if path.rstrip("/") == "/v1.4/movie":
+            return self._json(200, self._list(params, base))
+        if path.rstrip("/") == "/v1.4/movie/search":
+            return self._json(200, self._search(params, base))
+        if path.startswith("/v1.4/movie/") and path.rsplit("/", 1)[-1].isdigit():
+            movie = self.movie(int(path.rsplit("/", 1)[-1]), base)
+            if movie is None:
+                return self._json(404, {"message": "Фильм не найден"})
+            return self._json(200, movie)
+        return self._json(404, {"message": "Not Found"})
+
+    def _list(self, params: dict[str, list[str]], base: str) -> dict:
+        ids = [int(i) for i in params.get("id", []) if i.isdigit()]
+        limit = int(params.get("limit", ["10"])[0])
+        page = int(params.get("page", ["1"])[0])
+        docs = [movie for movie in (self.movie(i, base) for i in ids) if movie]
+        if fields := params.get("selectFields"):
+            docs = [{key: value for key, value in movie.items() if key in fields} for movie in docs]
+        pages = max((len(docs) + limit - 1) // limit, 1)
+        return {
+            "docs": docs[(page - 1) * limit : page * limit],
+            "total": len(docs),
+            "limit": limit,
+            "page": page,
+            "pages": pages,
+        }
+
+    def _search(self, params: dict[str, list[str]], base: str) -> dict:
+        """Записанные фильмы с подходящим названием и пара десятков сгенерированных под запрос."""
+        query = params.get("query", [""])[0].strip().lower()
+        limit = int(params.get("limit", ["10"])[0])
+        found = [
+            movie
+            for movie in (self.movie(movie_id, base) for movie_id in self.fixtures)
+            if query and query in f"{movie.get('name')} {movie.get('alternativeName')}".lower()
+        ]
+        # стабильные id под запрос: один и тот же запрос — одни и те же фильмы
+        rnd = random.Random(query)
+        for n in range(rnd.randint(0, 30)):
+            movie = self.movie(rnd.randint(1_000_000, 9_999_999), base)
+            found.append({**movie, "name": f"{query.capitalize()} {n + 1}"})
+        pages = max((len(found) + limit - 1) // limit, 1)
+        return {"docs": found[:limit], "total": len(found), "limit": limit, "page": 1, "pages": pages}
+
+    def movie(self, movie_id: int, base: str) -> dict | None:
+        """Записанный ответ или сгенерированный фильм. None — такого фильма нет."""
+        if movie_id in self.fixtures:
+            # постер отдаём сами, чтобы прогон не зависел от CDN Кинопоиска
+            poster_url = f"{base}/posters/{movie_id}.jpg"
+            return {**self.fixtures[movie_id], "poster": {"url": poster_url, "previewUrl": poster_url}}
+        if movie_id >= NOT_FOUND_FROM:
+            return None
+
+        rnd = random.Random(movie_id)  # один и тот же id — один и тот же фильм
+        year = rnd.randint(2024, 2026)
+        persons = [
+            {
+                "id": movie_id * 100 + n,
+                "photo": f"{base}/posters/person_{movie_id * 100 + n}.jpg",
+                "name": f"Персона {movie_id * 100 + n}",
+                "enName": f"Person {movie_id * 100 + n}",
+                "profession": profession,
+                "enProfession": en_profession,
+            }
+            for n, (profession, en_profession) in enumerate(rnd.choices(PROFESSIONS, k=rnd.randint(8, 30)))
+        ]
+        return {
+            "id": movie_id,
+            "name": f"Фильм {movie_id}",
+            "alternativeName": f"Movie {movie_id}",
+            "type": "movie",
+            "year": year,
+            "description": "Сгенерированное описание фильма. " * rnd.randint(3, 10),
+            "shortDescription": "Сгенерированный фильм для нагрузочного теста.",
+            "slogan": "Тестируй быстрее",
+            "movieLength": rnd.randint(80, 180),
+            "rating": {"kp": round(rnd.uniform(4, 9), 3), "imdb": round(rnd.uniform(4, 9), 1)},
+            "votes": {"kp": rnd.randint(100, 500_000), "imdb": rnd.randint(100, 900_000)},
+            "budget": {"value": rnd.randint(1, 200) * 1_000_000, "currency": "$"},
+            "fees": {"world": {"value": rnd.randint(1, 900) * 1_000_000, "currency": "$"}},
+            "premiere": {"world": f"{year}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T00:00:00.000Z"},
+            "poster": {"url": f"{base}/posters/{movie_id}.jpg", "previewUrl": f"{base}/posters/{movie_id}.jpg"},
+            "genres": [{"name": name} for name in rnd.sample(GENRES, k=rnd.randint(1, 3))],
+            "countries": [{"name": name} for name in rnd.sample(COUNTRIES, k=rnd.randint(1, 2))],
+            "persons": persons,
+        }
+
+    def poster(self) -> bytes:
+        """Небольшой jpeg, генерируется один раз."""
+        if self._poster is None:
+            from PIL import Image
+
+            buffer = io.BytesIO()
+            Image.new("RGB", (300, 450), (40, 40, 60)).save(buffer, "JPEG", quality=80)
+            self._poster = buffer.getvalue()
+        return self._poster
+
+    @staticmethod
+    def _base_url(scope: dict) -> str:
+        host = dict(scope["headers"]).get(b"host", b"127.0.0.1").decode()
+        return f"{scope.get('scheme', 'http')}://{host}"
+
+    @staticmethod
+    def _json(status: int, payload: dict) -> tuple[int, list[tuple[bytes, bytes]], bytes]:
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        return status, [(b"content-type", b"application/json; charset=utf-8")], body
+
+
+# Для запуска через uvicorn: настройки из окружения
+app = FakeKP(FakeKPConfig.from_env())
+
+
+def main() -> None:
+    import uvicorn
+
+    defaults = FakeKPConfig.from_env()
+    parser = argparse.ArgumentParser(description="Фейковый API Кинопоиска для бенчмарков")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="Задержка ответа, сек.")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="Случайный разброс задержки, сек.")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Доля ответов 500.")
+    parser.add_argument("--throttle-rate", type=float, default=defaults.throttle_rate, help="Доля ответов 429.")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after, help="Retry-After у 429, сек.")
+    parser.add_argument("--fixtures", type=Path, default=defaults.fixtures_dir, help="Папка с записанными ответами.")
+    args = parser.parse_args()
+
+    config = FakeKPConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        fixtures_dir=args.fixtures,
+    )
+    fake = FakeKP(config)
+    print(f"Фейковый API: http://{args.host}:{args.port}/v1.4/ ({len(fake.fixtures)} записанных фильмов, {config})")
+    uvicorn.run(fake, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
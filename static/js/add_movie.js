@@ -6,10 +6,17 @@ const addButton = document.querySelector("#add-btn");
 const spinner = addButton.querySelector('.spinner-border');
 const input = document.querySelector("#movie-link");
 const form = document.querySelector('form');
+const searchResults = document.querySelector("#search-results");
 
-async function sendData() {
+// Поиск по названию: ждём паузу в наборе, чтобы не дёргать API на каждую букву
+const SEARCH_DELAY = 350;
+const SEARCH_MIN_LENGTH = 2;
+let searchTimer = null;
+let searchCounter = 0;
 
-    if (input.value.replace(/\D/g, '').length < 1) {
+async function sendData(value = input.value) {
+
+    if (String(value).replace(/\D/g, '').length < 1) {
         createToast('В строке отсутствует id', 'info');
         return null;
     }
@@ -19,14 +26,83 @@ async function sendData() {
     spinner.style.display = 'inline-block';
 
     // Запрос на добавление фильма
-    await Request.post({url: '', body: {kp_id: input.value}});
+    await Request.post({url: '', body: {kp_id: value}});
 
     // Возвращаем страницу в изначальное состояние
     addButton.disabled = false;
     input.value = '';
     spinner.style.display = 'none';
+    searchResults.replaceChildren();
+}
+
+// Ссылка на кинопоиск или голый id — искать не надо, это добавление
+function isMovieId(value) {
+    return /kinopoisk\.ru\//.test(value) || /^\s*\d+\s*$/.test(value);
+}
+
+function createResultItem(movie) {
+    const item = document.createElement('li');
+    item.className = 'list-group-item search-result';
+
+    if (movie.poster) {
+        const poster = document.createElement('img');
+        poster.src = movie.poster;
+        poster.alt = '';
+        poster.loading = 'lazy';
+        item.append(poster);
+    }
+
+    const title = document.createElement('span');
+    title.className = 'search-result-title';
+    title.textContent = movie.year ? `${movie.name} (${movie.year})` : movie.name;
+    item.append(title);
+
+    if (movie.rating_kp) {
+        const rating = document.createElement('span');
+        rating.className = 'search-result-rating';
+        rating.textContent = Number(movie.rating_kp).toFixed(1);
+        item.append(rating);
+    }
+
+    if (movie.in_club) {
+        // фильм уже есть у клуба — добавлять нечего
+        const badge = document.createElement('span');
+        badge.className = 'badge search-result-owned';
+        badge.textContent = movie.is_archive ? 'в архиве' : 'уже в клубе';
+        item.append(badge);
+        item.classList.add('disabled');
+    } else {
+        item.addEventListener('click', async () => {
+            input.value = movie.name;
+            await sendData(String(movie.kp_id));
+        });
+    }
+
+    return item;
+}
+
+async function searchMovies(query) {
+    // ответы могут прийти не по порядку: показываем только последний запрос
+    const requestNumber = ++searchCounter;
+    const movies = await Request.get({url: `/movies/search/?query=${encodeURIComponent(query)}`, showToast: false});
+    if (requestNumber !== searchCounter || !Array.isArray(movies)) {
+        return;
+    }
+    searchResults.replaceChildren(...movies.map(createResultItem));
 }
 
+input.addEventListener('input', () => {
+    clearTimeout(searchTimer);
+    const query = input.value.trim();
+
+    if (query.length < SEARCH_MIN_LENGTH || isMovieId(query)) {
+        searchCounter++;
+        searchResults.replaceChildren();
+        return;
+    }
+    searchTimer = setTimeout(() => searchMovies(query), SEARCH_DELAY);
+});
+
 form.addEventListener('submit', e => {
     e.preventDefault();
 })
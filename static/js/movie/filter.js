@@ -28,51 +28,29 @@ function toggleFilterList() {
 
 }
 
-// Делаем словарик - жанр:[список фильмов]
-function mapGenresToMovies(movies) {
-    let genresMap = {};
-    for (const movieId in movies) {
-
-        for (let gener of movies[movieId]['genres']) {
-
-            (gener in genresMap) ? genresMap[gener].push(movieId) : genresMap[gener] = [movieId];
-        }
-    }
-    return genresMap;
-}
-
-// Показываем только постеры по выбранным фильтрам
-function hideFilteredPosters(genresMap, activeGenres, shownMovies) {
-    const postersList = document.querySelectorAll('.poster-container');
-
-    // Выбираем id фильмов, соответствующие выбранным жанрам
-    for (let option of activeGenres) {
-        shownMovies = shownMovies.filter(mid => genresMap[option].includes(mid));
+// Фильмы по выбранным жанрам отбирает сервер, сетка собирается заново
+async function applyGenres(pages, genres) {
+    await pages.update({genre: genres});
+    if (!Object.keys(pages.allMovies).length) {
+        createToast('Таких фильмов нет', 'info');
     }
-
-    // Отображаем постеры из отфильтрованного списка
-    postersList.forEach(p => {
-        (shownMovies.includes(p.dataset.kpId)) ? p.classList.remove('hidden') : p.classList.add('hidden');
-    })
 }
 
 // Оставляем фильмы соответствующие выбранному жанру в фильтре
-function handleFilterChoice(movies) {
+function handleFilterChoice(pages) {
 
     const genresList = document.querySelectorAll('#filter-list li'); // элементы списка
-    const allMoviesIds = Object.keys(movies); // список id всех фильмов
-    let genresMap = mapGenresToMovies(movies); // соотносим жанр: фильмы
-    let genres = []; // выбранные фильтры/жанры
+    let genres = new URLSearchParams(window.location.search).getAll('genre'); // выбранные фильтры/жанры
+    genresList.forEach(li => li.classList.toggle('active', genres.includes(li.textContent)));
 
 
     genresList.forEach(li => {
             let genre = li.textContent; // почему-то innerText перестал работать
             let isLongPress = false;
-            let shownMovies = allMoviesIds;
 
 
             // Обработчик клика
-            li.addEventListener('click', () => {
+            li.addEventListener('click', async () => {
                 // При длинном нажатии не обрабатываем клик
                 if (isLongPress) {
                     isLongPress = false;
@@ -81,9 +59,8 @@ function handleFilterChoice(movies) {
 
                 genres = li.classList.contains('active') ? genres.filter(g => g !== genre) : genres.concat([genre])
 
-
-                hideFilteredPosters(genresMap, genres, shownMovies);
                 li.classList.toggle('active');
+                await applyGenres(pages, genres);
             })
 
             // Обработчики для длительного нажатия
@@ -91,7 +68,7 @@ function handleFilterChoice(movies) {
             li.addEventListener('mousedown', () => {
                 isLongPress = false;
 
-                pressTimer = window.setTimeout(() => {
+                pressTimer = window.setTimeout(async () => {
 
                     isLongPress = true;
 
@@ -100,8 +77,8 @@ function handleFilterChoice(movies) {
 
                     // Установить только текущий жанр
                     genres = [genre]
-                    hideFilteredPosters(genresMap, genres, shownMovies);
                     li.classList.add('active');
+                    await applyGenres(pages, genres);
 
                 }, 1000);
             });
@@ -119,9 +96,10 @@ function handleFilterChoice(movies) {
 
 }
 
-function filterMovies(allMovies) {
+// pages — постраничная сетка (movie/pagination.js)
+function filterMovies(pages) {
     toggleFilterList(); // отрисовка списка
-    handleFilterChoice(allMovies); // фильтрация
+    handleFilterChoice(pages); // фильтрация
 }
 
 
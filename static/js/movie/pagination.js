@@ -0,0 +1,132 @@
+// Постраничная подгрузка сетки постеров по курсорам (MovieHandler.get_movies_page).
+// Первую страницу отрисовывает сервер; следующие догружаются при прокрутке сетки (?fragment=posters).
+// Фрагмент несёт и курсор следующей страницы, и данные её фильмов (div.movies-page):
+// постеры дописываются в сетку, данные — в allMovies.
+// Фильтры и сортировка (genre, sort, ...) считаются на сервере: они лежат в адресе страницы
+// и уходят с каждым запросом, а update() собирает сетку заново под новый набор.
+export class MoviesPages {
+
+    constructor(grid, allMovies, onAppend) {
+        this.grid = grid;
+        this.allMovies = allMovies;
+        this.onAppend = onAppend; // навешивание обработчиков на новые постеры
+        this.limit = grid.dataset.pageSize;
+        this.cursor = null;
+        this.query = new URLSearchParams(window.location.search);
+        this.loading = null;
+        this.generation = 0; // растёт при смене фильтров: ответы для старого набора отбрасываются
+
+        // Метка в конце сетки: когда она показалась — грузим следующую страницу.
+        // Сетка скроллится сама, поэтому метка внутри неё, а order держит её последней
+        this.sentinel = document.createElement('div');
+        this.sentinel.style.cssText = 'order: 2147483647; flex-basis: 100%; height: 1px;';
+        this.grid.append(this.sentinel);
+    }
+
+    _url(params, cursor = null) {
+        const query = new URLSearchParams(this.query);
+        ['format', 'fragment', 'limit', 'cursor'].forEach(name => query.delete(name));
+        Object.entries({...params, limit: this.limit}).forEach(([name, value]) => query.set(name, value));
+        if (cursor) {
+            query.set('cursor', cursor);
+        }
+        return `${window.location.pathname}?${query}`;
+    }
+
+    // Курсор и данные фильмов страницы из её фрагмента; сам div.movies-page в сетке не нужен
+    _readPage(root) {
+        const page = root.querySelector('.movies-page');
+        if (!page) {
+            return false;
+        }
+        Object.assign(this.allMovies, JSON.parse(page.querySelector('script').textContent));
+        this.cursor = page.dataset.nextCursor || null;
+        page.remove();
+        return true;
+    }
+
+    // Первая страница уже в сетке: её отрисовал сервер
+    loadFirst() {
+        return this._readPage(this.grid);
+    }
+
+    // Следующая страница; одновременные вызовы ждут одну и ту же загрузку
+    loadNext() {
+        if (!this.cursor) {
+            return Promise.resolve(false);
+        }
+        this.loading ??= this._load(this.cursor).finally(() => this.loading = null);
+        return this.loading;
+    }
+
+    async _load(cursor) {
+        const generation = this.generation;
+        const response = await fetch(this._url({fragment: 'posters'}, cursor));
+        if (!response.ok) {
+            return false;
+        }
+        const html = await response.text();
+        if (generation !== this.generation) {
+            return false;
+        }
+
+        const template = document.createElement('template');
+        template.innerHTML = html;
+        if (!this._readPage(template.content)) {
+            return false;
+        }
+        const posters = [...template.content.querySelectorAll('.poster-container')];
+
+        this.grid.insertBefore(template.content, this.sentinel);
+        this.onAppend(posters);
+
+        if (!this.cursor) {
+            this.observer?.unobserve(this.sentinel);
+            this.sentinel.remove();
+        } else if (this.observer) {
+            // метка могла остаться на экране — повторное наблюдение сразу сообщит об этом
+            this.observer.unobserve(this.sentinel);
+            this.observer.observe(this.sentinel);
+        }
+        return true;
+    }
+
+    // Новые фильтры или сортировка: {genre: ['драма'], sort: '-premiere'}; пустое значение убирает параметр.
+    // Сетка очищается и собирается заново с первой страницы
+    async update(changes) {
+        for (const [name, value] of Object.entries(changes)) {
+            this.query.delete(name);
+            [].concat(value ?? []).forEach(v => this.query.append(name, v));
+        }
+        history.replaceState(null, '', `${window.location.pathname}?${this.query}`);
+
+        const generation = ++this.generation;
+        await this.loading;
+        if (generation !== this.generation) {
+            return false;
+        }
+
+        this.grid.querySelectorAll('.poster-container').forEach(poster => poster.remove());
+        Object.keys(this.allMovies).forEach(kpId => delete this.allMovies[kpId]);
+        this.grid.append(this.sentinel);
+        this.grid.scrollTop = 0;
+
+        this.loading = this._load(null).finally(() => this.loading = null);
+        return this.loading;
+    }
+
+    // Подгрузка при прокрутке: заранее, за пару экранов до конца сетки
+    observe() {
+        this.observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                this.loadNext();
+            }
+        }, {root: this.grid, rootMargin: '1200px 0px'});
+
+        if (!this.cursor) {
+            this.sentinel.remove();
+            return;
+        }
+        this.observer.observe(this.sentinel);
+    }
+}
@@ -1,33 +1,35 @@
 const rateToggler = document.querySelector('#rate-toggle');
 
-const changeNotesVisibility = () => {
-    const rateNotes = document.querySelectorAll('.note-container')
-    let visibility = localStorage.getItem('ratingVisibility') || 'hidden';
-
-    // Отображаем оценки, если в локал стораже нужный флаг и мы на странице архива
-    if (visibility === 'visible' && window.location.href.includes('archive')) {
-        rateNotes.forEach(note => {
-            note.style.visibility = visibility;
-        })
-    }
-
-
-    return () => {
-
-        visibility = (visibility === 'visible') ? 'hidden' : 'visible';
-
-        localStorage.setItem('ratingVisibility', visibility);
+// Оценки видны, если в локал стораже нужный флаг и мы на странице архива
+const notesVisibility = () => {
+    const visibility = localStorage.getItem('ratingVisibility') || 'hidden';
+    return (visibility === 'visible' && window.location.href.includes('archive')) ? 'visible' : 'hidden';
+}
 
-        rateNotes.forEach(note => {
-            note.style.visibility = visibility
-        })
+// Применяем текущую видимость ко всем оценкам (и к догруженным постерам)
+export function syncNotesVisibility() {
+    if (notesVisibility() !== 'visible') {
+        return null;
     }
+    document.querySelectorAll('.note-container').forEach(note => {
+        note.style.visibility = 'visible';
+    })
 }
 
 // Функция смены видимости
-const visibilityToggler = changeNotesVisibility()
+const visibilityToggler = () => {
+    const visibility = (localStorage.getItem('ratingVisibility') === 'visible') ? 'hidden' : 'visible';
+
+    localStorage.setItem('ratingVisibility', visibility);
+
+    document.querySelectorAll('.note-container').forEach(note => {
+        note.style.visibility = visibility
+    })
+}
 
 export function showRatingNotesHandler() {
+    syncNotesVisibility();
+
     if (!rateToggler) {
         return null;
     }
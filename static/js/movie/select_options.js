@@ -13,9 +13,10 @@ const optionsListenerMap = {
 }
 
 // При нажатии на кнопку под постером фильма выбирается нужная функция
-export function selectOptionHandler(allMovies) {
+// root — вся страница или догруженный постер (movie/pagination.js)
+export function selectOptionHandler(allMovies, root = document) {
 
-    const moviesOptions = document.querySelectorAll('.opt');
+    const moviesOptions = root.querySelectorAll('.opt');
 
     moviesOptions.forEach(opt => {
 
@@ -39,92 +39,72 @@ function toggleAscending() {
 }
 
 
-// Словарь с функциями сортировки
-function makeSortFunctions(movies) {
-    const name = (a, b) => a.name.localeCompare(b.name);
-    const rating_user = (a, b) => parseFloat(b.rating_user) - parseFloat(a.rating_user);
-    const rating_kp = (a, b) => parseFloat(b.rating_kp) - parseFloat(a.rating_kp);
-    const rating_imdb = (a, b) => parseFloat(b.rating_imdb) - parseFloat(a.rating_imdb);
-    const premiere = (a, b) => new Date(b.premiere.split('/').reverse().join('-')) - new Date(a.premiere.split('/').reverse().join('-'));
-    const duration = (a, b) => b.duration - a.duration;
-
-
-    return {
-        name: () => movies.toSorted(name),
-        rating_user: () => movies.toSorted(rating_user),
-        rating_kp: () => movies.toSorted(rating_kp),
-        rating_imdb: () => movies.toSorted(rating_imdb),
-        premiere: () => movies.toSorted(premiere),
-        duration: () => movies.toSorted(duration)
-    }
+// Сортировка по оценкам — только в архиве и для выбранного пользователя
+function canSortByUser() {
+    return window.location.href.includes('archive') && Boolean(getCookie('user'));
 }
 
-function makeMoviesArray(movies) {
-    const currentUser = getCookie('user');
+// Параметр sort для сервера (MoviesQueryModel): минус — по убыванию.
+// Стрелка «вниз» — по убыванию, а у названия — по алфавиту
+function sortParam(orderName, isAscending) {
+    const descending = orderName === 'name' ? isAscending : !isAscending;
+    return descending ? `-${orderName}` : orderName;
+}
 
-    // Если не выбран пользователь или мы не в архиве - убираем метод сортировки по оценкам
-    if (!window.location.href.includes('archive') || !currentUser) {
-        document.querySelector('li[data-sorting="rating-user"]').remove();
-        return Object.values(movies);
+// Отмечаем сортировку из адреса страницы (например, после перезагрузки)
+function markCurrentSort(sortingTypes) {
+    const sort = new URLSearchParams(window.location.search).get('sort');
+    if (!sort) {
+        return;
     }
-
-    // Добавим информацию об оценках пользователя
-    const rateNotesContainers = document.querySelectorAll('.note-container');
-    rateNotesContainers.forEach(notesContainer => {
-        const movieId = notesContainer.dataset.kpId;
-        const ratingElement = notesContainer.querySelector(`.note[data-user-id="${currentUser}"] h2`);
-        const userRating = ratingElement?.textContent ?? 0;
-        movies[movieId]['rating_user'] = parseInt(userRating);
+    const orderName = sort.replace(/^-/, '');
+    sortingTypes.forEach(sorting => {
+        if (sorting.dataset.sorting.replace('-', '_') !== orderName) {
+            sorting.classList.remove('active');
+            return;
+        }
+        sorting.classList.add('active');
+        const isAscending = sortParam(orderName, false) !== sort; // стрелка «вниз» дала бы другой параметр
+        sorting.querySelector('img').classList.replace(...(isAscending ? ['desc', 'asc'] : ['asc', 'desc']));
     })
-
-    return Object.values(movies);
 }
 
-// Сортируем постеры
-function handeSortChoice(allMovies) {
-    const movies = makeMoviesArray(allMovies);
-    const sortFunctions = makeSortFunctions(movies);
+// Сортируем постеры: порядок считает сервер, сетка собирается заново
+function handeSortChoice(pages) {
+    // Если не выбран пользователь или мы не в архиве - убираем метод сортировки по оценкам
+    if (!canSortByUser()) {
+        document.querySelector('li[data-sorting="rating-user"]').remove();
+    }
 
-    const postersElements = document.querySelectorAll('.poster-container');
     const sortingTypes = document.querySelectorAll('#sorting-list li');
+    markCurrentSort(sortingTypes);
 
     sortingTypes.forEach(sorting => {
 
-        sorting.addEventListener('click', e => {
+        sorting.addEventListener('click', async e => {
 
             // Вычисляем текущий тип сортировки
             const orderName = sorting.dataset.sorting.replace('-', '_');
             const isAscending = sorting.querySelector('img').classList.contains('asc');
-            if (!(orderName in sortFunctions)) {
-                return null;
-            }
 
             // Отображаем сортировку как активную
             sortingTypes.forEach(s => s.classList.remove('active'))
             sorting.classList.add('active');
 
-            // Сортируем фильмы
-            let sortedMovies = sortFunctions[orderName]();
-            sortedMovies = isAscending ? sortedMovies.reverse() : sortedMovies;
-
-            const sortedMoviesMap = sortedMovies.reduce((acc, movie, index) => {
-                acc[movie.kp_id] = index + 1;
-                return acc;
-            }, {});
-
-            // Указываем порядок постера
-            postersElements.forEach(poster => poster.style.order = sortedMoviesMap[poster.dataset.kpId]);
-
-
+            await pages.update({
+                sort: sortParam(orderName, isAscending),
+                user: orderName === 'rating_user' ? getCookie('user') : null,
+            });
         })
     })
 
 }
 
-function sortMovies(allMovies) {
+// pages — постраничная сетка (movie/pagination.js)
+function sortMovies(pages) {
     toggleSortList(); // показываем список сортировок
     toggleAscending(); // меняем направление сортировки
-    handeSortChoice(allMovies); // применяем выбранную сортировку
+    handeSortChoice(pages); // применяем выбранную сортировку
 }
 
 export {sortMovies}
@@ -1,25 +1,34 @@
 import {fillMovieCard} from "./movie/card_filling.js";
 import {selectOptionHandler} from "./movie/select_options.js";
-import {showRatingNotesHandler} from "./movie/rating_toggler.js";
+import {showRatingNotesHandler, syncNotesVisibility} from "./movie/rating_toggler.js";
 import {paintBookedMovies} from "./movie/paint_booked_movies.js";
 import {filterMovies} from "./movie/filter.js";
 import {sortMovies} from "./movie/sort.js";
-import {posterLoadingPlaceholder} from "./movie/poster_placeholder.js";
-import {Request} from "./utils/request.js";
+import {loadPosterImages, posterLoadingPlaceholder} from "./movie/poster_placeholder.js";
+import {MoviesPages} from "./movie/pagination.js";
 
 posterLoadingPlaceholder(); // заглушка на постеры до загрузки
 
-// Получаем все фильмы
-const url = window.location.pathname + '?format=json';
-const allMovies = await Request.get({url: url, showToast: false});
+// Фильмы грузятся постранично: первая страница уже в сетке, остальные — при прокрутке
+const allMovies = {};
+const pages = new MoviesPages(document.querySelector('.posters-grid'), allMovies, posters => {
+    posters.forEach(poster => {
+        loadPosterImages(poster);
+        selectOptionHandler(allMovies, poster);
+        poster.querySelectorAll('[data-bs-toggle="tooltip"]').forEach(el => new bootstrap.Tooltip(el));
+    });
+    paintBookedMovies();
+    syncNotesVisibility();
+});
 
-if (!allMovies) {
+if (!pages.loadFirst()) {
     console.error('Не удалось загрузить фильмы');
 } else {
     paintBookedMovies(); // меняем иконку у всех фильмов в закладках
     showRatingNotesHandler(); // отображение оценок
     fillMovieCard(allMovies); // отрисовки большого постера
     selectOptionHandler(allMovies); // применение опции к фильму
-    sortMovies(allMovies); // сортировка постеров
-    filterMovies(allMovies); // фильтрация постеров по жанрам
+    sortMovies(pages); // сортировка постеров (на сервере)
+    filterMovies(pages); // фильтрация постеров по жанрам (на сервере)
+    pages.observe(); // догрузка следующих страниц
 }
@@ -0,0 +1,41 @@
+"""
+Прогревает кэши дорогих страниц: статистика, списки фильмов, архив открыток, участники, картинки тем.
+
+Примеры:
+    uv run manage.py warm_cache
+    uv run manage.py warm_cache --targets statistic movies
+
+То же самое при старте uvicorn делает lifespan, если задано CACHE_PREWARM=1.
+"""
+
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from classes.cache_warmup import CacheWarmer
+
+
+class Command(BaseCommand):
+    help = "Прогрев кэшей дорогих страниц с отчётом по времени"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--targets",
+            nargs="+",
+            choices=list(CacheWarmer.TARGETS),
+            help="Что прогревать (по умолчанию всё).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        results = asyncio.run(CacheWarmer.warm(options["targets"]))
+
+        for result in results:
+            line = f"{result.target:<10} {result.seconds * 1000:8.0f} мс"
+            if result.error:
+                self.stdout.write(self.style.ERROR(f"{line}  ошибка: {result.error}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+
+        failed = sum(1 for result in results if result.error)
+        total = max((result.seconds for result in results), default=0.0)
+        self.stdout.write(f"Готово за {total * 1000:.0f} мс, ошибок: {failed}")
@@ -1 +1,128 @@
-# Create your tests here.
+# Тесты статистики кэша (счётчики Caching, закрытый tea_code эндпоинт /tools/cache/stats/) и прогрева кэшей.
+from io import StringIO
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from classes.cache_warmup import CacheWarmer
+from classes.caching import CacheRegistry, CacheTags, Caching
+from lists.models import Genre, Movie
+from utils.cache_handler import CacheMetrics
+
+
+CODE = "secret-tea"
+
+
+class CacheStatsTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self._cache_dir = tempfile.TemporaryDirectory()
+        patcher = patch.dict(CacheRegistry._instances, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        settings = self.settings(
+            CACHE_DIRECTORY=self._cache_dir.name,
+            CACHE_NAMESPACES={"test": {"ttl": 60, "memory_limit": 4096}},
+            TEA_CODE=CODE,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def tearDown(self) -> None:
+        Caching._memory_tiers.clear()
+        self._cache_dir.cleanup()
+
+    def test_counters_and_histograms(self) -> None:
+        cache = CacheRegistry.get("test")
+        # новые записи и перезаписи различаются без лишнего чтения ключа
+        with patch("diskcache.Cache.__contains__", side_effect=AssertionError("лишнее чтение")):
+            cache.set_cache("a", 1)
+            cache.set_cache("a", 2)  # перезапись — не новая запись
+        cache.get_cache("a")
+        cache.get_cache("missing")
+        cache.get_cache("a", use_memory=False)  # служебное чтение не считается
+        cache.delete_cache("a")
+
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+        self.assertEqual((stats["sets"], stats["invalidations"], stats["evictions"]), (2, 1, 0))
+        self.assertEqual(sum(stats["get_latency_ms"].values()), 2)
+        self.assertEqual(sum(stats["set_latency_ms"].values()), 2)
+        self.assertEqual(stats["settings"]["ttl"], 60)
+
+    def test_endpoint_requires_tea_code(self) -> None:
+        self.assertEqual(self.client.get("/tools/cache/stats/").status_code, 403)
+
+        CacheRegistry.get("test").get_cache("missing")
+        response = self.client.get(f"/tools/cache/stats/?tea_code={CODE}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["namespaces"]["test"]["misses"], 1)
+
+
+# манифест статики собирается collectstatic, а шаблоны админки на него ссылаются
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    }
+)
+class CacheStatsAdminPageTests(TestCase):
+    def test_page_is_behind_admin_login(self) -> None:
+        self.assertEqual(self.client.get("/boss/cache-stats/").status_code, 302)
+
+        self.client.force_login(get_user_model().objects.create_superuser("boss", password="tea"))
+        response = self.client.get("/boss/cache-stats/")
+        self.assertContains(response, "Статистика кэша")
+        self.assertIn("handlers", response.context["namespaces"])
+
+
+class WarmCacheTests(TransactionTestCase):
+    def test_command_reports_every_target(self) -> None:
+        out = StringIO()
+        call_command("warm_cache", targets=["movies", "archive", "users", "themes"], stdout=out)
+        report = out.getvalue()
+        for target in ("movies", "archive", "users", "themes"):
+            self.assertIn(target, report)
+        self.assertIn("ошибок: 0", report)
+
+    @override_settings(
+        HANDLER_CACHE_ENABLED=True,
+        STORAGES={
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        },
+    )
+    def test_movies_targets_fill_the_page_cache(self) -> None:
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.addCleanup(Caching._memory_tiers.clear)
+        patcher = patch.object(CacheTags, "cache", Caching(cache_dir.name, memory_limit=4096))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for kp_id, is_archive in ((1, False), (2, True)):
+            Movie.mgr.create(kp_id=kp_id, name=f"Фильм {kp_id}", is_archive=is_archive).genres.add(
+                Genre.mgr.get_or_create(name="драма")[0]
+            )
+
+        call_command("warm_cache", targets=["movies", "archive"], stdout=StringIO())
+        CacheMetrics.reset()
+        self.addCleanup(CacheMetrics.reset)
+        # первые страницы /movies/ и /movies/archive/ отдаются из прогретого кэша
+        for url in ("/movies/", "/movies/archive/"):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        stats = CacheMetrics.snapshot()
+        self.assertEqual(stats["movies_page"], {"hits": 2, "misses": 0})
+        self.assertEqual(stats["genres"], {"hits": 2, "misses": 0})
+
+    async def test_failed_target_is_reported_not_raised(self) -> None:
+        async def broken() -> None:
+            raise RuntimeError("нет базы")
+
+        with patch.dict(CacheWarmer.TARGETS, {"statistic": broken}), self.assertLogs("classes.cache_warmup"):
+            results = await CacheWarmer.warm(["statistic", "themes"])
+
+        self.assertEqual([result.target for result in results], ["statistic", "themes"])
+        self.assertEqual(results[0].error, "нет базы")
+        self.assertIsNone(results[1].error)
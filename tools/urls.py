@@ -0,0 +1,8 @@
+from django.urls import path
+
+from tools.views import CacheStatsViewSet
+
+
+urlpatterns = [
+    path("cache/stats/", CacheStatsViewSet.as_view(), name="cache_stats"),
+]
@@ -0,0 +1,43 @@
+from adrf.views import APIView
+from asgiref.sync import sync_to_async
+from django.contrib import admin
+from django.http import HttpRequest, HttpResponse
+from django.template.response import TemplateResponse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from classes.caching import CacheRegistry
+from utils.cache_handler import CacheMetrics
+from utils.middleware import TeaCodeMiddleware
+
+
+class CacheStatsViewSet(APIView):
+    """
+    Статистика кэша по пространствам (CACHE_NAMESPACES) и декорированным обработчикам.
+    Только для своих: нужен tea_code, даже для GET.
+    """
+
+    http_method_names = ["get"]
+
+    async def get(self, request: Request) -> HttpResponse:
+        if not TeaCodeMiddleware.request_has_code(request):
+            return Response({"error": "Статистика доступна только членам киноклуба (нет tea_code)"}, status=403)
+
+        # объём и число записей читаются из SQLite — не в event loop
+        namespaces = await sync_to_async(CacheRegistry.get_stats)()
+        return Response({"namespaces": namespaces, "handlers": CacheMetrics.snapshot()}, status=status.HTTP_200_OK)
+
+
+def cache_stats_view(request: HttpRequest) -> TemplateResponse:
+    """
+    Страница /boss/cache-stats/: та же статистика, что и /tools/cache/stats/, таблицами.
+    Подключается в filmoclub/urls.py через admin.site.admin_view — под авторизацией админки.
+    """
+    context = {
+        **admin.site.each_context(request),
+        "title": "Статистика кэша",
+        "namespaces": CacheRegistry.get_stats(),
+        "handlers": CacheMetrics.snapshot(),
+    }
+    return TemplateResponse(request, "admin/cache_stats.html", context)
@@ -0,0 +1,104 @@
+from collections import defaultdict
+from collections.abc import Callable
+from functools import wraps
+import inspect
+import logging
+import threading
+from typing import Any
+
+from django.conf import settings
+
+from classes.caching import CacheTags
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheMetrics:
+    """
+    Попадания и промахи @cached по пространствам имён (в памяти процесса).
+    """
+
+    _lock: threading.Lock = threading.Lock()
+    _counters: dict[str, dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    @classmethod
+    def record(cls, namespace: str, hit: bool) -> None:
+        with cls._lock:
+            cls._counters[namespace]["hits" if hit else "misses"] += 1
+
+    @classmethod
+    def snapshot(cls) -> dict[str, dict[str, int]]:
+        with cls._lock:
+            return {namespace: dict(counters) for namespace, counters in cls._counters.items()}
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._counters.clear()
+
+
+def is_error_result(result: Any) -> bool:
+    """Ответ handle_exceptions ({"error": {...}}) или пустой результат — такое не кэшируется."""
+    return result is None or (isinstance(result, dict) and set(result) == {"error"})
+
+
+def cached(
+    namespace: str,
+    ttl: int | None = None,
+    key: Callable[..., str] | None = None,
+    tags: tuple[str, ...] = (),
+) -> Callable:
+    """
+    Декоратор кэширования результата асинхронного метода в общем кэше (CacheTags.cache).
+
+    Ставится между handle_exceptions и sync_to_async:
+        @classmethod
+        @handle_exceptions("Фильмы")
+        @cached("movies", tags=(CacheTags.MOVIES,))
+        @sync_to_async
+        def get_all_movies(cls, ...): ...
+
+    Исключения проходят насквозь к handle_exceptions, а ответы-ошибки не кэшируются,
+    даже если декоратор стоит выше handle_exceptions. Выключается настройкой HANDLER_CACHE_ENABLED.
+
+    :param namespace: (str) пространство имён: префикс ключей и имя в CacheMetrics.
+    :param ttl: (int) время жизни записи в секундах; None — ttl пространства handlers (CACHE_NAMESPACES).
+    :param key: функция от аргументов метода (без cls/self), возвращающая часть ключа.
+        По умолчанию — все аргументы с учётом значений по умолчанию.
+    :param tags: (tuple) теги CacheTags: запись сбрасывается при изменении любой из этих таблиц.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def make_key(args: tuple, kwargs: dict) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {name: value for name, value in bound.arguments.items() if name not in ("cls", "self")}
+            suffix = key(**arguments) if key else ",".join(f"{name}={value!r}" for name, value in arguments.items())
+            return f"{namespace}:{suffix}"
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs) -> Any:  # результат func или error-dict
+            if not getattr(settings, "HANDLER_CACHE_ENABLED", True):
+                return await func(*args, **kwargs)
+
+            cache_key = make_key(args, kwargs)
+            result = await CacheTags.cache.aget(cache_key)
+            if result is not None and result is not False:
+                CacheMetrics.record(namespace, hit=True)
+                return result
+
+            CacheMetrics.record(namespace, hit=False)
+            result = await func(*args, **kwargs)
+            if not is_error_result(result):
+                await CacheTags.cache.aset(cache_key, result, ttl=ttl, tag=tuple(tags) or None)
+            else:
+                logger.debug("Результат %s не кэшируется: ошибка", cache_key)
+            return result
+
+        async_wrapper.cache_namespace = namespace
+        return async_wrapper
+
+    return decorator
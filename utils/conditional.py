@@ -0,0 +1,69 @@
+from collections.abc import Callable
+from functools import wraps
+import hashlib
+
+from adrf.views import APIView
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.request import Request
+
+from classes.caching import CacheTags
+
+
+def is_json_request(request: Request, **kwargs) -> bool:
+    """Список в JSON (?format=json) — HTML-страницы зависят ещё от участников и темы."""
+    return request.query_params.get("format") == "json"
+
+
+def dataset_etag(versions: dict[str, int]) -> str:
+    """Сильный ETag по версиям наборов данных (CacheTags.versions)."""
+    stamp = ",".join(f"{tag}={version}" for tag, version in sorted(versions.items()))
+    return f'"{hashlib.blake2b(stamp.encode(), digest_size=12).hexdigest()}"'
+
+
+def conditional_get(*tags: str, when: Callable[..., bool] = is_json_request) -> Callable:
+    """
+    Декоратор get-метода APIView: ETag и Last-Modified по версиям наборов данных
+    и ответ 304 на If-None-Match до обращения к БД и сериализации.
+
+        class Bar(GlobalDataMixin, APIView):
+            @conditional_get(CacheTags.BAR)
+            async def get(self, request): ...
+
+    Версии читаются до данных: если таблицу изменят посреди запроса, ответ уйдёт со старым ETag,
+    и следующий запрос просто скачает данные ещё раз. Cache-Control: no-cache — браузер хранит
+    ответ, но каждый раз сверяется с сервером, а не угадывает срок свежести по Last-Modified.
+
+    :param tags: (str) теги CacheTags, от которых зависит ответ.
+    :param when: функция (request, **kwargs маршрута) → bool: для каких запросов включать.
+        По умолчанию — только ?format=json.
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        async def wrapper(self: APIView, request: Request, *args, **kwargs) -> HttpResponse:
+            if not when(request, **kwargs):
+                return await method(self, request, *args, **kwargs)
+
+            versions = await CacheTags.versions(*tags)
+            etag = dataset_etag(versions)
+            # If-Modified-Since не проверяем: версии в наносекундах, а даты HTTP — в секундах, и две записи
+            # в одну секунду дали бы одинаковый Last-Modified (304 со старыми данными). Сверка — только по ETag,
+            # а Last-Modified округляется вверх, чтобы не быть раньше изменения
+            last_modified = -(-max(versions.values()) // 1_000_000_000)
+
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+            patch_cache_control(response, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
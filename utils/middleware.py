@@ -46,6 +46,16 @@ class TeaCodeMiddleware:
     async def __acall__(self, request: HttpRequest) -> HttpResponse:
         return self._denied_response(request) or self._set_cookie(request, await self.get_response(request))
 
+    @classmethod
+    def request_has_code(cls, request: HttpRequest) -> bool:
+        """
+        Пришёл ли запрос с верным tea_code (GET-параметр или кука). Для закрытых GET-эндпоинтов.
+        Пустой TEA_CODE — проверка выключена, как и для изменяющих запросов.
+        """
+        if not settings.TEA_CODE:
+            return True
+        return cls._code_is_valid(request.GET.get(TEA_CODE_KEY) or request.COOKIES.get(TEA_CODE_KEY))
+
     @staticmethod
     def _code_is_valid(code: str | None) -> bool:
         # compare_digest — сравнение за константное время; bytes, т.к. со строками
@@ -61,8 +71,7 @@ class TeaCodeMiddleware:
         ):
             return None
 
-        code = request.GET.get(TEA_CODE_KEY) or request.COOKIES.get(TEA_CODE_KEY)
-        if self._code_is_valid(code):
+        if self.request_has_code(request):
             return None
 
         logger.warning(f"Запрос без верного tea_code отклонён: {request.method} {request.path}")
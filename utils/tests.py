@@ -1,11 +1,19 @@
-# Тесты TeaCodeMiddleware — границы доступа «свой-чужой».
+# Тесты TeaCodeMiddleware — границы доступа «свой-чужой» — и декоратора @cached.
 # Middleware тестируется в изоляции (RequestFactory + фиктивный get_response),
 # чтобы не зависеть от view, БД и внешних API.
+from collections.abc import Callable
 import json
+import tempfile
+from unittest.mock import patch
 
+from asgiref.sync import sync_to_async
 from django.http import HttpRequest, HttpResponse
 from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.exceptions import ValidationError
 
+from classes.caching import CacheTags, Caching
+from utils.cache_handler import CacheMetrics, cached
+from utils.exception_handler import handle_exceptions
 from utils.middleware import TEA_CODE_COOKIE_MAX_AGE, TEA_CODE_KEY, UNSAFE_METHODS, TeaCodeMiddleware
 
 
@@ -154,3 +162,54 @@ class TeaCodeAsyncTests(SimpleTestCase):
     async def test_get_without_code_passes(self) -> None:
         response = await self.middleware(self.factory.get("/lists/movies/"))
         self.assertEqual(response.status_code, 200)
+
+
+@override_settings(HANDLER_CACHE_ENABLED=True)
+class CachedDecoratorTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self.cache = Caching(self._cache_dir.name, memory_limit=4096)
+        patcher = patch.object(CacheTags, "cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        CacheMetrics.reset()
+        self.calls = []
+
+    def tearDown(self) -> None:
+        Caching._memory_tiers.clear()
+        self._cache_dir.cleanup()
+
+    def handler(self) -> Callable:
+        calls = self.calls
+
+        @handle_exceptions("Тест")
+        @cached("test", tags=(CacheTags.MOVIES, CacheTags.NOTES))
+        @sync_to_async
+        def get_items(cls: type, kind: str = "all", fail: bool = False) -> list[str]:
+            calls.append(kind)
+            if fail:
+                raise ValidationError("сломалось")
+            return [kind]
+
+        return get_items
+
+    async def test_result_is_cached_per_arguments(self) -> None:
+        get_items = self.handler()
+        self.assertEqual(await get_items(None), ["all"])
+        self.assertEqual(await get_items(None, kind="all"), ["all"])  # те же аргументы с учётом умолчаний
+        self.assertEqual(await get_items(None, "new"), ["new"])
+        self.assertEqual(self.calls, ["all", "new"])
+        self.assertEqual(CacheMetrics.snapshot()["test"], {"hits": 1, "misses": 2})
+
+    async def test_errors_are_not_cached(self) -> None:
+        get_items = self.handler()
+        self.assertIn("error", await get_items(None, fail=True))
+        self.assertIn("error", await get_items(None, fail=True))
+        self.assertEqual(len(self.calls), 2)
+
+    async def test_any_tag_invalidates(self) -> None:
+        get_items = self.handler()
+        await get_items(None)
+        await CacheTags.ainvalidate(CacheTags.NOTES)
+        await get_items(None)
+        self.assertEqual(self.calls, ["all", "all"])